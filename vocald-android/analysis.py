@@ -0,0 +1,223 @@
+"""
+Kivy-free analysis steps shared by the app screens and the headless CLI.
+"""
+
+import os, sqlite3, tempfile, time, wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+PREVIEW_S = 20      # seconds of audio analysed by the quick first pass
+# rough bytes per second for containers that stay valid when truncated
+_BPS = {'amr': 1600, 'mp3': 16000, 'aac': 16000, 'ogg': 16000}
+
+
+def sniff(path):
+    """Fail fast on non-audio before the engine attempts a full decode."""
+    import audiohdr
+    if audiohdr.what(path) is None:
+        raise ValueError('unsupported or non-audio file')
+
+
+def commit(engine, rid, sp, fn, ms, path=None, mark=None):
+    """Write one analysis result and mark the source file as processed.
+    `mark` is the highest profile id before the batch (batch_mark()); by
+    default it is taken here, before the engine can create profiles."""
+    if mark is None:
+        try: mark = batch_mark(engine.DB_PATH)
+        except sqlite3.Error: mark = None
+    engine.update_recording_after_analysis(rid, sp)
+    engine.mark_file_processed(fn, ms)
+    # sidecars only below — never fail the recording
+    rec = {}
+    try:
+        import profile_store
+        rec = engine.get_recording_detail(rid) or {}
+        if mark is not None:
+            profile_store.reconcile(engine.DB_PATH, sp, rec.get('speakers'), mark,
+                                    rec.get('phone_number'))
+        profile_store.record(engine.DB_PATH, sp, rec.get('speakers'),
+                             phone=rec.get('phone_number'))
+    except Exception: pass
+    try:
+        import timeline
+        timeline.record(engine.DB_PATH, rid, sp, rec.get('speakers'),
+                        rec.get('call_date'))
+    except Exception: pass
+    if path:
+        try:
+            import waveform
+            waveform.record(engine.DB_PATH, rid, path, sp)
+        except Exception: pass
+
+
+def prefetch(path):
+    """Decode stage: sniff, then have the kernel start reading the file so the
+    engine's decode finds it in the page cache."""
+    sniff(path)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+
+# ─── Quick preview pass ───────────────────────────────────────────────────────
+def preview_window(path, seconds=PREVIEW_S):
+    """
+    Temp file with roughly the first `seconds` of `path`, or None when the
+    recording is already short or the container cannot be cut without a
+    decode (MP4/3GP keep their index at the end). WAV is sliced on sample
+    boundaries; frame-based streams are cut by byte budget.
+    """
+    import audiohdr
+    kind = audiohdr.what(path)
+    if kind == 'wav':
+        a, rate = audiohdr.read_wav(path)
+        if a.dtype.kind not in 'iu' or len(a) <= rate * seconds * 1.5: return None
+        fd, tmp = tempfile.mkstemp(suffix='.wav'); os.close(fd)
+        with wave.open(tmp, 'wb') as w:
+            w.setnchannels(a.shape[1]); w.setsampwidth(a.dtype.itemsize)
+            w.setframerate(rate); w.writeframes(a[:rate * seconds].tobytes())
+        return tmp
+    cut = _BPS.get(kind, 0) * seconds
+    if not cut or os.path.getsize(path) <= cut * 1.5: return None
+    fd, tmp = tempfile.mkstemp(suffix=os.path.splitext(path)[1])
+    with open(path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+        dst.write(src.read(cut))
+    return tmp
+
+
+def preview(engine, fi, seconds=PREVIEW_S):
+    """Provisional speakers from a partial window, or None if not worth it."""
+    tmp = preview_window(fi['filepath'], seconds)
+    if not tmp: return None
+    try:
+        return engine.analyse_audio_file(tmp, fi['filename'], lambda s: None)
+    finally:
+        os.remove(tmp)
+
+
+def mtime_ms(path):
+    return int(os.path.getmtime(path) * 1000)
+
+
+# ─── Process-pool backend ─────────────────────────────────────────────────────
+# Python threads only scale if every stage of analyse_audio_file releases the
+# GIL; worker processes sidestep that. Each worker loads the engine (and its
+# model) once, receives file paths, and sends the analysis result back — the
+# parent applies every DB write.
+_engine = None
+
+def _init_worker(data_dir):
+    global _engine
+    import vocald_engine as engine
+    engine.init_engine(data_dir)
+    _engine = engine
+
+
+def _analyse(fp, fn):
+    t = time.perf_counter()
+    sniff(fp)
+    sp = _engine.analyse_audio_file(fp, fn, lambda s: None)
+    return sp, time.perf_counter() - t
+
+
+def analyse_file(fi):
+    """Picklable pipeline.run() inference step for a Pool executor."""
+    return _analyse(fi['filepath'], fi['filename'])
+
+
+def preview_file(fi):
+    """Picklable preview() for a Pool executor; never raises."""
+    try: return preview(_engine, fi)
+    except Exception: return None
+
+
+def batch_mark(db_path):
+    """Highest voice-profile id before a commit or batch: profiles above it
+    were created by the engine since."""
+    conn = sqlite3.connect(db_path)
+    try: return conn.execute('SELECT IFNULL(MAX(id), 0) FROM voice_profiles').fetchone()[0]
+    finally: conn.close()
+
+
+def settle(db_path, mark):
+    """Flag profiles created since `mark` that sound like other profiles, as
+    merge hints for the user to confirm. Returns the number flagged."""
+    import profile_store
+    try:
+        rep = profile_store.consolidate(db_path, 1 - profile_store.MATCH_SCORE,
+                                        since=mark)
+        return profile_store.flag(db_path, rep['groups'])
+    except sqlite3.Error:
+        return 0
+
+
+class Pool:
+    """
+    Analysis worker pool. Use as a context manager around run().
+
+    Every worker initialises its own engine once, so a voice first enrolled
+    by one worker mid-batch is unknown to the others: two workers can each
+    create a profile for the same new caller. Pass commit() the batch_mark()
+    taken before the batch so profile_store.reconcile() can flag such
+    profiles when results carry embeddings; callers run settle() after a
+    multi-worker batch to flag the rest for review.
+    """
+
+    def __init__(self, data_dir, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._ex = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                       initargs=(data_dir,))
+
+    def run(self, files, cancelled=lambda: False):
+        """
+        Yield (fi, sp, err, secs) for each scanned file as workers finish.
+        Once `cancelled()` turns true, queued files are dropped and only the
+        ones already running are waited for.
+        """
+        jobs = {self._ex.submit(_analyse, fi['filepath'], fi['filename']): fi
+                for fi in files}
+        try:
+            for fut in as_completed(jobs):
+                fi = jobs[fut]
+                if fut.cancelled(): continue
+                try:
+                    sp, secs = fut.result()
+                    yield fi, sp, None, secs
+                except Exception as e:
+                    yield fi, None, e, 0.0
+                if cancelled():
+                    for f in jobs: f.cancel()
+        finally:
+            for f in jobs: f.cancel()
+
+    @property
+    def executor(self): return self._ex
+
+    def close(self):
+        self._ex.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):  return self
+    def __exit__(self, *_): self.close()
+
+
+def bench(data_dir, files, max_workers=None):
+    """Analyse `files` with 1..N workers (powers of two) without touching the
+    DB; returns one timing row per worker count."""
+    max_workers = max_workers or os.cpu_count() or 1
+    rows, n, base = [], 1, None
+    while True:
+        with Pool(data_dir, n) as p:
+            list(p.run(files[:n]))            # warm-up: one model load per worker
+            t = time.perf_counter()
+            ok = sum(err is None for _, _, err, _ in p.run(files))
+            secs = time.perf_counter() - t
+        base = base or secs
+        rows.append({'workers': n, 'files': len(files), 'ok': ok,
+                     'secs': round(secs, 3),
+                     'files_per_s': round(len(files) / secs, 3) if secs else None,
+                     'speedup': round(base / secs, 2) if secs else None})
+        if n >= max_workers: break
+        n = min(n * 2, max_workers)
+    return rows
@@ -0,0 +1,136 @@
+# Audio container sniffing — the imghdr.py idea applied to call recordings.
+# Looks at the first 32 bytes only, so non-audio input is rejected before any
+# decoder is touched.
+
+import mmap, os, struct
+
+# ISO-BMFF major brands: 3GPP ones are AMR/AAC call recordings, every other
+# ftyp (M4A , mp4a, f4a , mp42, isom, qt  , ...) is treated as an MP4 audio file
+_3GP = (b'3gp', b'3g2')
+
+
+def what(file, h=None):
+    if h is None:
+        if isinstance(file, str):
+            with open(file, 'rb') as f:
+                h = f.read(32)
+        else:
+            location = file.tell()
+            h = file.read(32)
+            file.seek(location)
+
+    if h[:4] == b'RIFF' and h[8:12] == b'WAVE': return 'wav'
+    if h[:5] == b'#!AMR': return 'amr'
+    if h[4:8] == b'ftyp':
+        return '3gp' if h[8:11] in _3GP else 'm4a'
+    if h[:4] == b'OggS': return 'ogg'
+    if h[:4] == b'fLaC': return 'flac'
+    if h[:3] == b'ID3': return 'mp3'
+    if len(h) > 1 and h[0] == 0xFF and h[1] & 0xE0 == 0xE0:
+        return 'aac' if h[1] & 0x06 == 0 else 'mp3'   # ADTS has layer bits 00
+    return None
+
+
+# ─── WAV ──────────────────────────────────────────────────────────────────────
+_DTYPE = {(1, 8): 'u1', (1, 16): '<i2', (1, 32): '<i4', (3, 32): '<f4'}
+
+
+def wav_info(buf):
+    """(format, channels, rate, bits, data_offset, data_size) from a RIFF buffer."""
+    fmt, pos = None, 12
+    while pos + 8 <= len(buf):
+        cid, size = buf[pos:pos+4], struct.unpack_from('<I', buf, pos + 4)[0]
+        body = pos + 8
+        if cid == b'fmt ':
+            if size < 16 or body + min(size, 26) > len(buf):
+                raise ValueError('truncated WAV fmt chunk')
+            tag, ch, rate, _, _, bits = struct.unpack_from('<HHIIHH', buf, body)
+            if tag == 0xFFFE and size >= 26:            # WAVE_FORMAT_EXTENSIBLE
+                tag = struct.unpack_from('<H', buf, body + 24)[0]
+            fmt = (tag, ch, rate, bits)
+        elif cid == b'data':
+            if fmt is None: break
+            return fmt + (body, min(size, len(buf) - body))
+        pos = body + size + (size & 1)
+    raise ValueError('not a PCM WAV file')
+
+
+def read_wav(path):
+    """
+    Samples of a PCM WAV file as a read-only NumPy view over an mmap —
+    no intermediate copies. Returns (samples[frames, channels], rate).
+    The mapping stays alive for as long as the array does.
+    """
+    import numpy as np
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    tag, ch, rate, bits, off, size = wav_info(mm)
+    dt = _DTYPE.get((tag, bits))
+    if dt is None: raise ValueError(f'unsupported WAV encoding {tag}/{bits}')
+    width = bits // 8 * ch
+    a = np.frombuffer(mm, dtype=dt, count=size // width * ch, offset=off)
+    return a.reshape(-1, ch), rate
+
+
+# ─── Duration from container headers ──────────────────────────────────────────
+# bytes after the 1-byte frame header, by frame type; every frame is 20 ms
+_AMR_NB = (12, 13, 15, 17, 19, 20, 26, 31, 5) + (0,) * 7
+_AMR_WB = (17, 23, 32, 36, 40, 46, 50, 58, 60, 5) + (0,) * 6
+
+
+def _boxes(f, start, end):
+    """(type, body_offset, body_end) of the ISO-BMFF boxes in [start, end)."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, kind = struct.unpack('>I4s', f.read(8))
+        body = pos + 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]; body += 8
+        elif size == 0:
+            size = end - pos
+        if size < body - pos: return
+        yield kind, body, min(end, pos + size)
+        pos += size
+
+
+def _mp4_duration(f, end):
+    for kind, body, stop in _boxes(f, 0, end):
+        if kind != b'moov': continue
+        for sub, b, _ in _boxes(f, body, stop):
+            if sub != b'mvhd': continue
+            f.seek(b)
+            ver = f.read(1)[0]
+            f.seek(b + (20 if ver == 1 else 12))
+            scale, dur = struct.unpack('>IQ' if ver == 1 else '>II',
+                                       f.read(12 if ver == 1 else 8))
+            return dur / scale if scale else None
+    return None
+
+
+def _amr_duration(f):
+    wb    = f.read(9) == b'#!AMR-WB\n'
+    sizes = _AMR_WB if wb else _AMR_NB
+    f.seek(9 if wb else 6)
+    buf, o, frames = f.read(), 0, 0
+    while o < len(buf):
+        o += 1 + sizes[(buf[o] >> 3) & 0x0F]
+        frames += 1
+    return frames * 0.02
+
+
+def duration(path):
+    """Length in seconds read from the container, without decoding: WAV
+    from its data chunk, MP4/3GP from mvhd, AMR by counting frames. None
+    for other formats or an unreadable header."""
+    kind = what(path)
+    try:
+        if kind == 'wav':
+            a, rate = read_wav(path)
+            return len(a) / rate
+        with open(path, 'rb') as f:
+            if kind in ('m4a', '3gp'): return _mp4_duration(f, os.fstat(f.fileno()).st_size)
+            if kind == 'amr': return _amr_duration(f)
+    except (OSError, ValueError, struct.error, IndexError):
+        pass
+    return None
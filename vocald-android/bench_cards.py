@@ -0,0 +1,60 @@
+"""
+Headless Logs-card benchmark:
+
+    python bench_cards.py [n]
+
+Builds n LogsScreen cards without showing a window (mock GL backend) and
+reports wall time, Python allocations, canvas instructions and how many
+text textures the shared cache holds.
+"""
+
+import os, sys, time, tracemalloc
+
+os.environ.setdefault('KIVY_GL_BACKEND', 'mock')
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_LOG_MODE', 'PYTHON')
+
+import main
+from records import Recording
+
+if main.Window is None:                  # no window provider: fixed scale
+    main._sc = lambda: 1.0
+
+
+def _fake(i):
+    return Recording({
+        'id': i + 1, 'filename': f'Call%20recording%20{i:06d}.m4a',
+        'phone_number': f'+91 98450 {i % 50:05d}',
+        'call_date': f'2024-{1 + i % 12:02d}-{1 + i % 28:02d}T10:{i % 60:02d}:00',
+        'call_duration': 30 + i % 600, 'processed': i % 3,
+        'total_speakers': 1 + i % 3})
+
+
+def _instructions(w):
+    n = len(w.canvas.before.children) + len(w.canvas.children)
+    return n + sum(_instructions(c) for c in w.children)
+
+
+def run(n=1000):
+    scr  = main.LogsScreen(name='logs')
+    recs = [_fake(i) for i in range(n)]
+    scr._card(recs[0])                                   # warm caches/fonts
+    t = time.perf_counter()
+    cards = [scr._card(r) for r in recs]
+    secs = time.perf_counter() - t
+    del cards
+    tracemalloc.start()                                  # second pass, traced
+    cards = [scr._card(r) for r in recs]
+    cur, peak = tracemalloc.get_traced_memory()
+    snap = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocs = sum(st.count for st in snap.statistics('filename'))
+    print(f'{n} cards in {secs * 1000:.1f} ms  ({secs / n * 1e6:.0f} us/card)')
+    print(f'  live allocations   {allocs}  ({allocs / n:.0f}/card)')
+    print(f'  traced memory      {cur / 2**20:.2f} MiB  (peak {peak / 2**20:.2f})')
+    print(f'  canvas instructions {sum(map(_instructions, cards))}')
+    print(f'  cached textures     {len(main._TEX)}')
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
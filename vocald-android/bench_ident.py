@@ -0,0 +1,301 @@
+"""
+Speaker-identification regression harness:
+
+    python bench_ident.py [--corpus DIR] [--out run.json] [--compare base.json]
+
+Runs enrolment then identification through vocald_engine.analyse_audio_file
+in a throw-away data dir and reports, in one table:
+
+    top1        share of test files whose main speaker got the enrolled profile
+    eer         equal error rate of genuine vs impostor embedding scores
+    conf_split  without embeddings: error rate at the confidence threshold
+                that best splits right from wrong choices (not an EER)
+    ece         expected calibration error of the reported confidence
+    files/s     throughput, plus x-realtime and p50/p95 latency per file
+
+Enrolment commits normally. The DB is then snapshotted as the gallery, and
+every test file is identified against a fresh copy of it: results are never
+committed to the sidecars and nothing a test file does is seen by the next
+one, so the scores do not drift with the order of the corpus.
+
+The corpus is either a fixture folder laid out as <corpus>/<speaker>/<file>,
+or (default) a synthetic one: harmonic voices with speaker-specific pitch,
+formants and speaking rate, written as 16 kHz WAV. With --compare, the
+previous report is printed alongside and the run fails (exit 1) when top-1
+drops or EER rises by more than the tolerances, so an engine change can be
+accepted or rejected on numbers.
+
+EER uses cosine scores of the result embeddings against the enrolled
+profile centroids, so it needs an engine that reports embeddings; without
+them only conf_split is available.
+"""
+
+import json, os, shutil, sqlite3, sys, tempfile, time, wave
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'src'))
+sys.path.insert(0, HERE)
+
+RATE = 16000
+CONF_SCALE = 100.0      # the engine reports confidence in percent
+
+
+# ─── Corpus ───────────────────────────────────────────────────────────────────
+def _voice(rng):
+    return {'f0': rng.uniform(85, 255), 'formants': np.sort(rng.uniform(
+                [300, 900, 2200], [850, 2300, 3300])),
+            'rate': rng.uniform(3.0, 5.5), 'tilt': rng.uniform(6, 14)}
+
+
+def _utterance(v, secs, rng):
+    t   = np.arange(int(secs * RATE)) / RATE
+    f0  = v['f0'] * (1 + 0.06 * np.sin(2 * np.pi * 0.7 * t + rng.uniform(0, 6))
+                     + 0.01 * rng.standard_normal(len(t)).cumsum() / np.sqrt(len(t)))
+    ph  = 2 * np.pi * np.cumsum(f0) / RATE
+    syl = np.clip(np.sin(2 * np.pi * v['rate'] / 2 * t + rng.uniform(0, 6)), 0, None) ** 0.6
+    fm  = v['formants'] * (1 + 0.08 * np.sin(2 * np.pi * v['rate'] / 3 * t[:, None]))
+    x   = np.zeros(len(t))
+    for k in range(1, int(3800 / v['f0'])):
+        f   = k * f0
+        amp = (np.exp(-((f[:, None] - fm) / 120) ** 2).sum(1) + 0.05) \
+              * 10 ** (-v['tilt'] * np.log2(k) / 20)
+        x  += amp * np.sin(k * ph)
+    x *= syl
+    x += 0.01 * rng.standard_normal(len(t))
+    return (x / (np.abs(x).max() + 1e-9) * 0.6 * 32767).astype('<i2')
+
+
+def synth(folder, speakers=8, files=6, secs=6.0, seed=0):
+    """<folder>/spk<NN>/<NN>_<i>.wav for a reproducible synthetic cast."""
+    rng = np.random.default_rng(seed)
+    for s in range(speakers):
+        v = _voice(rng)
+        d = os.path.join(folder, f'spk{s:02d}')
+        os.makedirs(d, exist_ok=True)
+        for i in range(files):
+            with wave.open(os.path.join(d, f'{s:02d}_{i}.wav'), 'wb') as w:
+                w.setnchannels(1); w.setsampwidth(2); w.setframerate(RATE)
+                w.writeframes(_utterance(v, secs * rng.uniform(0.8, 1.2), rng).tobytes())
+    return folder
+
+
+def corpus(folder):
+    """{speaker: [paths]} from a <speaker>/<file> layout, audio files only."""
+    import audiohdr
+    out = {}
+    for spk in sorted(os.listdir(folder)):
+        d = os.path.join(folder, spk)
+        if not os.path.isdir(d): continue
+        fs = [os.path.join(d, f) for f in sorted(os.listdir(d))]
+        fs = [f for f in fs if os.path.isfile(f) and audiohdr.what(f)]
+        if len(fs) >= 2: out[spk] = fs
+    return out
+
+
+# ─── Metrics ──────────────────────────────────────────────────────────────────
+def eer(genuine, impostor):
+    """Equal error rate: where false accepts meet false rejects."""
+    g, i = np.asarray(genuine, float), np.asarray(impostor, float)
+    if not len(g) or not len(i): return None
+    th  = np.unique(np.concatenate([g, i]))
+    far = np.array([(i >= t).mean() for t in th])
+    frr = np.array([(g < t).mean() for t in th])
+    k   = int(np.argmin(np.abs(far - frr)))
+    return float((far[k] + frr[k]) / 2)
+
+
+def split_error(scores, correct):
+    """Lowest mean of false-accept and false-reject rates over thresholds on
+    a decision score — how well it separates right from wrong choices."""
+    return eer([s for s, y in zip(scores, correct) if y],
+               [s for s, y in zip(scores, correct) if not y])
+
+
+def calibration(conf, correct, bins=10, scale=CONF_SCALE):
+    """(ECE, [(lo, hi, n, mean conf, accuracy)]) over equal-width bins;
+    `conf` is divided by `scale` to give a probability."""
+    c, y = np.clip(np.asarray(conf, float) / scale, 0, 1), np.asarray(correct, float)
+    if not len(c): return None, []
+    edges, rows, ece = np.linspace(0, 1, bins + 1), [], 0.0
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        m = (c >= lo) & ((c < hi) | (hi == 1))
+        if not m.any(): continue
+        rows.append((round(lo, 2), round(hi, 2), int(m.sum()),
+                     round(float(c[m].mean()), 3), round(float(y[m].mean()), 3)))
+        ece += m.mean() * abs(c[m].mean() - y[m].mean())
+    return float(ece), rows
+
+
+# ─── Run ──────────────────────────────────────────────────────────────────────
+def _main_speaker(spk):
+    spk = [s for s in spk or () if s.get('voice_profile_id')]
+    return max(spk, key=lambda s: s.get('confidence') or 0) if spk else None
+
+
+def _copy_db(src, dst):
+    """sqlite backup of `src` over `dst`, safe with the engine's connection open."""
+    a, b = sqlite3.connect(src), sqlite3.connect(dst)
+    try:
+        a.backup(b)
+    finally:
+        a.close(); b.close()
+
+
+def _embedding(sp, idx):
+    spk = sp.get('speakers', []) if isinstance(sp, dict) else (sp or [])
+    for s in spk:
+        if s.get('speaker_index') == idx and s.get('embedding') is not None:
+            return np.asarray(s['embedding'], np.float32).ravel()
+    return None
+
+
+def _seconds(path):
+    try:
+        with wave.open(path) as w: return w.getnframes() / w.getframerate()
+    except (wave.Error, EOFError):
+        return 0.0                      # non-WAV fixture: left out of x_realtime
+
+
+def run(files, enrol=2):
+    """Enrol the first `enrol` files per speaker, then identify the rest
+    against a frozen copy of the enrolled gallery."""
+    import profile_store, vocald_engine as engine
+    from analysis import commit, mtime_ms
+
+    def analyse(path):
+        fn  = os.path.basename(path)
+        rid = engine.create_recording_entry(fn, path, '2026-01-01T00:00:00')
+        t   = time.perf_counter()
+        sp  = engine.analyse_audio_file(path, fn, lambda *_: None)
+        return rid, sp, time.perf_counter() - t, _seconds(path)
+
+    lat, audio, owner = [], 0.0, {}
+    for spk, fs in files.items():                   # enrolment
+        votes = []
+        for p in fs[:enrol]:
+            rid, sp, dt, secs = analyse(p)
+            commit(engine, rid, sp, os.path.basename(p), mtime_ms(p))
+            lat.append(dt); audio += secs
+            s = _main_speaker((engine.get_recording_detail(rid) or {}).get('speakers'))
+            if s: votes.append(s['voice_profile_id'])
+        if votes: owner[spk] = max(set(votes), key=votes.count)
+    label = {pid: spk for spk, pid in owner.items()}
+
+    gallery = engine.DB_PATH + '.gallery'
+    _copy_db(engine.DB_PATH, gallery)
+    conn = profile_store.connect(gallery)
+    ids, _, X = profile_store.load(conn)
+    conn.close()
+    col = {pid: i for i, pid in enumerate(ids)}
+    gen, imp, conf, ok, n = [], [], [], [], 0
+    for spk, fs in files.items():                   # identification
+        for p in fs[enrol:]:
+            _copy_db(gallery, engine.DB_PATH)       # undo whatever the last file did
+            rid, sp, dt, secs = analyse(p)
+            lat.append(dt); audio += secs; n += 1
+            s = _main_speaker(profile_store._speakers(sp))
+            if s is None:                           # ids only assigned on update
+                engine.update_recording_after_analysis(rid, sp)
+                s = _main_speaker((engine.get_recording_detail(rid) or {}).get('speakers'))
+            hit = bool(s) and label.get(s['voice_profile_id']) == spk
+            ok.append(hit)
+            conf.append((s or {}).get('confidence') or 0.0)
+            e = _embedding(sp, s['speaker_index']) if s else None
+            if e is not None and len(X) and X.shape[1] == len(e):
+                sc = X @ (e / max(float(np.linalg.norm(e)), 1e-9))
+                for pid, who in label.items():
+                    if pid in col: (gen if who == spk else imp).append(float(sc[col[pid]]))
+    _copy_db(gallery, engine.DB_PATH)
+
+    ece, table = calibration(conf, ok)
+    err   = eer(gen, imp)
+    split = split_error(conf, ok)
+    wall  = sum(lat)
+    return {
+        'speakers': len(files), 'enrolled': len(owner), 'test_files': n,
+        'top1':  round(float(np.mean(ok)), 4) if ok else None,
+        'eer':   None if err is None else round(err, 4),
+        'conf_split': None if split is None else round(split, 4),
+        'ece':   None if ece is None else round(ece, 4),
+        'calibration': table,
+        'files_per_s': round(len(lat) / wall, 3) if wall else None,
+        'x_realtime':  round(audio / wall, 2) if wall else None,
+        'p50_s': round(float(np.percentile(lat, 50)), 3) if lat else None,
+        'p95_s': round(float(np.percentile(lat, 95)), 3) if lat else None,
+    }
+
+
+# ─── Report ───────────────────────────────────────────────────────────────────
+_KEYS = (('top1', '{:.3f}', 1), ('eer', '{:.3f}', -1), ('conf_split', '{:.3f}', -1),
+         ('ece', '{:.3f}', -1),
+         ('files_per_s', '{:.2f}', 1), ('x_realtime', '{:.1f}', 1),
+         ('p50_s', '{:.3f}', -1), ('p95_s', '{:.3f}', -1))
+
+
+def _fmt(f, v):
+    return '-' if v is None else f.format(v)
+
+
+def report(cur, base=None, top1_tol=0.01, eer_tol=0.01):
+    """Print the metrics (side by side with `base`); return False on regression."""
+    print(f'{cur["speakers"]} speakers, {cur["test_files"]} test files'
+          + ('' if cur.get('eer') is not None else '  (no embeddings: no EER)'))
+    print(f'  {"metric":<12}{"base":>10}{"this":>10}{"delta":>10}' if base else
+          f'  {"metric":<12}{"this":>10}')
+    for k, f, _ in _KEYS:
+        if base:
+            b, c = base.get(k), cur.get(k)
+            d = '-' if b is None or c is None else f'{c - b:+.3f}'
+            print(f'  {k:<12}{_fmt(f, b):>10}{_fmt(f, c):>10}{d:>10}')
+        else:
+            print(f'  {k:<12}{_fmt(f, cur.get(k)):>10}')
+    print('  confidence   n    conf   acc')
+    for lo, hi, n, c, a in cur['calibration']:
+        print(f'  {lo:.1f}-{hi:.1f}  {n:>5}  {c:.3f}  {a:.3f}')
+    if not base: return True
+    bad = []
+    if None not in (base.get('top1'), cur.get('top1')) and cur['top1'] < base['top1'] - top1_tol:
+        bad.append('top1')
+    if None not in (base.get('eer'), cur.get('eer')) and cur['eer'] > base['eer'] + eer_tol:
+        bad.append('eer')
+    print('REJECT: ' + ', '.join(bad) + ' regressed' if bad else 'ACCEPT')
+    return not bad
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(prog='bench_ident', description=__doc__.split('\n')[1])
+    ap.add_argument('--corpus', help='<speaker>/<file> fixture folder (default: synthetic)')
+    ap.add_argument('--speakers', type=int, default=8)
+    ap.add_argument('--files', type=int, default=6, help='files per synthetic speaker')
+    ap.add_argument('--seconds', type=float, default=6.0)
+    ap.add_argument('--enrol', type=int, default=2, help='enrolment files per speaker')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--out', help='write the report as JSON')
+    ap.add_argument('--compare', help='previous JSON report to diff against')
+    ap.add_argument('--top1-tol', type=float, default=0.01)
+    ap.add_argument('--eer-tol', type=float, default=0.01)
+    a = ap.parse_args(argv)
+
+    import vocald_engine as engine
+    tmp = tempfile.mkdtemp(prefix='vocald-eval-')
+    try:
+        src = a.corpus or synth(os.path.join(tmp, 'corpus'), a.speakers, a.files,
+                                a.seconds, a.seed)
+        os.makedirs(os.path.join(tmp, 'data'))
+        engine.init_engine(os.path.join(tmp, 'data'))
+        cur = run(corpus(src), a.enrol)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    if a.out:
+        with open(a.out, 'w') as f: json.dump(cur, f, indent=1)
+    base = None
+    if a.compare:
+        with open(a.compare) as f: base = json.load(f)
+    return 0 if report(cur, base, a.top1_tol, a.eer_tol) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
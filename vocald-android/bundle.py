@@ -0,0 +1,398 @@
+"""
+Portable voice-profile export / import (Kivy-free).
+
+A .vcdx bundle is a stream of independently compressed frames, so neither
+side ever holds more than one chunk in memory:
+
+    b'VCDX' u16 version
+    frame*      <4s kind, u32 raw_len, u32 zlib_len, u32 crc32(raw)> zlib(raw)
+
+    META  JSON: version, created, dim, chunk size
+    PROF  up to CHUNK profiles: u32 json_len, JSON rows, f32 scale[n], i8 vec[n, dim]
+    RECS  optional JSON recording rows with their speakers
+    END   JSON totals, so a truncated file is detected
+
+Profile centroids are stored as int8 with one float32 scale per row (4x
+smaller than float32; cosine scores move by < 0.01). Per-dimension variance
+and reservoir samples are not exported; an imported profile restarts them
+from its centroid.
+
+Only the sidecar centroids travel: the engine's own per-profile model state
+is internal to vocald_engine and is not exported. An imported profile is
+therefore unknown to the engine's matcher until the person is heard again —
+the engine files that call under a fresh profile, and commit-time
+profile_store.reconcile() folds it back into the imported one.
+
+Import is verified first: every checksum and the END totals are checked
+before anything is written, so a damaged file changes nothing. It then
+merges: incoming centroids are scored against the existing ones in blocks of
+BLOCK rows, keeping only each row's best match, and matches above
+`threshold` fold into the existing profile (counts summed, centroids
+count-weighted, first / last seen widened) instead of creating a duplicate.
+
+Re-import is idempotent: every bundle carries its exporting database's
+origin id, and the bundle_imports sidecar table remembers which local
+profile each (origin, source id) landed in and the totals brought in. A
+second import of the same profile adds only what grew since (new
+recordings, new embeddings), so importing one file twice changes nothing.
+
+    python bundle.py export profiles.vcdx [--recordings] [--data-dir DIR]
+    python bundle.py import profiles.vcdx [--threshold 0.80] [--data-dir DIR]
+"""
+
+import json, os, struct, time, zlib
+import numpy as np
+
+MAGIC, VERSION = b'VCDX', 1
+CHUNK     = 2048                    # profiles / recordings per frame
+BLOCK     = 256                     # import: incoming rows scored per matrix product
+THRESHOLD = 0.80                    # cosine score to merge into an existing profile
+_HEAD  = struct.Struct('<4sH')
+_FRAME = struct.Struct('<4sIII')
+_PCOLS = ('id', 'name', 'total_recordings', 'first_seen', 'last_seen')
+_RCOLS = ('filename', 'phone_number', 'call_date', 'call_duration', 'total_speakers')
+_SCOLS = ('speaker_index', 'name', 'confidence', 'voice_profile_id')
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bundle_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bundle_imports (
+    origin     TEXT    NOT NULL,        -- exporting database's bundle_meta origin
+    src_id     INTEGER NOT NULL,        -- profile id in that database
+    profile_id INTEGER NOT NULL,        -- local profile it was imported into
+    total      INTEGER NOT NULL,        -- total_recordings brought in so far
+    count      INTEGER NOT NULL,        -- embedding count brought in so far
+    PRIMARY KEY (origin, src_id)
+);
+"""
+
+
+class BundleError(ValueError):
+    pass
+
+
+def _connect(db_path):
+    import profile_store
+    conn = profile_store.connect(db_path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _origin(conn):
+    """This database's origin id, created on first export."""
+    import uuid
+    with conn:
+        conn.execute('INSERT OR IGNORE INTO bundle_meta VALUES (?, ?)',
+                     ('origin', uuid.uuid4().hex))
+    return conn.execute("SELECT value FROM bundle_meta WHERE key='origin'").fetchone()[0]
+
+
+# ─── Framing ──────────────────────────────────────────────────────────────────
+def _write(f, kind, raw, level=6):
+    z = zlib.compress(raw, level)
+    f.write(_FRAME.pack(kind, len(raw), len(z), zlib.crc32(raw)))
+    f.write(z)
+
+
+def _frames(f):
+    """Yield (kind, raw) per frame, verifying length and checksum."""
+    head = f.read(_HEAD.size)
+    if len(head) < _HEAD.size or _HEAD.unpack(head)[0] != MAGIC:
+        raise BundleError('not a vocald profile bundle')
+    if _HEAD.unpack(head)[1] > VERSION:
+        raise BundleError(f'bundle version {_HEAD.unpack(head)[1]} is newer than this app')
+    while True:
+        h = f.read(_FRAME.size)
+        if not h: raise BundleError('truncated bundle (no END frame)')
+        if len(h) < _FRAME.size: raise BundleError('truncated frame header')
+        kind, n, zn, crc = _FRAME.unpack(h)
+        z = f.read(zn)
+        if len(z) < zn: raise BundleError('truncated frame')
+        try:
+            raw = zlib.decompress(z)
+        except zlib.error:
+            raise BundleError(f'corrupt {kind.decode(errors="replace")} frame') from None
+        if len(raw) != n or zlib.crc32(raw) != crc:
+            raise BundleError(f'checksum mismatch in {kind.decode(errors="replace")} frame')
+        yield kind, raw
+        if kind == b'END ': return
+
+
+def _quant(X):
+    s = np.abs(X).max(1) / 127.0
+    s[s == 0] = 1.0
+    return s.astype(np.float32), np.round(X / s[:, None]).astype(np.int8)
+
+
+def _pack_profiles(rows, dim):
+    meta = [dict(zip(_PCOLS + ('count',), r[:6])) for r in rows]
+    X = np.zeros((len(rows), dim), np.float32)
+    for i, r in enumerate(rows):
+        if r[6] is not None and len(r[6]) == dim * 4:
+            X[i] = np.frombuffer(r[6], np.float32)
+        else:
+            meta[i]['count'] = 0            # no (or stale-dimension) vector
+    s, q = _quant(X)
+    j = json.dumps(meta, separators=(',', ':')).encode()
+    return struct.pack('<I', len(j)) + j + s.tobytes() + q.tobytes()
+
+
+def _unpack_profiles(raw, dim):
+    (n,) = struct.unpack_from('<I', raw)
+    meta = json.loads(raw[4:4 + n])
+    o = 4 + n
+    s = np.frombuffer(raw, np.float32, len(meta), o); o += 4 * len(meta)
+    q = np.frombuffer(raw, np.int8, len(meta) * dim, o).reshape(len(meta), dim)
+    return meta, q.astype(np.float32) * s[:, None]
+
+
+# ─── Export ───────────────────────────────────────────────────────────────────
+def _dim(conn):
+    r = conn.execute('SELECT length(mean) / 4, COUNT(*) c FROM profile_vectors '
+                     'GROUP BY 1 ORDER BY c DESC LIMIT 1').fetchone()
+    return int(r[0]) if r else 0
+
+
+def _speaker_fk(conn):
+    cols = {r[1] for r in conn.execute('PRAGMA table_info(speakers)')}
+    return next((c for c in ('recording_id', 'rec_id') if c in cols), None)
+
+
+def export(db_path, out, recordings=False, progress=None):
+    """Stream every profile (and optionally recording metadata) to `out`.
+    Returns {'profiles', 'recordings', 'bytes', 'secs'}."""
+    t0   = time.perf_counter()
+    conn = _connect(db_path)
+    dim  = _dim(conn)
+    org  = _origin(conn)
+    tot  = {'profiles': 0, 'recordings': 0}
+    tmp  = out + '.part'
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(_HEAD.pack(MAGIC, VERSION))
+            _write(f, b'META', json.dumps({'version': VERSION, 'created': time.time(),
+                                           'dim': dim, 'chunk': CHUNK,
+                                           'origin': org}).encode())
+            cur = conn.execute(
+                'SELECT p.id, p.name, p.total_recordings, p.first_seen, p.last_seen, '
+                'IFNULL(v.count, 0), v.mean FROM voice_profiles p '
+                'LEFT JOIN profile_vectors v ON v.profile_id = p.id ORDER BY p.id')
+            while rows := cur.fetchmany(CHUNK):
+                _write(f, b'PROF', _pack_profiles(rows, dim))
+                tot['profiles'] += len(rows)
+                if progress: progress('export', tot['profiles'])
+            fk = _speaker_fk(conn) if recordings else None
+            if recordings:
+                cur = conn.execute(f'SELECT id, {", ".join(_RCOLS)} FROM recordings '
+                                   f'WHERE processed = 1 ORDER BY id')
+                while rows := cur.fetchmany(CHUNK):
+                    recs = {r[0]: dict(zip(_RCOLS, r[1:]), speakers=[]) for r in rows}
+                    if fk:
+                        q = ','.join('?' * len(recs))
+                        for r in conn.execute(f'SELECT {fk}, {", ".join(_SCOLS)} FROM speakers '
+                                              f'WHERE {fk} IN ({q})', list(recs)):
+                            recs[r[0]]['speakers'].append(dict(zip(_SCOLS, r[1:])))
+                    _write(f, b'RECS', json.dumps(list(recs.values()),
+                                                  separators=(',', ':')).encode())
+                    tot['recordings'] += len(recs)
+            _write(f, b'END ', json.dumps(tot).encode())
+        os.replace(tmp, out)
+    finally:
+        conn.close()
+        if os.path.exists(tmp): os.remove(tmp)
+    tot['bytes'] = os.path.getsize(out)
+    tot['secs']  = time.perf_counter() - t0
+    return tot
+
+
+# ─── Import ───────────────────────────────────────────────────────────────────
+def verify(src):
+    """Checksum every frame and check the END totals without touching the DB.
+    Returns the totals; raises BundleError on any mismatch."""
+    seen = {'profiles': 0, 'recordings': 0}
+    with open(src, 'rb') as f:
+        for kind, raw in _frames(f):
+            if kind == b'PROF':
+                (n,) = struct.unpack_from('<I', raw)
+                seen['profiles'] += len(json.loads(raw[4:4 + n]))
+            elif kind == b'RECS':
+                seen['recordings'] += len(json.loads(raw))
+            elif kind == b'END ':
+                tot = json.loads(raw)
+                for k, v in seen.items():
+                    if tot.get(k, 0) != v:
+                        raise BundleError(f'{k[:-1]} count does not match the END frame')
+                return tot
+
+
+def _norm(X):
+    return X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-9)
+
+
+def _best(V, X, block=BLOCK):
+    """(index, score) of each row of V's closest row in X, `block` rows at a
+    time so only a block x len(X) score matrix is ever alive."""
+    idx = np.empty(len(V), np.int64)
+    sc  = np.empty(len(V), np.float32)
+    for a in range(0, len(V), block):
+        S = _norm(V[a:a + block]) @ X.T
+        idx[a:a + block] = S.argmax(1)
+        sc[a:a + block]  = S[np.arange(len(S)), idx[a:a + block]]
+    return idx, sc
+
+
+def _span(a, b, f):
+    return f([v for v in (a, b) if v], default=None)
+
+
+def _merge_into(conn, pid, p, v, prev=(0, 0)):
+    """Fold p into profile pid; `prev` is the (total, count) an earlier
+    import of the same source profile already brought in."""
+    import profile_store
+    row = conn.execute('SELECT total_recordings, first_seen, last_seen, name '
+                       'FROM voice_profiles WHERE id=?', (pid,)).fetchone()
+    conn.execute('UPDATE voice_profiles SET total_recordings=?, first_seen=?, '
+                 'last_seen=?, name=? WHERE id=?',
+                 ((row[0] or 0) + max(0, (p.get('total_recordings') or 0) - prev[0]),
+                  _span(row[1], p.get('first_seen'), min),
+                  _span(row[2], p.get('last_seen'), max),
+                  row[3] or p.get('name'), pid))
+    n = p['count'] - prev[1]
+    if v is None or n <= 0: return
+    cur = profile_store._get(conn, pid)
+    inc = (n, v, np.zeros_like(v), v[None, :])
+    if cur is None or len(cur[1]) != len(v):
+        profile_store._put(conn, pid, *inc)
+    else:
+        profile_store._put(conn, pid, *profile_store._combine([cur, inc]))
+
+
+def _seen(conn, org, src_id):
+    """(local pid, (total, count)) of an earlier import of this source
+    profile. The pid is None when it was never imported, or when its profile
+    has since been merged away; the totals still count as brought in."""
+    r = conn.execute('SELECT b.profile_id, b.total, b.count, p.id FROM bundle_imports b '
+                     'LEFT JOIN voice_profiles p ON p.id = b.profile_id '
+                     'WHERE b.origin=? AND b.src_id=?', (org, src_id)).fetchone()
+    return (r[3], (r[1], r[2])) if r else (None, (0, 0))
+
+
+def _insert(conn, p, v):
+    import profile_store
+    pid = conn.execute('INSERT INTO voice_profiles (name, total_recordings, first_seen, '
+                       'last_seen) VALUES (?,?,?,?)',
+                       [p.get(c) for c in _PCOLS[1:]]).lastrowid
+    if v is not None:
+        profile_store._put(conn, pid, p['count'], v, np.zeros_like(v), v[None, :])
+    return pid
+
+
+def _import_recs(conn, recs, idmap, fk):
+    n = 0
+    for r in recs:
+        if conn.execute('SELECT 1 FROM recordings WHERE filename=? AND call_date IS ?',
+                        (r['filename'], r['call_date'])).fetchone():
+            continue
+        rid = conn.execute(f'INSERT INTO recordings ({", ".join(_RCOLS)}, processed) '
+                           f'VALUES (?,?,?,?,?,1)', [r.get(c) for c in _RCOLS]).lastrowid
+        if fk:
+            conn.executemany(
+                f'INSERT INTO speakers ({fk}, {", ".join(_SCOLS)}) VALUES (?,?,?,?,?)',
+                [(rid, s.get('speaker_index'), s.get('name'), s.get('confidence'),
+                  idmap.get(s.get('voice_profile_id'))) for s in r['speakers']])
+        n += 1
+    return n
+
+
+def load(db_path, src, threshold=THRESHOLD, recordings=True, progress=None):
+    """Merge a bundle into the DB, one frame per transaction, after a first
+    streaming pass has verified every checksum and total (a damaged file
+    changes nothing).
+    Returns {'profiles', 'merged', 'added', 'known', 'recordings', 'secs'};
+    'known' counts profiles an earlier import of this origin already brought in."""
+    import profile_store
+    t0   = time.perf_counter()
+    verify(src)
+    conn = _connect(db_path)
+    rep  = {'profiles': 0, 'merged': 0, 'added': 0, 'known': 0, 'recordings': 0}
+    idmap, dim, org = {}, 0, None
+    ids, _, X = profile_store.load(conn)
+    fk = _speaker_fk(conn)
+    try:
+        with open(src, 'rb') as f:
+            for kind, raw in _frames(f):
+                if kind == b'META':
+                    m   = json.loads(raw)
+                    dim = m['dim']
+                    # bundles from before origin ids: the same file re-imported
+                    # still has the same creation time
+                    org = m.get('origin') or f'created:{m.get("created")}'
+                elif kind == b'PROF':
+                    meta, V = _unpack_profiles(raw, dim)
+                    have = dim and X.shape[1:] == (dim,) and len(ids)
+                    best, score = _best(V, X) if have else (None, None)
+                    new_ids, new_X = [], []
+                    with conn:
+                        for i, p in enumerate(meta):
+                            v = V[i] if p['count'] and dim else None
+                            j = int(best[i]) if have and v is not None else -1
+                            pid, prev = _seen(conn, org, p['id'])
+                            if pid is not None:
+                                _merge_into(conn, pid, p, v, prev); rep['known'] += 1
+                            elif j >= 0 and score[i] >= threshold:
+                                pid = ids[j]; _merge_into(conn, pid, p, v, prev)
+                                rep['merged'] += 1
+                            else:
+                                pid = _insert(conn, p, v); rep['added'] += 1
+                                if v is not None: new_ids.append(pid); new_X.append(v)
+                            conn.execute('INSERT OR REPLACE INTO bundle_imports '
+                                         'VALUES (?,?,?,?,?)',
+                                         (org, p['id'], pid,
+                                          max(prev[0], p.get('total_recordings') or 0),
+                                          max(prev[1], p['count'])))
+                            idmap[p['id']] = pid
+                    if new_X and dim:       # later chunks dedupe against these too
+                        ids = list(ids) + new_ids
+                        X = np.vstack([X.reshape(-1, dim), _norm(np.stack(new_X))])
+                    rep['profiles'] += len(meta)
+                    if progress: progress('import', rep['profiles'])
+                elif kind == b'RECS' and recordings:
+                    with conn:
+                        rep['recordings'] += _import_recs(conn, json.loads(raw), idmap, fk)
+    finally:
+        conn.close()
+    rep['secs'] = time.perf_counter() - t0
+    return rep
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+def main(argv=None):
+    import argparse, sys
+    from vocald_cli import DEFAULT_DATA_DIR, _emit
+    ap = argparse.ArgumentParser(prog='bundle', description='Export / import voice profiles.')
+    ap.add_argument('action', choices=('export', 'import'))
+    ap.add_argument('file')
+    ap.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    ap.add_argument('--recordings', action='store_true',
+                    help='export: include recording metadata and speakers')
+    ap.add_argument('--threshold', type=float, default=THRESHOLD,
+                    help='import: cosine score that merges into an existing profile')
+    a = ap.parse_args(argv)
+    import vocald_engine as engine
+    engine.init_engine(os.path.expanduser(a.data_dir))
+    try:
+        if a.action == 'export':
+            _emit(event='export', file=a.file, **export(engine.DB_PATH, a.file, a.recordings))
+        else:
+            _emit(event='import', file=a.file, **load(engine.DB_PATH, a.file, a.threshold))
+    except (OSError, BundleError) as e:
+        _emit(event='error', error=str(e)); return 1
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Battery- and thermal-aware pacing for background analysis.
+
+A Governor turns a (battery %, charging, CPU temperature) reading into a
+worker count and a pause between files. Readings come from a pluggable
+provider: SysProvider reads Linux/Android sysfs, StaticProvider returns fixed
+values (desktop default, tests).
+"""
+
+import glob, os, time
+from collections import namedtuple
+
+Reading = namedtuple('Reading', 'battery charging temp_c')
+
+
+# ─── Providers ────────────────────────────────────────────────────────────────
+def _read(path):
+    try:
+        with open(path) as f: return f.read().strip()
+    except OSError:
+        return None
+
+
+class SysProvider:
+    """/sys/class/power_supply + /sys/class/thermal. Missing data reads as None."""
+
+    def __init__(self, root='/sys/class'):
+        self.root = root
+
+    def _battery(self):
+        for d in sorted(glob.glob(os.path.join(self.root, 'power_supply', '*'))):
+            if (_read(os.path.join(d, 'type')) or '').lower() != 'battery': continue
+            cap = _read(os.path.join(d, 'capacity'))
+            st  = (_read(os.path.join(d, 'status')) or '').lower()
+            return (int(cap) if cap and cap.isdigit() else None,
+                    st in ('charging', 'full'))
+        return None, None
+
+    def _temp(self):
+        best = None
+        for d in glob.glob(os.path.join(self.root, 'thermal', 'thermal_zone*')):
+            kind = (_read(os.path.join(d, 'type')) or '').lower()
+            if not any(k in kind for k in ('cpu', 'soc', 'tsens', 'x86_pkg')): continue
+            t = _read(os.path.join(d, 'temp'))
+            try: c = int(t) / 1000.0
+            except (TypeError, ValueError): continue
+            if 0 < c < 150: best = c if best is None else max(best, c)
+        return best
+
+    def read(self):
+        bat, chg = self._battery()
+        return Reading(bat, chg, self._temp())
+
+
+class StaticProvider:
+    def __init__(self, battery=None, charging=None, temp_c=None):
+        self.reading = Reading(battery, charging, temp_c)
+
+    def read(self): return self.reading
+
+
+# ─── Governor ─────────────────────────────────────────────────────────────────
+HOT_C, CRITICAL_C = 48.0, 60.0
+LOW_BAT, CRIT_BAT = 40, 15
+HYST_C, HYST_BAT  = 3.0, 5      # a throttled band is left only this far past its limit
+
+
+class Governor:
+    """policy() -> (workers, pause_s), re-read at most every `interval` s."""
+
+    def __init__(self, provider=None, max_workers=1, interval=10.0):
+        self.provider    = provider or StaticProvider()
+        self.max_workers = max(1, max_workers)
+        self.interval    = interval
+        self.reason      = ''
+        self._at, self._pol = 0.0, (self.max_workers, 0.0)
+        self._heat = self._low = 0      # current thermal / battery band, 0-2
+
+    def decide(self, r):
+        """(workers, pause_s, reason) for one reading. Bands are sticky by
+        HYST_C / HYST_BAT, so a sensor hovering at a limit does not flip the
+        policy on every re-read."""
+        full, t, b = self.max_workers, r.temp_c, r.battery
+        self._heat = 0 if t is None else (
+            2 if t >= CRITICAL_C - (HYST_C if self._heat == 2 else 0) else
+            1 if t >= HOT_C - (HYST_C if self._heat >= 1 else 0) else 0)
+        self._low = 0 if r.charging or b is None else (
+            2 if b <= CRIT_BAT + (HYST_BAT if self._low == 2 else 0) else
+            1 if b <= LOW_BAT + (HYST_BAT if self._low >= 1 else 0) else 0)
+        if self._heat == 2: return 1, 30.0, f'CPU {t:.0f}C — cooling down'
+        if self._heat == 1: return 1, 5.0, f'CPU {t:.0f}C'
+        if r.charging or b is None: return full, 0.0, ''
+        if self._low == 2: return 1, 60.0, f'battery {b}%'
+        if self._low == 1: return 1, 2.0, f'battery {b}%'
+        return max(1, full // 2), 0.5, 'on battery'
+
+    def policy(self):
+        now = time.monotonic()
+        if now - self._at >= self.interval:
+            try:
+                w, p, self.reason = self.decide(self.provider.read())
+                self._pol = (w, p)
+            except Exception:
+                self._pol, self.reason = (self.max_workers, 0.0), ''
+            self._at = now
+        return self._pol
@@ -9,8 +9,9 @@ Fixes:
   5. Color theme updated to match web app (light blue-indigo palette)
 """
 
-import os, sys, threading
+import os, sys, threading, time
 from datetime import datetime
+from functools import partial
 
 os.environ['KIVY_NO_ENV_CONFIG'] = '1'
 from kivy.config import Config
@@ -18,8 +19,9 @@ Config.set('graphics', 'resizable', '1')
 
 from kivy.app               import App
 from kivy.clock             import Clock, mainthread
+from kivy.core.text         import Label as CoreLabel
 from kivy.core.window       import Window
-from kivy.graphics          import Color, Rectangle, RoundedRectangle
+from kivy.graphics          import Color, Line, Rectangle, RoundedRectangle
 from kivy.metrics           import dp, sp
 from kivy.storage.jsonstore import JsonStore
 from kivy.uix.boxlayout     import BoxLayout
@@ -36,6 +38,8 @@ from kivy.uix.textinput     import TextInput
 from kivy.uix.widget        import Widget
 from kivy.utils             import platform
 
+from records import Recording, Profile, label
+
 if platform == 'android':
     from android.permissions import request_permissions, Permission
     from android import mActivity, activity
@@ -76,16 +80,61 @@ def C(k):      return _C[k]
 def CA(k, a):  return _C[k][:3] + (a,)
 
 
-# ─── Canvas helper ────────────────────────────────────────────────────────────
-def _bg(w, color, r=0):
-    with w.canvas.before:
+# ─── Canvas helpers ───────────────────────────────────────────────────────────
+# One module-level handler per job, bound on every widget, instead of fresh
+# closures per widget; instructions live on the widget as attributes.
+def _sync_bg(w, *_):
+    w._bg_rect.pos = w.pos; w._bg_rect.size = w.size
+
+def _bg(w, color, r=0, canvas=None):
+    with (canvas or w.canvas.before):
         Color(*color)
-        rect = RoundedRectangle(radius=[S(r)]) if r else Rectangle()
-    def _s(*_): rect.pos = w.pos; rect.size = w.size
-    w.bind(pos=_s, size=_s)
+        w._bg_rect = RoundedRectangle(radius=[S(r)]) if r else Rectangle()
+    w.bind(pos=_sync_bg, size=_sync_bg)
+
+
+# Rendered text textures for strings that repeat across rows ('Pending',
+# 'Done', '2 spk', ...). Textures are white and tinted by a Color instruction,
+# so one texture serves every colour.
+_TEX = {}
+
+def _tex(text, fs, bold=False):
+    k = (text, round(fs, 2), bold)
+    t = _TEX.get(k)
+    if t is None:
+        if len(_TEX) >= 256: _TEX.clear()
+        cl = CoreLabel(text=text, font_size=fs, bold=bold)
+        cl.refresh()
+        t = _TEX[k] = cl.texture
+    return t
+
+def _place_tex(w, *_):
+    tw, th = w._tx.size
+    x = (w.x + (w.width - tw) / 2 if w._halign == 'center' else
+         w.right - tw if w._halign == 'right' else w.x)
+    w._tx.pos = (int(x), int(w.y + (w.height - th) / 2))
 
 
 # ─── Labels ───────────────────────────────────────────────────────────────────
+def _wrap_w(i, w):  i.text_size = (w, None)
+
+# a width change re-wraps every WrapLbl on screen and each re-render fires
+# texture_size; heights are applied once per frame from the final textures,
+# so the surrounding layouts relayout once rather than once per update
+_fit_due = set()
+
+def _fit_all(*_):
+    due = list(_fit_due); _fit_due.clear()
+    for i in due: i.height = i.texture_size[1]
+
+_fit_trigger = Clock.create_trigger(_fit_all)
+
+def _fit_h(i, ts):
+    _fit_due.add(i); _fit_trigger()
+def _row_w(i, w):   i.text_size = (w, i.height)
+def _fill_ts(i, s): i.text_size = s
+
+
 def WrapLbl(text, fs=13, color='text', bold=False, halign='left'):
     """Multiline — height grows to fit content via texture_size."""
     lbl = Label(
@@ -94,8 +143,7 @@ def WrapLbl(text, fs=13, color='text', bold=False, halign='left'):
         bold=bold, halign=halign, valign='top',
         size_hint_y=None, shorten=False,
     )
-    lbl.bind(width=lambda i, w: setattr(i, 'text_size', (w, None)))
-    lbl.bind(texture_size=lambda i, ts: setattr(i, 'height', ts[1]))
+    lbl.bind(width=_wrap_w, texture_size=_fit_h)
     lbl.height = F(fs) * 1.5
     return lbl
 
@@ -110,7 +158,7 @@ def RowLbl(text, fs=13, color='text', bold=False, halign='left'):
         size_hint_y=None, height=h,
         shorten=True, shorten_from='right',
     )
-    lbl.bind(width=lambda i, w: setattr(i, 'text_size', (w, h)))
+    lbl.bind(width=_row_w)
     return lbl
 
 
@@ -129,6 +177,19 @@ def FixLbl(text, fs=11, color='text', bold=False, halign='right', w_dp=70):
     return lbl
 
 
+def TexLbl(text, fs=11, color='text', bold=False, halign='right', w_dp=70):
+    """FixLbl look-alike for short repeating strings: draws a cached texture
+    instead of owning a Label and rendering its own."""
+    tex = _tex(text, F(fs), bold)
+    w = Widget(size_hint=(None, None), size=(S(w_dp), F(fs) * 1.7))
+    with w.canvas:
+        Color(*(C(color) if isinstance(color, str) else color))
+        w._tx = Rectangle(texture=tex, size=tex.size)
+    w._halign = halign
+    w.bind(pos=_place_tex, size=_place_tex)
+    return w
+
+
 # ─── Card — GridLayout so minimum_height WORKS ────────────────────────────────
 def Card(pad=14, sp=8, r=14):
     g = GridLayout(cols=1, size_hint_y=None,
@@ -144,14 +205,9 @@ def Pill(text, ck='primary', w_dp=76):
     Fixed-width pill. size_hint_x=None prevents it from stretching/shrinking
     inside a BoxLayout — the key fix for the overlap bug.
     """
-    g = GridLayout(cols=1,
-                   size_hint=(None, None),
-                   size=(S(w_dp), S(24)))
+    g = TexLbl(text, fs=9, color=ck, bold=True, halign='center', w_dp=w_dp)
+    g.height = S(24)
     _bg(g, CA(ck, 0.22), r=12)
-    lbl = Label(text=text, font_size=F(9), bold=True,
-                color=C(ck), halign='center', valign='middle')
-    lbl.bind(size=lambda i, s: setattr(i, 'text_size', s))
-    g.add_widget(lbl)
     return g
 
 
@@ -161,11 +217,7 @@ def Gap(h=8):
 
 def Divider():
     d = Widget(size_hint_y=None, height=dp(1))
-    with d.canvas:
-        Color(*C('border'))
-        r = Rectangle()
-    d.bind(pos=lambda i, v: setattr(r, 'pos', v),
-           size=lambda i, v: setattr(r, 'size', v))
+    _bg(d, C('border'), canvas=d.canvas)
     return d
 
 
@@ -174,10 +226,7 @@ def PBtn(text, cb=None, h=50, fs=14, ck='primary', r=12):
     btn = Button(text=text, size_hint=(1, None), height=S(h),
                  font_size=F(fs), bold=True,
                  background_color=(0,0,0,0), color=(1,1,1,1))  # white text on coloured bg
-    with btn.canvas.before:
-        Color(*C(ck)); rr = RoundedRectangle(radius=[S(r)])
-    btn.bind(pos=lambda i,v: setattr(rr,'pos',v),
-             size=lambda i,v: setattr(rr,'size',v))
+    _bg(btn, C(ck), r=r)
     if cb: btn.bind(on_press=cb)
     return btn
 
@@ -185,10 +234,7 @@ def GBtn(text, cb=None, h=46, fs=13, r=12):
     btn = Button(text=text, size_hint=(1, None), height=S(h),
                  font_size=F(fs), bold=False,
                  background_color=(0,0,0,0), color=C('text'))  # dark text on light bg
-    with btn.canvas.before:
-        Color(*C('border')); rr = RoundedRectangle(radius=[S(r)])
-    btn.bind(pos=lambda i,v: setattr(rr,'pos',v),
-             size=lambda i,v: setattr(rr,'size',v))
+    _bg(btn, C('border'), r=r)
     if cb: btn.bind(on_press=cb)
     return btn
 
@@ -199,6 +245,39 @@ def IBtn(icon, cb=None, sz=44, fs=20):
     return btn
 
 
+# ─── Waveform thumbnail ───────────────────────────────────────────────────────
+_SPK_COLORS = ('primary', 'warn', 'accent', 'danger')
+
+def WaveView(env, h=72):
+    """Peak/RMS envelope, with a speaker timeline strip underneath when the
+    envelope carries segment spans."""
+    w = Widget(size_hint_y=None, height=S(h))
+    w._env = env
+    w.bind(pos=_draw_wave, size=_draw_wave)
+    return w
+
+def _draw_wave(w, *_):
+    env = w._env
+    n, strip = len(env.peak), S(6) if env.spans else 0
+    if not n or w.width <= 1: return
+    mid, half = w.y + strip + (w.height - strip) / 2, (w.height - strip) / 2
+    dx = w.width / n
+    w.canvas.clear()
+    with w.canvas:
+        for arr, col in ((env.peak, CA('primary', .35)), (env.rms, C('primary'))):
+            Color(*col)
+            pts = []
+            for i, v in enumerate(arr.tolist()):
+                x, a = w.x + i * dx, half * v / 255
+                pts += (x, mid - a, x, mid + a)
+            Line(points=pts, width=1)
+        dur = env.duration_ms or 1
+        for a, b, k in env.spans:
+            Color(*C(_SPK_COLORS[k % len(_SPK_COLORS)]))
+            Rectangle(pos=(w.x + w.width * a / dur, w.y),
+                      size=(max(1, w.width * (b - a) / dur), strip))
+
+
 # ─── Top bar ──────────────────────────────────────────────────────────────────
 def TopBar(title, back_cb=None, extras=None):
     bar = BoxLayout(size_hint_y=None, height=S(56),
@@ -208,7 +287,7 @@ def TopBar(title, back_cb=None, extras=None):
         bar.add_widget(IBtn('<', cb=lambda _: back_cb(), sz=46, fs=18))
     lbl = Label(text=title, font_size=F(16), bold=True,
                 color=C('accent'), halign='left', valign='middle')
-    lbl.bind(size=lambda i, s: setattr(i, 'text_size', s))
+    lbl.bind(size=_fill_ts)
     bar.add_widget(lbl)
     if extras:
         for e in extras: bar.add_widget(e)
@@ -267,10 +346,23 @@ class _ST:
     app_dir            = ''
     is_analysing       = False
     analysis_cancelled = False
+    workers            = 1      # >1 → analysis.Pool worker processes
+    two_pass           = True   # quick preview rows before the full pass
+    db_busy            = False  # wipe / VACUUM running in the background
+    auto_ingest        = True   # watch the folder and analyse new files
+    supervised         = False  # analyse in killable worker processes (opt-in)
 
 ST = _ST()
 
 
+def _governor():
+    """Pacing for background scans: sysfs readings on Android/Linux, so a
+    big backlog only runs flat out while charging and cool."""
+    from governor import Governor, SysProvider, StaticProvider
+    prov = SysProvider() if platform in ('android', 'linux') else StaticProvider()
+    return Governor(prov, max_workers=ST.workers)
+
+
 # ─── Base screen ──────────────────────────────────────────────────────────────
 class Scr(Screen):
     def __init__(self, **kw):
@@ -492,9 +584,24 @@ class OnboardingScreen(Scr):
 # ═══════════════════════════════════════════════════════════════════════════════
 class LogsScreen(Scr):
 
+    _FLUSH_S = 0.25     # min gap between live list updates during a scan
+    _PREVIEW_MAX = 24   # preview pass: at most this many files ...
+    _PREVIEW_S   = 15.0 # ... or this many seconds before the full pass starts
+    _CHUNK   = 40       # cards built per frame by _render
+
     def __init__(self, **kw):
         super().__init__(**kw)
-        self._recs = []
+        self._recs    = []
+        self._rows    = {}           # rid -> card currently shown in the list
+        self._st      = {'recordings': 0, 'voice_profiles': 0}
+        self._vids    = set()        # known voice profile ids (status counter)
+        self._pending = {}           # rid -> rec waiting for the next flush
+        self._prev    = {}           # filename -> id of its 'Preview' row
+        self._watch   = None         # watcher.Watcher on ST.folder_path
+        self._queue   = []           # finished new files awaiting analysis
+        self._plock   = threading.Lock()
+        self._flush_ev = None
+        self._gen     = 0            # bumps on every full render
         self._build()
 
     def _build(self):
@@ -559,35 +666,131 @@ class LogsScreen(Scr):
         root.add_widget(sv)
         self.add_widget(root)
 
-    def on_enter(self): self._refresh()
+    def on_enter(self):
+        self._refresh()
+        self.watch()
 
     def _refresh(self):
         import vocald_engine as engine
-        self._recs = engine.get_all_recordings()
-        st = engine.get_db_stats()
+        self._recs = Recording.many(engine.get_all_recordings())
+        self._st   = engine.get_db_stats()
+        self._vids = {p['id'] for p in engine.get_voice_profiles()}
+        self._status_txt()
+        self._render(self._recs)
+
+    def _status_txt(self):
         fd = os.path.basename(ST.folder_path) or 'No folder'
         self._status.text = (
-            f'{fd}  |  {st["recordings"]} recordings'
-            f'  |  {st["voice_profiles"]} voices')
-        self._render(self._recs)
+            f'{fd}  |  {self._st["recordings"]} recordings'
+            f'  |  {self._st["voice_profiles"]} voices')
+
+    def _match(self, r, q):
+        return (q in r.filename.lower() or
+                q in (r.phone_number or '').lower())
 
     def _onsrch(self, _, t):
         q = t.lower().strip()
         self._render(self._recs if not q else [
-            r for r in self._recs
-            if q in r['filename'].lower() or
-               q in (r.get('phone_number') or '').lower()])
+            r for r in self._recs if self._match(r, q)])
 
     def _render(self, recs):
         self._list.clear_widgets()
+        self._rows = {}
+        self._gen += 1
         if not recs:
             self._list.add_widget(Gap(36))
             self._list.add_widget(WrapLbl(
                 'No recordings yet.\nTap SCAN to check for new calls.',
                 fs=13, color='muted', halign='center'))
             return
-        for r in recs:
-            self._list.add_widget(self._card(r))
+        self._render_chunk(list(recs), 0, self._gen)
+
+    def _render_chunk(self, recs, start, gen, *_):
+        """Build cards a screenful at a time so the first rows paint at once
+        and long lists never block a frame."""
+        if gen != self._gen: return          # superseded by a newer render
+        for r in recs[start:start + self._CHUNK]:
+            if r.id in self._rows: continue  # already streamed in by _flush
+            card = self._card(r)
+            self._rows[r.id] = card
+            self._list.add_widget(card, index=0)
+        if start + self._CHUNK < len(recs):
+            Clock.schedule_once(partial(self._render_chunk, recs,
+                                        start + self._CHUNK, gen))
+
+    # ── live updates while a scan runs ────────────────────────────────────────
+    def _stream(self, engine, rid):
+        """Worker side: fetch one committed row and queue it for display."""
+        try:
+            rec = engine.get_recording_detail(rid)
+        except Exception:
+            return
+        if not rec: return
+        rec = Recording(rec)
+        with self._plock:
+            self._pending[rid] = rec
+            if self._flush_ev: return
+            self._flush_ev = True
+        Clock.schedule_once(self._flush, self._FLUSH_S)
+
+    def _flush(self, *_):
+        """Main thread: insert or update only the rows that changed."""
+        with self._plock:
+            batch, self._pending = self._pending, {}
+            self._flush_ev = None
+            done = {self._prev.pop(r.filename) for rid, r in batch.items()
+                    if rid > 0 and r.filename in self._prev}
+        q = self._srch.text.lower().strip()
+        for rid in done:
+            if rid not in batch: self._drop(rid)
+        for rid, rec in batch.items():
+            if rid in done: continue            # superseded in this same batch
+            pos = next((i for i, r in enumerate(self._recs)
+                        if r.id == rid), None)
+            if pos is None:
+                self._recs.insert(0, rec)
+                if rid > 0: self._st['recordings'] += 1
+            else:
+                self._recs[pos] = rec
+            for s in rec.speakers if rid > 0 else ():
+                if s.voice_profile_id: self._vids.add(s.voice_profile_id)
+            self._st['voice_profiles'] = len(self._vids)     # distinct ids
+
+            old = self._rows.pop(rid, None)
+            if q and not self._match(rec, q):
+                if old: self._list.remove_widget(old)
+                continue
+            card = self._card(rec)
+            self._rows[rid] = card
+            if old:
+                idx = self._list.children.index(old)
+                self._list.remove_widget(old)
+                self._list.add_widget(card, index=idx)
+            else:
+                if len(self._rows) == 1: self._list.clear_widgets()
+                # children are stored bottom-up, so the last index is the top
+                self._list.add_widget(card, index=len(self._list.children))
+        self._status_txt()
+
+    def _drop(self, rid):
+        self._recs = [r for r in self._recs if r.id != rid]
+        old = self._rows.pop(rid, None)
+        if old: self._list.remove_widget(old)
+
+    def _preview(self, i, fi, sp):
+        """Worker side: show a provisional row (negative id, not in the DB)
+        until the full pass commits the real one."""
+        spk = sp.get('speakers', []) if isinstance(sp, dict) else list(sp or ())
+        rec = Recording({'id': -(i + 1), 'filename': fi['filename'],
+                         'call_date': fi['estimated_call_time'].isoformat(),
+                         'call_duration': 0, 'processed': 3,
+                         'total_speakers': len(spk), 'speakers': spk})
+        with self._plock:
+            self._prev[fi['filename']] = rec.id
+            self._pending[rec.id] = rec
+            if self._flush_ev: return
+            self._flush_ev = True
+        Clock.schedule_once(self._flush, self._FLUSH_S)
 
     def _card(self, rec):
         """
@@ -608,57 +811,49 @@ class LogsScreen(Scr):
         it stops BoxLayout from compressing it onto the phone text.
         """
         card = Card(pad=12, sp=7)
-        card._rid = rec['id']
+        card._rid = rec.id
 
         # Row 1 ────────────────────────────────────────────────────────────────
         r1 = BoxLayout(size_hint_y=None, height=S(30), spacing=S(8))
 
-        ph = rec.get('phone_number') or 'Unknown number'
+        ph = rec.phone_number or 'Unknown number'
         phone_lbl = RowLbl(ph, fs=13, bold=True, color='text')
         # size_hint_x=1 means it takes all space AFTER the pill
         phone_lbl.size_hint_x = 1
         r1.add_widget(phone_lbl)
 
-        status = rec.get('processed', 0)
-        pk = ('warn', 'primary', 'danger')[min(status, 2)]
-        pt = ('Pending', 'Done', 'Failed')[min(status, 2)]
+        status = rec.processed or 0
+        pk = ('warn', 'primary', 'danger', 'accent')[min(status, 3)]
+        pt = ('Pending', 'Done', 'Failed', 'Preview')[min(status, 3)]
         pill = Pill(pt, ck=pk, w_dp=68)
         # size_hint_x=None + explicit width = NEVER shrinks or overlaps
         pill.size_hint_x = None
         r1.add_widget(pill)
         card.add_widget(r1)
 
-        # Row 2: filename — wraps freely, no fixed height ──────────────────────
-        # URL-decode for readability
-        try:
-            from urllib.parse import unquote
-            fname = unquote(rec['filename'])
-        except Exception:
-            fname = rec['filename']
-        card.add_widget(WrapLbl(fname, fs=10.5, color='muted'))
+        # Row 2: filename (URL-decoded) — wraps freely, no fixed height ──────
+        card.add_widget(WrapLbl(rec.title, fs=10.5, color='muted'))
 
         # Row 3 ────────────────────────────────────────────────────────────────
         r3 = BoxLayout(size_hint_y=None, height=S(22), spacing=S(6))
-        try:
-            dt = datetime.fromisoformat(rec['call_date'])
-            ds = dt.strftime('%d %b %Y  %I:%M %p')
-        except Exception:
-            ds = rec.get('call_date', '')[:16].replace('T', '  ')
-        r3.add_widget(RowLbl(ds, fs=9.5, color='muted'))
+        r3.add_widget(RowLbl(rec.when, fs=9.5, color='muted'))
 
-        dur = rec.get('call_duration', 0)
+        dur = rec.call_duration
         if dur:
             r3.add_widget(FixLbl(f'{dur}s', fs=9.5, color='muted',
                                  halign='right', w_dp=46))
-        r3.add_widget(FixLbl(str(rec.get('total_speakers', 0)) + ' spk',
+        r3.add_widget(TexLbl(f'{rec.total_speakers or 0} spk',
                              fs=9.5, color='accent', halign='right', w_dp=42))
         card.add_widget(r3)
 
-        card.bind(on_touch_up=lambda i, t:
-                  self._open(i._rid) if i.collide_point(*t.pos) else None)
+        card.bind(on_touch_up=self._tap)
         return card
 
+    def _tap(self, card, touch):
+        if card.collide_point(*touch.pos): self._open(card._rid)
+
     def _open(self, rid):
+        if rid < 0: Toast('Preview only — full analysis running'); return
         app = App.get_running_app()
         app.sm.get_screen('detail').load(rid)
         app.sm.transition = SlideTransition(direction='left')
@@ -671,10 +866,12 @@ class LogsScreen(Scr):
 
     def _scan(self, *_):
         if ST.is_analysing: Toast('Already analysing'); return
+        if ST.db_busy: Toast('Database maintenance running'); return
         if not ST.folder_path: Toast('No folder set — go to Settings'); return
         threading.Thread(target=self._run_scan, daemon=True).start()
 
     def _upload(self, *_):
+        if ST.db_busy: Toast('Database maintenance running'); return
         if platform == 'android':
             Intent = autoclass('android.content.Intent')
             i = Intent(Intent.ACTION_GET_CONTENT); i.setType('audio/*')
@@ -695,65 +892,176 @@ class LogsScreen(Scr):
         p.open()
 
     def _do_upl(self, ti, p):
+        import audiohdr
         path = ti.text.strip(); p.dismiss()
-        if path and os.path.isfile(path):
-            threading.Thread(target=self._run_file,
-                             args=(path,), daemon=True).start()
-        else: Toast('File not found')
+        if not (path and os.path.isfile(path)): Toast('File not found'); return
+        if audiohdr.what(path) is None: Toast('Not a supported audio file'); return
+        threading.Thread(target=self._run_file,
+                         args=(path,), daemon=True).start()
 
     def upload_file_from_android(self, fp):
         threading.Thread(target=self._run_file, args=(fp,), daemon=True).start()
 
-    def _run_scan(self):
-        import vocald_engine as engine
+    # ── auto-ingest ───────────────────────────────────────────────────────────
+    def watch(self):
+        """(Re)start the folder watcher to match the folder / auto-import setting."""
+        want = ST.folder_path if ST.auto_ingest and os.path.isdir(ST.folder_path or '') else None
+        if self._watch and self._watch.folder == want: return
+        if self._watch: self._watch.stop(); self._watch = None
+        if want:
+            import watcher, vocald_engine as engine
+            self._watch = watcher.Watcher(want, self._ingest,
+                                          engine.is_file_processed).start()
+
+    @mainthread
+    def _ingest(self, fi):
+        if all(q['filepath'] != fi['filepath'] for q in self._queue):
+            self._queue.append(fi)
+        self._drain()
+
+    def _drain(self):
+        """Analyse queued files now, unless another job holds the DB."""
+        if not self._queue or ST.is_analysing or ST.db_busy: return
+        files, self._queue = self._queue, []
+        threading.Thread(target=self._run_scan, args=(files,), daemon=True).start()
+
+    def _run_scan(self, files=None):
+        import asyncio, pipeline, vocald_engine as engine
+        from analysis import (Pool, analyse_file, batch_mark, commit, preview,
+                              preview_file, settle, sniff)
         from folder_scanner import scan_folder
         ST.is_analysing = True; ST.analysis_cancelled = False
         self._ui(True)
-        new = scan_folder(ST.folder_path, engine.is_file_processed)
-        if not new:
-            self._pu('All up to date', 100)
-            Clock.schedule_once(lambda _: self._ui(False), 1.5)
-            ST.is_analysing = False
-            Clock.schedule_once(lambda _: self._refresh(), 1.6); return
-        total = len(new)
-        for i, fi in enumerate(new):
-            if ST.analysis_cancelled: break
-            fn = fi['filename']; fp = fi['filepath']
-            self._pu(f'[{i+1}/{total}]  {fn}', int(i/total*90))
-            rid = engine.create_recording_entry(
-                fn, fp, fi['estimated_call_time'].isoformat())
+        n = {'total': 0, 'seen': 0}
+
+        def scan():
+            # queued files may have been analysed by a scan that ran while
+            # they waited: filter them again, as scan_folder does
+            new = ([fi for fi in files if os.path.exists(fi['filepath']) and
+                    not engine.is_file_processed(fi['filename'], fi['modified_ms'])]
+                   if files is not None else
+                   scan_folder(ST.folder_path, engine.is_file_processed))
+            n['total'] = len(new)
+            self._pu(f'Found {len(new)} new recordings', 0)
+            return new
+
+        def analyse(fi):
+            t = datetime.now()
+            sniff(fi['filepath'])
+            sp = engine.analyse_audio_file(fi['filepath'], fi['filename'],
+                                           lambda s: self._pu(s, None))
+            return sp, (datetime.now() - t).total_seconds()
+
+        def write(items):
+            ok = 0
+            for fi, sp, err, _ in items:
+                fn  = fi['filename']
+                rid = engine.create_recording_entry(
+                    fn, fi['filepath'], fi['estimated_call_time'].isoformat())
+                try:
+                    if err: raise err
+                    commit(engine, rid, sp, fn, fi['modified_ms'], fi['filepath'],
+                           mark); ok += 1
+                except Exception as e:
+                    engine.mark_recording_failed(rid, str(e))
+                self._stream(engine, rid)
+                n['seen'] += 1
+                slow = f'  (slowed: {gov.reason})' if gov.reason else ''
+                self._pu(f'[{n["seen"]}/{n["total"]}]  {fn}{slow}',
+                         int(n['seen'] / n['total'] * 100))
+            return ok
+
+        def quick(files, run):
+            """First pass: provisional rows for the head of the backlog, bounded
+            in count and time so the full pass is never held up for long."""
+            if not ST.two_pass or len(files) < 2: return files
+            head = files[:self._PREVIEW_MAX]
+            self._pu(f'Previewing {len(head)} of {len(files)} recordings...', 0)
+            end = time.monotonic() + self._PREVIEW_S
+            it  = run(head)
             try:
-                sp = engine.analyse_audio_file(
-                    fp, fn, lambda s: self._pu(s, None))
-                engine.update_recording_after_analysis(rid, sp)
-                engine.mark_file_processed(fn, fi['modified_ms'])
-            except Exception as e:
-                engine.mark_recording_failed(rid, str(e))
-        self._pu('Scan complete', 100)
-        Clock.schedule_once(lambda _: self._ui(False), 1.2)
-        Clock.schedule_once(lambda _: self._refresh(), 1.3)
-        ST.is_analysing = False
+                for i, (fi, sp) in enumerate(zip(head, it)):
+                    if sp is not None: self._preview(i, fi, sp)
+                    if ST.analysis_cancelled or time.monotonic() > end: break
+            finally:
+                if hasattr(it, 'close'): it.close()      # cancels queued pool work
+            return files
+
+        def quick_local(files):
+            for fi in files:
+                try: yield preview(engine, fi)
+                except Exception: yield None
+
+        cancelled = lambda: ST.analysis_cancelled
+        gov = _governor()
+        try:
+            mark = batch_mark(engine.DB_PATH)
+            if ST.supervised:
+                from supervisor import Supervisor
+                with Supervisor(ST.app_dir, ST.workers, cancelled=cancelled,
+                                progress=lambda s: self._pu(s, None)) as sup:
+                    pscan = lambda: quick(scan(), lambda f: map(sup.preview, f))
+                    st = asyncio.run(pipeline.run(
+                        pscan, sup.analyse, write, infer=sup.workers,
+                        cancelled=cancelled, governor=gov))
+            elif ST.workers > 1:
+                with Pool(ST.app_dir, ST.workers) as pool:
+                    pscan = lambda: quick(scan(), lambda f:
+                                          pool.executor.map(preview_file, f))
+                    st = asyncio.run(pipeline.run(
+                        pscan, analyse_file, write, executor=pool.executor,
+                        infer=ST.workers, cancelled=cancelled, governor=gov))
+            else:
+                st = asyncio.run(pipeline.run(lambda: quick(scan(), quick_local),
+                                              analyse, write,
+                                              cancelled=cancelled, governor=gov))
+            msg = ('All up to date' if not st['files'] else
+                   f'Scan complete  |  {st["done"]} done, {st["failed"]} failed')
+            if ST.workers > 1 and st['done'] > 1:      # workers enrol in isolation
+                dup = settle(engine.DB_PATH, mark)
+                if dup: msg += f'  |  {dup} possible duplicate profiles to review'
+        except Exception as e:
+            msg = f'Scan failed: {e}'
+        self._finish(msg)
 
     def _run_file(self, path):
         import vocald_engine as engine
-        ST.is_analysing = True; self._ui(True)
+        from analysis import sniff, commit, mtime_ms
+        ST.is_analysing = True; ST.analysis_cancelled = False; self._ui(True)
         fn = os.path.basename(path)
         self._pu(f'Analysing: {fn}', 10)
         rid = engine.create_recording_entry(fn, path, datetime.now().isoformat())
+        self._stream(engine, rid)
         try:
-            sp = engine.analyse_audio_file(
-                path, fn, lambda s: self._pu(s, None))
-            engine.update_recording_after_analysis(rid, sp)
-            engine.mark_file_processed(fn, int(os.path.getmtime(path)*1000))
+            sniff(path)
+            if ST.supervised:
+                from supervisor import Supervisor
+                with Supervisor(ST.app_dir, progress=lambda s: self._pu(s, None),
+                                cancelled=lambda: ST.analysis_cancelled) as sup:
+                    sp, _ = sup.analyse({'filepath': path, 'filename': fn})
+            else:
+                sp = engine.analyse_audio_file(
+                    path, fn, lambda s: self._pu(s, None))
+            commit(engine, rid, sp, fn, mtime_ms(path), path)
         except Exception as e:
             engine.mark_recording_failed(rid, str(e))
-        self._pu('Done', 100)
-        Clock.schedule_once(lambda _: self._ui(False), 1.2)
-        Clock.schedule_once(lambda _: self._refresh(), 1.3)
-        ST.is_analysing = False
+        self._stream(engine, rid)
+        self._finish(f'Done: {fn}')
 
     def _cancel(self, *_): ST.analysis_cancelled = True; Toast('Cancelling...')
 
+    @mainthread
+    def _finish(self, msg):
+        """Work is over: show the last rows and release the UI right away."""
+        ST.is_analysing = False
+        self._flush()
+        with self._plock:
+            left, self._prev = list(self._prev.values()), {}
+        for rid in left: self._drop(rid)                  # cancelled previews
+        self._ui(False)
+        Toast(msg)
+        self._drain()
+
     @mainthread
     def _ui(self, on):
         self._prog.opacity      = 1 if on else 0
@@ -774,7 +1082,7 @@ class DetailScreen(Scr):
 
     def __init__(self, **kw):
         super().__init__(**kw)
-        self._rec = {}
+        self._rec = None
         root = BoxLayout(orientation='vertical')
         _bg(root, C('bg'))
         root.add_widget(TopBar('Recording Detail', back_cb=self._back))
@@ -788,7 +1096,8 @@ class DetailScreen(Scr):
 
     def load(self, rid):
         import vocald_engine as engine
-        self._rec = engine.get_recording_detail(rid)
+        rec = engine.get_recording_detail(rid)
+        self._rec = Recording(rec) if rec else None
         self._render()
 
     def _render(self):
@@ -806,27 +1115,31 @@ class DetailScreen(Scr):
         # Each field: bold label line + value line below it (stacked, never side-by-side)
         # This is the safest layout — no column alignment issues
         for lbl_txt, val_txt in [
-            ('Phone',    rec.get('phone_number') or 'Unknown'),
-            ('Date',     rec.get('call_date', '')[:19].replace('T', '  ')),
-            ('Duration', f'{rec.get("call_duration", 0)} seconds'),
-            ('File',     rec.get('filename', '')),
+            ('Phone',    rec.phone_number or 'Unknown'),
+            ('Date',     rec.when_long),
+            ('Duration', f'{rec.call_duration or 0} seconds'),
+            ('File',     rec.title),
         ]:
             meta.add_widget(WrapLbl(lbl_txt, fs=10.5, bold=True, color='muted'))
-            # URL-decode file paths for readability
-            try:
-                from urllib.parse import unquote
-                display_val = unquote(str(val_txt))
-            except Exception:
-                display_val = str(val_txt)
-            meta.add_widget(WrapLbl(display_val, fs=12, color='text'))
+            meta.add_widget(WrapLbl(val_txt, fs=12, color='text'))
             meta.add_widget(Gap(6))
 
         self._col.add_widget(meta)
+
+        env = self._wave(rec.id)
+        if env is not None:
+            wc = Card()
+            wc.add_widget(WrapLbl('Waveform', fs=12, bold=True, color='accent'))
+            wc.add_widget(WaveView(env))
+            self._col.add_widget(wc)
+        elif not (rec.filename or '').lower().endswith('.wav'):
+            self._col.add_widget(WrapLbl('Waveform preview is available for WAV '
+                                         'recordings only.', fs=10, color='muted'))
         self._col.add_widget(Gap(4))
         self._col.add_widget(WrapLbl('Identified Speakers', fs=14,
                                      bold=True, color='accent'))
 
-        spks = rec.get('speakers', [])
+        spks = rec.speakers
         if not spks:
             self._col.add_widget(WrapLbl('No speakers identified.',
                                          fs=12, color='muted'))
@@ -834,25 +1147,25 @@ class DetailScreen(Scr):
             for s in spks:
                 self._col.add_widget(self._spk_card(s))
 
-    def _spk_card(self, spk):
-        c = Card()
-
-        # Speaker name — full width, wraps if long
-        # URL-decode the name too
+    def _wave(self, rid):
         try:
-            from urllib.parse import unquote
-            name = unquote(str(spk.get('name', 'Unknown')))
+            import waveform, vocald_engine as engine
+            return waveform.store_for(engine.DB_PATH).get(rid)
         except Exception:
-            name = str(spk.get('name', 'Unknown'))
+            return None
 
-        c.add_widget(WrapLbl(name, fs=14, bold=True, color='text'))
+    def _spk_card(self, spk):
+        c = Card()
+
+        # Speaker name (URL-decoded) — full width, wraps if long
+        c.add_widget(WrapLbl(spk.title, fs=14, bold=True, color='text'))
         c.add_widget(Gap(4))
 
-        conf = spk.get('confidence', 0)
+        conf = spk.confidence or 0
         c.add_widget(WrapLbl(f'Confidence: {conf:.1f}%', fs=11, color='muted'))
 
-        if spk.get('voice_profile_id'):
-            c.add_widget(WrapLbl(f'Voice Profile #{spk["voice_profile_id"]}',
+        if spk.voice_profile_id:
+            c.add_widget(WrapLbl(f'Voice Profile #{spk.voice_profile_id}',
                                  fs=10, color='accent'))
         c.add_widget(Gap(6))
 
@@ -866,11 +1179,7 @@ class DetailScreen(Scr):
         return c
 
     def _edit(self, spk):
-        try:
-            from urllib.parse import unquote
-            name = unquote(str(spk.get('name', '')))
-        except Exception:
-            name = str(spk.get('name', ''))
+        name = label(spk.name or '')
 
         c = GridLayout(cols=1, size_hint_y=None, padding=[S(16)], spacing=S(12))
         c.bind(minimum_height=c.setter('height'))
@@ -885,9 +1194,8 @@ class DetailScreen(Scr):
             n = ti.text.strip()
             if not n: Toast('Name cannot be empty'); return
             import vocald_engine as engine
-            engine.update_speaker_name(self._rec['id'],
-                                       spk['speaker_index'], n)
-            p.dismiss(); self.load(self._rec['id'])
+            engine.update_speaker_name(self._rec.id, spk.speaker_index, n)
+            p.dismiss(); self.load(self._rec.id)
 
         c.add_widget(PBtn('Save', cb=_save, h=46))
         p.open()
@@ -921,7 +1229,7 @@ class ProfilesScreen(Scr):
     def _refresh(self):
         import vocald_engine as engine
         self._col.clear_widgets()
-        profiles = engine.get_voice_profiles()
+        profiles = Profile.many(engine.get_voice_profiles())
         stats    = engine.get_db_stats()
 
         sc = Card()
@@ -932,6 +1240,29 @@ class ProfilesScreen(Scr):
         sc.add_widget(Gap(4))
         sc.add_widget(WrapLbl('Voice fingerprints stored locally on device.',
                               fs=10.5, color='muted'))
+        try:
+            from profile_store import phone_stats as ps
+            if ps['hits'] or ps['misses']:
+                sc.add_widget(WrapLbl(
+                    f'Duplicate check: {ps["hits"]} settled by the caller\'s earlier '
+                    f'voices  |  {ps["misses"]} needed a full search',
+                    fs=10, color='muted'))
+        except Exception: pass
+        try:
+            from profile_store import pending
+            n = pending(engine.DB_PATH)
+            if n:
+                sc.add_widget(WrapLbl(
+                    f'{n} new profiles sound like existing voices — '
+                    f'review them with Merge Duplicates.', fs=10, color='warn'))
+        except Exception: pass
+        sc.add_widget(Gap(4))
+        sc.add_widget(GBtn('Merge Duplicates', cb=lambda _: self._dedup(),
+                           h=38, fs=12))
+        row = BoxLayout(size_hint_y=None, height=S(38), spacing=S(10))
+        row.add_widget(GBtn('Export', cb=lambda _: self._export(), h=38, fs=12))
+        row.add_widget(GBtn('Import', cb=lambda _: self._import(), h=38, fs=12))
+        sc.add_widget(row)
         self._col.add_widget(sc)
 
         if not profiles:
@@ -941,20 +1272,146 @@ class ProfilesScreen(Scr):
                 fs=12, color='muted', halign='center'))
             return
 
+        talk = self._talk()
         for p in profiles:
             c = Card()
             # Name row with recording count — pill on separate line avoids overlap
-            c.add_widget(WrapLbl(f'#{p["id"]}  {p["name"]}',
+            c.add_widget(WrapLbl(f'#{p.id}  {p.title}',
                                  fs=13, bold=True, color='text'))
-            c.add_widget(WrapLbl(f'{p["total_recordings"]} recordings',
+            c.add_widget(WrapLbl(f'{p.total_recordings} recordings',
                                  fs=10, color='accent'))
             try:
                 c.add_widget(WrapLbl(
-                    f'First: {p["first_seen"][:10]}  |  Last: {p["last_seen"][:10]}',
+                    f'First: {p.first_seen[:10]}  |  Last: {p.last_seen[:10]}',
                     fs=10, color='muted'))
             except Exception: pass
+            if p.id in talk:
+                secs, _, calls = talk[p.id]
+                c.add_widget(WrapLbl(
+                    f'This month: {int(secs // 60)}m {int(secs % 60)}s over {calls} calls',
+                    fs=10, color='muted'))
             self._col.add_widget(c)
 
+    def _talk(self):
+        try:
+            import sqlite3, timeline, vocald_engine as engine
+            conn = sqlite3.connect(engine.DB_PATH)     # read-only: no schema
+            try: return timeline.talk_time(conn)
+            finally: conn.close()
+        except Exception:
+            return {}
+
+    # ── duplicate consolidation ───────────────────────────────────────────────
+    def _dedup(self):
+        if ST.is_analysing or ST.db_busy: Toast('Wait for the current task to finish'); return
+        threading.Thread(target=self._dedup_bg, args=(False,), daemon=True).start()
+
+    def _dedup_apply(self, p):
+        p.dismiss()
+        if ST.is_analysing or ST.db_busy: Toast('Wait for the current task to finish'); return
+        ST.db_busy = True
+        threading.Thread(target=self._dedup_bg, args=(True,), daemon=True).start()
+
+    def _dedup_bg(self, apply):
+        import profile_store, vocald_engine as engine
+        try:
+            rep = profile_store.consolidate(engine.DB_PATH, apply=apply)
+        except Exception as e:
+            self._dedup_err(str(e)); return
+        (self._dedup_done if apply else self._dedup_ask)(rep)
+
+    @mainthread
+    def _dedup_err(self, msg):
+        ST.db_busy = False
+        Toast(f'Merge failed: {msg}')
+
+    @mainthread
+    def _dedup_ask(self, rep):
+        if not rep['groups']:
+            Toast(f'No duplicates among {rep["profiles_compared"]} comparable profiles'); return
+        c = GridLayout(cols=1, size_hint_y=None, padding=[S(16)], spacing=S(12))
+        c.bind(minimum_height=c.setter('height'))
+        _bg(c, C('surface'))
+        c.add_widget(WrapLbl(
+            f'{len(rep["groups"])} groups of near-identical voices.\n'
+            f'{rep["profiles_before"]} -> {rep["profiles_after"]} profiles.',
+            fs=12, color='muted'))
+        if rep['profiles_compared'] < rep['profiles_before']:
+            c.add_widget(WrapLbl(
+                f'Only {rep["profiles_compared"]} of {rep["profiles_before"]} profiles '
+                f'have a stored fingerprint; the rest were not compared.',
+                fs=10, color='muted'))
+        row = BoxLayout(size_hint_y=None, height=S(46), spacing=S(10))
+        p = MkPopup('Merge Profiles', c, h=270)
+        row.add_widget(GBtn('Cancel', cb=lambda _: p.dismiss(), h=46))
+        row.add_widget(PBtn('MERGE', h=46, cb=lambda _: self._dedup_apply(p)))
+        c.add_widget(row)
+        p.open()
+
+    # ── export / import ───────────────────────────────────────────────────────
+    def _bundle_dir(self):
+        return ST.folder_path if os.path.isdir(ST.folder_path or '') else ST.app_dir
+
+    def _export(self):
+        if ST.is_analysing or ST.db_busy: Toast('Wait for the current task to finish'); return
+        out = os.path.join(self._bundle_dir(),
+                           f'vocald-profiles-{datetime.now():%Y%m%d}.vcdx')
+        ST.db_busy = True
+        threading.Thread(target=self._bundle_bg, args=('export', out),
+                         daemon=True).start()
+
+    def _import(self):
+        if ST.is_analysing or ST.db_busy: Toast('Wait for the current task to finish'); return
+        c = GridLayout(cols=1, size_hint_y=None, padding=[S(16)], spacing=S(12))
+        c.bind(minimum_height=c.setter('height'))
+        _bg(c, C('surface'))
+        c.add_widget(WrapLbl('Profile bundle (.vcdx):', fs=13))
+        ti = TxtIn(hint=os.path.join(self._bundle_dir(), 'vocald-profiles.vcdx'))
+        c.add_widget(ti)
+        c.add_widget(WrapLbl('Bundles carry profile fingerprints, not the engine\'s '
+                             'own model state: an imported voice is linked back to '
+                             'its profile after the first new call it appears in.',
+                             fs=10, color='muted'))
+        c.add_widget(Gap(4))
+        p = MkPopup('Import Profiles', c, h=290)
+        c.add_widget(PBtn('Import & Merge', h=46, cb=lambda _: self._do_import(ti, p)))
+        p.open()
+
+    def _do_import(self, ti, p):
+        path = ti.text.strip(); p.dismiss()
+        if not (path and os.path.isfile(path)): Toast('File not found'); return
+        ST.db_busy = True
+        threading.Thread(target=self._bundle_bg, args=('import', path),
+                         daemon=True).start()
+
+    def _bundle_bg(self, action, path):
+        import bundle, vocald_engine as engine
+        try:
+            if action == 'export':
+                r = bundle.export(engine.DB_PATH, path)
+                msg = (f'Exported {r["profiles"]} profiles  |  '
+                       f'{r["bytes"] / 2**20:.1f} MB\n{path}')
+            else:
+                r = bundle.load(engine.DB_PATH, path)
+                msg = (f'Imported {r["profiles"]}  |  {r["added"]} new, {r["merged"]} merged'
+                       + (f', {r["known"]} already imported' if r['known'] else ''))
+        except Exception as e:
+            msg = f'{action.title()} failed: {e}'
+        self._bundle_done(msg)
+
+    @mainthread
+    def _bundle_done(self, msg):
+        ST.db_busy = False
+        Toast(msg, d=4)
+        self._refresh()
+
+    @mainthread
+    def _dedup_done(self, rep):
+        ST.db_busy = False
+        Toast(f'Merged {rep["merged"]} profiles  |  fingerprint scan '
+              f'{rep["scan_ms_before"]:.2f} -> {rep["scan_ms_after"]:.2f} ms', d=4)
+        self._refresh()
+
     def _back(self):
         app = App.get_running_app()
         app.sm.transition = SlideTransition(direction='right')
@@ -993,6 +1450,31 @@ class SettingsScreen(Scr):
         col.add_widget(GBtn('Change Folder', cb=lambda _: self._chg(), h=48))
         col.add_widget(Gap(10))
 
+        self._pbtn = GBtn('', cb=lambda _: self._two_pass(), h=48)
+        self._plbl()
+        col.add_widget(self._pbtn)
+        col.add_widget(Gap(10))
+
+        self._abtn = GBtn('', cb=lambda _: self._auto(), h=48)
+        self._albl()
+        col.add_widget(self._abtn)
+        col.add_widget(Gap(10))
+
+        self._ibtn = GBtn('', cb=lambda _: self._isolate(), h=48)
+        self._ilbl()
+        col.add_widget(self._ibtn)
+        col.add_widget(Gap(10))
+
+        if platform != 'android':
+            self._wbtn = GBtn('', cb=lambda _: self._workers(), h=48)
+            self._wlbl()
+            col.add_widget(self._wbtn)
+            col.add_widget(Gap(10))
+
+        self._obtn = GBtn('Optimise Database', cb=lambda _: self._optimise(), h=48)
+        col.add_widget(self._obtn)
+        col.add_widget(Gap(10))
+
         ab = Card()
         ab.add_widget(WrapLbl('Vocald  v1.0', fs=13, bold=True))
         ab.add_widget(Gap(4))
@@ -1002,8 +1484,9 @@ class SettingsScreen(Scr):
         col.add_widget(Gap(12))
 
         col.add_widget(WrapLbl('Danger Zone', fs=11, bold=True, color='danger'))
-        col.add_widget(PBtn('Clear All Data', ck='danger',
-                            cb=lambda _: self._confirm(), h=48))
+        self._cbtn = PBtn('Clear All Data', ck='danger',
+                          cb=lambda _: self._confirm(), h=48)
+        col.add_widget(self._cbtn)
         col.add_widget(Gap(16))
 
     def on_enter(self):
@@ -1012,6 +1495,46 @@ class SettingsScreen(Scr):
     def _chg(self):
         App.get_running_app().sm.get_screen('onboarding')._pick()
 
+    def _plbl(self):
+        self._pbtn.text = 'Quick preview: ' + ('On' if ST.two_pass else 'Off')
+
+    def _two_pass(self):
+        ST.two_pass = not ST.two_pass
+        App.get_running_app().store.put('two_pass', value=ST.two_pass)
+        self._plbl()
+
+    def _albl(self):
+        self._abtn.text = 'Auto-import new calls: ' + ('On' if ST.auto_ingest else 'Off')
+
+    def _auto(self):
+        ST.auto_ingest = not ST.auto_ingest
+        app = App.get_running_app()
+        app.store.put('auto_ingest', value=ST.auto_ingest)
+        app.sm.get_screen('logs').watch()
+        self._albl()
+
+    def _ilbl(self):
+        self._ibtn.text = 'Isolated analysis: ' + ('On' if ST.supervised else 'Off')
+
+    def _isolate(self):
+        if ST.is_analysing: Toast('Wait for the analysis to finish'); return
+        ST.supervised = not ST.supervised
+        App.get_running_app().store.put('supervised', value=ST.supervised)
+        self._ilbl()
+
+    def _wlbl(self):
+        self._wbtn.text = (f'Analysis workers: {ST.workers}' if ST.workers > 1
+                           else 'Analysis workers: 1 (in-app)')
+
+    def _workers(self):
+        if ST.is_analysing: Toast('Wait for the analysis to finish'); return
+        cap = os.cpu_count() or 1
+        steps = [n for n in (1, 2, 4, 8, 16) if n <= cap]
+        ST.workers = steps[(steps.index(ST.workers) + 1) % len(steps)
+                           if ST.workers in steps else 0]
+        App.get_running_app().store.put('workers', value=ST.workers)
+        self._wlbl()
+
     def _confirm(self):
         c = GridLayout(cols=1, size_hint_y=None, padding=[S(16)], spacing=S(12))
         c.bind(minimum_height=c.setter('height'))
@@ -1030,15 +1553,67 @@ class SettingsScreen(Scr):
         c.add_widget(Gap(4))
         p.open()
 
+    # ── wipe / maintenance (background) ───────────────────────────────────────
+    def _db_start(self, btn):
+        if ST.is_analysing: Toast('Wait for the analysis to finish'); return False
+        if ST.db_busy: Toast('Database task already running'); return False
+        ST.db_busy, self._pbtn_db, self._pct = True, btn, None
+        return True
+
+    def _prog(self, stage, f):
+        """Worker-thread progress callback; only whole-percent changes reach the UI."""
+        pct = (stage, int(f * 100))
+        if pct != self._pct:
+            self._pct = pct
+            self._show_prog(*pct)
+
+    @mainthread
+    def _show_prog(self, stage, pct):
+        self._pbtn_db.text = f'{stage.title()}...  {pct}%'
+
     def _clear(self):
-        import sqlite3, vocald_engine as engine
-        conn = sqlite3.connect(engine.DB_PATH)
-        for t in ('speakers','recordings','voice_profiles'):
-            conn.execute(f'DELETE FROM {t}')
-        conn.commit(); conn.close()
-        engine._processed_registry.clear()
-        engine._save_processed_registry()
-        Toast('All data cleared')
+        if self._db_start(self._cbtn):
+            threading.Thread(target=self._clear_bg, daemon=True).start()
+
+    def _clear_bg(self):
+        import maintenance, vocald_engine as engine
+        try:
+            maintenance.wipe(engine.DB_PATH, self._prog)
+            engine._processed_registry.clear()
+            engine._save_processed_registry()
+            msg = 'All data cleared'
+        except Exception as e:
+            msg = f'Clear failed: {e}'
+        self._db_done(msg, wiped=True)
+
+    def _optimise(self, force=True, quiet=False):
+        if quiet and (ST.is_analysing or ST.db_busy): return
+        if self._db_start(self._obtn):
+            threading.Thread(target=self._optimise_bg, args=(force, quiet),
+                             daemon=True).start()
+
+    def _optimise_bg(self, force, quiet):
+        import maintenance, vocald_engine as engine
+        try:
+            r = maintenance.maintain(engine.DB_PATH, force, self._prog)
+            saved = (r['bytes_before'] - r['bytes_after']) / 2**20
+            msg = None if quiet else f'Database optimised  ({saved:.1f} MB freed)'
+        except Exception as e:
+            msg = None if quiet else f'Optimise failed: {e}'
+        self._db_done(msg, maintained=True)
+
+    @mainthread
+    def _db_done(self, msg, wiped=False, maintained=False):
+        ST.db_busy = False
+        self._cbtn.text, self._obtn.text = 'Clear All Data', 'Optimise Database'
+        app = App.get_running_app()
+        if maintained or wiped:
+            app.store.put('last_maintenance', value=time.time())
+        if wiped:
+            from records import when
+            label.cache_clear(); when.cache_clear(); _TEX.clear()
+        if msg: Toast(msg)
+        app.sm.get_screen('logs')._drain()
 
     def _back(self):
         app = App.get_running_app()
@@ -1073,6 +1648,15 @@ class VocaldApp(App):
 
         if self.store.exists('folder_path'):
             ST.folder_path = self.store.get('folder_path')['value']
+        if self.store.exists('two_pass'):
+            ST.two_pass = self.store.get('two_pass')['value']
+        if self.store.exists('workers') and platform != 'android':
+            ST.workers = self.store.get('workers')['value']
+        if self.store.exists('auto_ingest'):
+            ST.auto_ingest = self.store.get('auto_ingest')['value']
+        if self.store.exists('supervised'):
+            ST.supervised = self.store.get('supervised')['value']
+        Clock.schedule_once(self._maintain, 60)
 
         self.sm.current = (
             'logs' if (self.store.exists('setup_done') and
@@ -1080,6 +1664,14 @@ class VocaldApp(App):
             else 'onboarding')
         return self.sm
 
+    def _maintain(self, *_):
+        """Scheduled ANALYZE (+ VACUUM when fragmented), at most weekly."""
+        import maintenance
+        last = (self.store.get('last_maintenance')['value']
+                if self.store.exists('last_maintenance') else None)
+        if maintenance.due(last):
+            self.sm.get_screen('settings')._optimise(force=False, quiet=True)
+
     def _res(self, req, res, data):
         if res != -1: return
         if req == 1001:
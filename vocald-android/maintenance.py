@@ -0,0 +1,126 @@
+"""
+Database wipe and upkeep (Kivy-free).
+
+wipe() empties the engine DB by dropping and recreating every table rather
+than DELETE-ing row by row: each table's own CREATE statement (plus its
+indexes and triggers) is read back from sqlite_master and replayed in one
+transaction, then the now-empty file is vacuumed down to a few pages.
+Sidecar stores kept next to the DB (profile vectors, the segment index,
+waveform thumbnails) go with it.
+
+maintain() is the periodic task: ANALYZE so the planner's statistics track
+the data, and VACUUM when enough of the file is free pages. Both report
+progress through a callback — progress(stage, fraction).
+"""
+
+import os, sqlite3, time
+
+ENGINE_TABLES = ('speakers', 'recordings', 'voice_profiles')
+VACUUM_FREE   = 0.20        # vacuum once this share of pages is free
+EVERY_S       = 7 * 86400   # scheduled maintenance interval
+_OPS_PER_PAGE = 200         # VM steps per page VACUUM copies (measured)
+_STEP         = 1000        # progress handler granularity, in VM steps
+
+
+def _tables(db_path):
+    import bundle, timeline
+    conn = bundle._connect(db_path)            # creates the sidecar tables
+    conn.close()
+    return (ENGINE_TABLES + ('profile_vectors', 'phone_profiles', 'merge_hints',
+                             'bundle_imports') + timeline.TABLES)
+
+
+def _with_progress(conn, stage, progress, total):
+    """Drive progress(stage, f) from SQLite's VM-step callback; total in steps."""
+    if not progress: return
+    n = [0]
+    def tick():
+        n[0] += _STEP
+        progress(stage, min(0.99, n[0] / max(1, total)))
+        return 0
+    conn.set_progress_handler(tick, _STEP)
+
+
+def vacuum(conn, progress=None):
+    pages = conn.execute('PRAGMA page_count').fetchone()[0]
+    free  = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    _with_progress(conn, 'vacuum', progress, (pages - free) * _OPS_PER_PAGE)
+    try:
+        conn.execute('VACUUM')
+    finally:
+        conn.set_progress_handler(None, 0)
+    if progress: progress('vacuum', 1.0)
+
+
+def wipe(db_path, progress=None):
+    """Drop and recreate every engine and sidecar table. Returns bytes freed."""
+    tables = list(_tables(db_path))
+    before = os.path.getsize(db_path) if os.path.exists(db_path) else 0
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute('PRAGMA foreign_keys=OFF')
+        q = ','.join('?' * len(tables))
+        rows = conn.execute(
+            f'SELECT type, name, tbl_name, sql FROM sqlite_master '
+            f'WHERE tbl_name IN ({q}) AND sql IS NOT NULL', tables).fetchall()
+        order = {'table': 0, 'index': 1, 'trigger': 2}
+        rows.sort(key=lambda r: order.get(r[0], 3))
+        have = [r[1] for r in rows if r[0] == 'table']
+        conn.execute('BEGIN IMMEDIATE')
+        for i, t in enumerate(have):
+            conn.execute(f'DROP TABLE IF EXISTS "{t}"')
+            if progress: progress('wipe', 0.5 * (i + 1) / len(have))
+        for _, _, _, sql in rows:
+            conn.execute(sql)
+        if conn.execute("SELECT 1 FROM sqlite_master "
+                        "WHERE name='sqlite_sequence'").fetchone():
+            conn.execute(f'DELETE FROM sqlite_sequence WHERE name IN ({q})', tables)
+        conn.execute('COMMIT')
+        if progress: progress('wipe', 1.0)
+        vacuum(conn, progress)
+    except Exception:
+        if conn.in_transaction: conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+    try:
+        import waveform
+        waveform.store_for(db_path).clear()
+    except Exception: pass
+    return max(0, before - os.path.getsize(db_path))
+
+
+def needs_vacuum(conn, share=VACUUM_FREE):
+    pages = conn.execute('PRAGMA page_count').fetchone()[0]
+    free  = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    return pages > 0 and free / pages >= share
+
+
+def maintain(db_path, force=False, progress=None):
+    """ANALYZE, then VACUUM if the file is fragmented (or force=True).
+    Returns {'analyze_s', 'vacuum_s', 'bytes_before', 'bytes_after'}."""
+    rep = {'bytes_before': os.path.getsize(db_path), 'vacuum_s': 0.0}
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        t = time.perf_counter()
+        _with_progress(conn, 'analyze', progress,
+                       conn.execute('PRAGMA page_count').fetchone()[0] * 80)
+        try:
+            conn.execute('ANALYZE')
+        finally:
+            conn.set_progress_handler(None, 0)
+        if progress: progress('analyze', 1.0)
+        rep['analyze_s'] = time.perf_counter() - t
+        if force or needs_vacuum(conn):
+            t = time.perf_counter()
+            vacuum(conn, progress)
+            rep['vacuum_s'] = time.perf_counter() - t
+    finally:
+        conn.close()
+    rep['bytes_after'] = os.path.getsize(db_path)
+    return rep
+
+
+def due(last, every=EVERY_S):
+    """Whether scheduled maintenance is due, given the last run's epoch time."""
+    return not last or time.time() - last >= every
@@ -0,0 +1,129 @@
+"""
+Asyncio stage graph for batch analysis (Kivy-free).
+
+    scan ─► [decode q] ─► decode ×D ─► [infer q] ─► infer ×I ─► [write q] ─► writer
+
+Every queue is bounded, so a slow stage pushes back on the ones before it
+instead of buffering the whole backlog. Decode (sniff + read-ahead) runs on
+the default thread pool, inference on the caller's executor (threads or an
+analysis.Pool), and a single writer thread applies results in batches, so
+I/O for the next files overlaps with inference on the current ones.
+An optional governor.Governor caps how many inference slots are active and
+paces the gap between files. run() returns as soon as the last result is
+written.
+"""
+
+import asyncio, time
+from concurrent.futures import ThreadPoolExecutor
+
+_DONE = object()
+
+
+async def run(scan, analyse, write, *, executor=None, decode=2, infer=1,
+              depth=4, batch=8, cancelled=lambda: False, governor=None):
+    """
+    scan()        -> list of scanned files (runs off the loop)
+    analyse(fi)   -> (sp, secs)             (runs on `executor`)
+    write(items)  -> number written OK      (runs on the single writer thread)
+                     items: [(fi, sp, err, secs), ...]
+    Returns a stats dict with per-stage busy time and the wall time.
+    """
+    loop  = asyncio.get_running_loop()
+    own   = executor is None
+    ex    = ThreadPoolExecutor(infer, thread_name_prefix='vocald-infer') if own else executor
+    db    = ThreadPoolExecutor(1, thread_name_prefix='vocald-db')
+    dq, iq, wq = asyncio.Queue(depth), asyncio.Queue(depth), asyncio.Queue(depth * 2)
+    st = {'files': 0, 'done': 0, 'failed': 0,
+          'decode_s': 0.0, 'infer_s': 0.0, 'write_s': 0.0}
+    t0 = time.perf_counter()
+    active = [0]
+
+    async def _close(q, n):
+        for _ in range(n): await q.put(_DONE)
+
+    async def producer():
+        files = await loop.run_in_executor(None, scan)
+        st['files'] = len(files)
+        for fi in files:
+            if cancelled(): break
+            await dq.put(fi)
+        await _close(dq, decode)
+
+    async def decoder():
+        from analysis import prefetch
+        while (fi := await dq.get()) is not _DONE:
+            if cancelled(): continue
+            t = time.perf_counter()
+            try:
+                await loop.run_in_executor(None, prefetch, fi['filepath'])
+            except Exception as e:
+                await wq.put((fi, None, e, 0.0)); continue
+            finally:
+                st['decode_s'] += time.perf_counter() - t
+            await iq.put(fi)
+
+    async def _gate():
+        """Reserve a governor slot, then wait out its inter-file pause. The
+        check and the increment run without an await in between, so waiting
+        inferers cannot all pass together. False (slot released) on cancel."""
+        while True:
+            if cancelled(): return False
+            w, pause = governor.policy()
+            if active[0] < w:
+                active[0] += 1
+                break
+            await asyncio.sleep(0.5)
+        end = time.monotonic() + pause
+        while time.monotonic() < end and not cancelled():
+            await asyncio.sleep(min(0.5, end - time.monotonic()))
+        if cancelled():
+            active[0] -= 1
+            return False
+        return True
+
+    async def inferer():
+        while (fi := await iq.get()) is not _DONE:
+            if cancelled(): continue
+            if not governor: active[0] += 1
+            elif not await _gate(): continue
+            t = time.perf_counter()
+            try:
+                sp, secs = await loop.run_in_executor(ex, analyse, fi)
+                item = (fi, sp, None, secs)
+            except Exception as e:
+                item = (fi, None, e, 0.0)
+            finally:
+                active[0] -= 1
+            st['infer_s'] += time.perf_counter() - t
+            if item[2] is not None and cancelled(): continue    # retried next scan
+            await wq.put(item)
+
+    async def writer():
+        end = False
+        while not end:
+            items = [await wq.get()]
+            while len(items) < batch and not wq.empty():
+                items.append(wq.get_nowait())
+            end   = any(i is _DONE for i in items)
+            items = [i for i in items if i is not _DONE]
+            if not items: continue
+            t  = time.perf_counter()
+            ok = await loop.run_in_executor(db, write, items)
+            st['write_s'] += time.perf_counter() - t
+            st['done']    += ok
+            st['failed']  += len(items) - ok
+
+    async def stage(n, worker, nxt, n_nxt):
+        await asyncio.gather(*(worker() for _ in range(n)))
+        await _close(nxt, n_nxt)
+
+    try:
+        await asyncio.gather(producer(),
+                             stage(decode, decoder, iq, infer),
+                             stage(infer, inferer, wq, 1),
+                             writer())
+    finally:
+        db.shutdown(wait=True)
+        if own: ex.shutdown(wait=True)
+    st['secs'] = time.perf_counter() - t0
+    return st
@@ -0,0 +1,455 @@
+"""
+Voice-profile vector store + duplicate consolidation.
+
+The engine matches against its own model state; this sidecar table mirrors
+each profile as a running centroid (count, mean, Welford M2) plus a small
+fixed-size reservoir of sample embeddings, fed from analysis results. Update
+cost and storage stay constant however often a person calls, and profiles
+can be matched, clustered and merged offline on plain NumPy. At commit time
+reconcile() uses match_for_phone() to flag a profile the engine has just
+created for a voice this store already knows; the flag is a merge hint the
+user confirms, never an automatic merge.
+
+A second table remembers which profiles were heard on which phone number, so
+reconcile()'s duplicate check tries a repeat caller's handful of earlier
+voices before falling back to a full search. It cannot steer the engine's own
+match: analyse_audio_file() assigns profiles internally, before any of this
+runs, and takes no candidate list.
+"""
+
+import sqlite3, time
+from collections import Counter
+import numpy as np
+
+import timeline
+
+
+RESERVOIR = 8        # representative embeddings kept per profile
+BLOCK     = 256      # cluster(): rows scored per matrix product
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile_vectors (
+    profile_id INTEGER PRIMARY KEY,
+    count      INTEGER NOT NULL,
+    mean       BLOB    NOT NULL,
+    m2         BLOB,
+    reservoir  BLOB
+);
+CREATE TABLE IF NOT EXISTS phone_profiles (
+    phone      TEXT    NOT NULL,
+    profile_id INTEGER NOT NULL,
+    seen       INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (phone, profile_id)
+);
+CREATE INDEX IF NOT EXISTS idx_phone_profiles_pid ON phone_profiles(profile_id);
+CREATE TABLE IF NOT EXISTS merge_hints (
+    profile_id INTEGER PRIMARY KEY,     -- profile the engine just created
+    into_id    INTEGER NOT NULL,        -- established profile it matched
+    score      REAL    NOT NULL
+);
+"""
+
+MATCH_SCORE     = 0.75    # reconcile(): cosine score that flags a new profile
+PHONE_MIN_SCORE = 0.70    # prior candidates must beat this to skip full search
+phone_stats = {'hits': 0, 'misses': 0, 'no_prior': 0}
+
+_rng = np.random.default_rng()
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    cols = {r[1] for r in conn.execute('PRAGMA table_info(profile_vectors)')}
+    for c in ('m2', 'reservoir'):       # tables created before the reservoir
+        if c not in cols:
+            conn.execute(f'ALTER TABLE profile_vectors ADD COLUMN {c} BLOB')
+    return conn
+
+
+def _get(conn, pid):
+    """(count, mean, m2, reservoir) for one profile, or None."""
+    row = conn.execute('SELECT count, mean, m2, reservoir FROM profile_vectors '
+                       'WHERE profile_id=?', (pid,)).fetchone()
+    if not row: return None
+    m   = np.frombuffer(row[1], np.float32)
+    m2  = np.frombuffer(row[2], np.float32) if row[2] else np.zeros_like(m)
+    res = (np.frombuffer(row[3], np.float32).reshape(-1, len(m)) if row[3]
+           else m[None, :])
+    return row[0], m, m2, res
+
+
+def _put(conn, pid, n, m, m2, res):
+    conn.execute('INSERT OR REPLACE INTO profile_vectors '
+                 '(profile_id, count, mean, m2, reservoir) VALUES (?,?,?,?,?)',
+                 (pid, int(n), m.astype(np.float32).tobytes(),
+                  m2.astype(np.float32).tobytes(),
+                  np.ascontiguousarray(res, np.float32).tobytes()))
+
+
+def _phone(num):
+    """Normalised lookup key: the last 10 digits, so +91/0 prefixes collapse."""
+    d = ''.join(ch for ch in str(num or '') if ch.isdigit())
+    return d[-10:] or None
+
+
+def _fold(cur, e):
+    """One Welford step plus reservoir sampling (Algorithm R) for sample `e`."""
+    if cur is None or cur[1].shape != e.shape:
+        return 1, e, np.zeros_like(e), e[None, :]
+    n, m, m2, res = cur
+    n += 1
+    d  = e - m
+    m  = m + d / n
+    m2 = m2 + d * (e - m)
+    if len(res) < RESERVOIR:
+        res = np.vstack([res, e])
+    else:
+        j = int(_rng.integers(0, n))
+        if j < RESERVOIR: res = res.copy(); res[j] = e
+    return n, m, m2, res
+
+
+def _speakers(sp):
+    if isinstance(sp, dict): return sp.get('speakers') or []
+    return sp or []
+
+
+def _pairs(sp, spks=None):
+    """(profile_id, embedding) for every speaker in an analysis result. The
+    committed rows in `spks` win over ids in `sp`, which may have been merged."""
+    pids = {s.get('speaker_index'): s.get('voice_profile_id') for s in spks or ()}
+    for s in _speakers(sp):
+        e   = s.get('embedding')
+        pid = pids.get(s.get('speaker_index')) or s.get('voice_profile_id')
+        if pid and e is not None:
+            yield pid, np.asarray(e, np.float32).ravel()
+
+
+# ─── Ingest ───────────────────────────────────────────────────────────────────
+def record(db_path, sp, spks=None, phone=None):
+    """Fold the embeddings of one analysis result into their profiles, O(1) each.
+    `spks` (the committed speaker rows) supplies profile ids when `sp` lacks them;
+    `phone` links those profiles to the caller's number for candidate pruning."""
+    pairs = list(_pairs(sp, spks))
+    key   = _phone(phone)
+    pids  = {pid for pid, _ in pairs}
+    pids |= {s.get('voice_profile_id') for s in spks or () if s.get('voice_profile_id')}
+    if not pairs and not (key and pids): return 0
+    conn = connect(db_path)
+    with conn:
+        for pid, e in pairs:
+            _put(conn, pid, *_fold(_get(conn, pid), e))
+        if key:
+            conn.executemany(
+                'INSERT INTO phone_profiles (phone, profile_id) VALUES (?,?) '
+                'ON CONFLICT(phone, profile_id) DO UPDATE SET seen=seen+1',
+                [(key, pid) for pid in pids])
+    conn.close()
+    return len(pairs)
+
+
+def load(conn, ids=None):
+    """Profile ids, counts and the L2-normalised (n, d) mean matrix,
+    optionally restricted to `ids`."""
+    sql, args = 'SELECT profile_id, count, mean FROM profile_vectors', []
+    if ids is not None:
+        args = list(ids)
+        sql += f' WHERE profile_id IN ({",".join("?" * len(args))})'
+    rows = conn.execute(sql + ' ORDER BY profile_id', args).fetchall()
+    if not rows: return [], np.zeros(0), np.zeros((0, 0), np.float32)
+    dim  = Counter(len(r[2]) for r in rows).most_common(1)[0][0]
+    rows = [r for r in rows if len(r[2]) == dim]      # skip stale model dims
+    X = np.frombuffer(b''.join(r[2] for r in rows), np.float32).reshape(len(rows), -1)
+    X = X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-9)
+    return [r[0] for r in rows], np.array([r[1] for r in rows], float), X
+
+
+# ─── Matching ─────────────────────────────────────────────────────────────────
+def _unit(v):
+    return v / max(float(np.linalg.norm(v)), 1e-9)
+
+
+def match(conn, q, ids=None, top=3, rerank=True):
+    """
+    Best (profile_id, cosine score) for embedding `q`, or (None, -1.0).
+    Scores every centroid (optionally only `ids`), then re-ranks the `top`
+    candidates by their closest reservoir sample.
+    """
+    pids, _, X = load(conn, ids)
+    q = _unit(np.asarray(q, np.float32).ravel())
+    if not pids or X.shape[1] != len(q): return None, -1.0
+    sc   = X @ q
+    cand = np.argsort(-sc)[:top]
+    best = (pids[cand[0]], float(sc[cand[0]]))
+    if not rerank: return best
+    for i in cand:
+        res = _get(conn, pids[i])[3]
+        res = res / np.maximum(np.linalg.norm(res, axis=1, keepdims=True), 1e-9)
+        s   = max(float(sc[i]), float(np.max(res @ q)))
+        if s > best[1]: best = (pids[i], s)
+    return best
+
+
+def phone_candidates(conn, phone):
+    key = _phone(phone)
+    if not key: return []
+    return [r[0] for r in conn.execute(
+        'SELECT profile_id FROM phone_profiles WHERE phone=? ORDER BY seen DESC',
+        (key,))]
+
+
+def match_for_phone(conn, phone, q, threshold=PHONE_MIN_SCORE, **kw):
+    """
+    match() that first tries the profiles previously heard on `phone` and
+    only falls back to the full search when none of them scores `threshold`.
+    Outcomes are counted in `phone_stats` (reconcile's duplicate check only;
+    the engine's own matching never comes through here).
+    """
+    cand = phone_candidates(conn, phone)
+    if not cand:
+        phone_stats['no_prior'] += 1
+        return match(conn, q, **kw)
+    best = match(conn, q, ids=cand, **kw)
+    if best[1] >= threshold:
+        phone_stats['hits'] += 1
+        return best
+    phone_stats['misses'] += 1
+    return match(conn, q, **kw)
+
+
+# ─── Identification ───────────────────────────────────────────────────────────
+def reconcile(db_path, sp, spks, mark, phone=None, threshold=MATCH_SCORE):
+    """
+    Second opinion on the engine's speaker -> profile assignment, run at
+    commit time before the result is folded in. Only profiles the engine
+    created after `mark` (the highest profile id before the commit or batch)
+    and not yet seen here are checked; profiles that predate the sidecar
+    have no vector and are never treated as new. Each is matched with
+    reservoir re-ranking — first against the profiles heard on the caller's
+    `phone`, then every centroid — and a match above `threshold` is stored
+    as a merge hint for the user to confirm. Nothing is merged or deleted.
+    Returns {new_profile_id: matched_profile_id}.
+    """
+    pairs = [(pid, e) for pid, e in _pairs(sp, spks) if pid > mark]
+    if not pairs: return {}
+    found = {}
+    conn = connect(db_path)
+    try:
+        with conn:
+            for pid, e in pairs:
+                if pid in found or _get(conn, pid) is not None: continue
+                best, score = match_for_phone(conn, phone, e)
+                if best is not None and best != pid and score >= threshold:
+                    found[pid] = best
+                    conn.execute('INSERT OR REPLACE INTO merge_hints VALUES (?,?,?)',
+                                 (pid, best, score))
+    finally:
+        conn.close()
+    return found
+
+
+def _hints(conn):
+    """[(profile_id, into_id)] of stored hints whose profiles both still exist."""
+    return conn.execute(
+        'SELECT h.profile_id, h.into_id FROM merge_hints h '
+        'JOIN voice_profiles a ON a.id = h.profile_id '
+        'JOIN voice_profiles b ON b.id = h.into_id ORDER BY h.profile_id').fetchall()
+
+
+def flag(db_path, groups):
+    """Store merge hints for proposed groups (each member onto the group's
+    oldest profile) for the user to confirm. Returns the number newly stored."""
+    n = 0
+    conn = connect(db_path)
+    with conn:
+        for g in groups:
+            into = min(g)
+            a = _get(conn, into)
+            for pid in g:
+                b = _get(conn, pid)
+                if pid == into or not (a and b) or len(a[1]) != len(b[1]): continue
+                n += conn.execute('INSERT OR IGNORE INTO merge_hints VALUES (?,?,?)',
+                                  (pid, into, float(_unit(a[1]) @ _unit(b[1])))).rowcount
+    conn.close()
+    return n
+
+
+def pending(db_path):
+    """Number of new profiles flagged as probable duplicates, awaiting review."""
+    conn = connect(db_path)
+    try: return len(_hints(conn))
+    finally: conn.close()
+
+
+# ─── Clustering ───────────────────────────────────────────────────────────────
+def _close(X, threshold, block=BLOCK):
+    """(i, j) with i < j for every pair of rows of the unit matrix X within
+    cosine distance `threshold`, scored `block` rows at a time."""
+    for a in range(0, len(X), block):
+        i, j = np.nonzero(X[a:a + block] @ X.T >= 1.0 - threshold)
+        i += a
+        yield from zip(i[j > i].tolist(), j[j > i].tolist())
+
+
+def _complete(X, threshold):
+    """Complete-linkage clustering of a small unit matrix: two groups join
+    only while every pair across them is within `threshold`."""
+    n = len(X)
+    D = 1.0 - X @ X.T
+    np.fill_diagonal(D, np.inf)
+    members = {i: [i] for i in range(n)}
+    while len(members) > 1:
+        i, j = divmod(int(np.argmin(D)), n)
+        if D[i, j] > threshold: break
+        row = np.maximum(D[i], D[j])            # Lance-Williams, complete linkage
+        D[i, :] = row; D[:, i] = row; D[i, i] = np.inf
+        D[j, :] = np.inf; D[:, j] = np.inf
+        members[i] += members.pop(j)
+    return list(members.values())
+
+
+def cluster(X, threshold=0.25):
+    """
+    Groups of rows of the unit matrix X whose members are all pairwise
+    within cosine distance `threshold`. A union-find pass over the blocked
+    candidate pairs finds connected components without an n x n matrix;
+    each component is then split by complete linkage, so distinct voices
+    are never chained together through intermediate ones.
+    Returns a list of index groups (singletons included), each in index order.
+    """
+    up = list(range(len(X)))
+    def root(i):
+        while up[i] != i:
+            up[i] = up[up[i]]; i = up[i]
+        return i
+    for i, j in _close(X, threshold):
+        a, b = root(i), root(j)
+        if a != b: up[max(a, b)] = min(a, b)
+    comps = {}
+    for i in range(len(X)): comps.setdefault(root(i), []).append(i)
+    groups = []
+    for c in comps.values():
+        if len(c) < 3: groups.append(c); continue
+        groups += [sorted(c[k] for k in g) for g in _complete(X[c], threshold)]
+    return groups
+
+
+def _scan_ms(X, reps=64):
+    """Cost of one brute-force best-match over the sidecar centroids X, in
+    milliseconds. A synthetic figure for the before/after comparison — not
+    the engine's own matching latency."""
+    if not len(X): return 0.0
+    q = X[np.random.default_rng(0).integers(0, len(X), reps)]
+    t = time.perf_counter()
+    for v in q: int(np.argmax(X @ v))
+    return (time.perf_counter() - t) * 1000 / reps
+
+
+def _combine(vec):
+    """Pooled count/mean/M2 (Chan et al.) and a resampled joint reservoir."""
+    w  = np.array([v[0] for v in vec], float)
+    M  = np.stack([v[1] for v in vec])
+    m  = (w[:, None] * M).sum(0) / w.sum()
+    m2 = sum(v[2] + v[0] * (v[1] - m) ** 2 for v in vec)
+    res = np.vstack([v[3] for v in vec])
+    if len(res) > RESERVOIR:
+        res = res[_rng.choice(len(res), RESERVOIR, replace=False)]
+    return int(w.sum()), m, m2, res
+
+
+# ─── Merge ────────────────────────────────────────────────────────────────────
+def merge(db_path, groups):
+    """
+    Collapse each group of profile ids into its most-used member, in one
+    transaction: speakers are re-pointed, totals and first/last seen are
+    combined, vectors are count-weighted, and the leftovers are deleted.
+    """
+    conn = connect(db_path)
+    merged = 0
+    with conn:
+        for ids in groups:
+            if len(ids) < 2: continue
+            q = ','.join('?' * len(ids))
+            rows = conn.execute(
+                f'SELECT id, total_recordings, first_seen, last_seen '
+                f'FROM voice_profiles WHERE id IN ({q})', ids).fetchall()
+            if len(rows) < 2: continue
+            rows.sort(key=lambda r: (-(r[1] or 0), r[0]))
+            keep, drop = rows[0][0], [r[0] for r in rows[1:]]
+            dq = ','.join('?' * len(drop))
+            conn.execute(f'UPDATE speakers SET voice_profile_id=? '
+                         f'WHERE voice_profile_id IN ({dq})', [keep] + drop)
+            conn.execute(
+                'UPDATE voice_profiles SET total_recordings=?, first_seen=?, '
+                'last_seen=? WHERE id=?',
+                (sum(r[1] or 0 for r in rows),
+                 min((r[2] for r in rows if r[2]), default=None),
+                 max((r[3] for r in rows if r[3]), default=None), keep))
+
+            vec = [v for v in (_get(conn, i) for i in ids) if v]
+            if vec and len({len(v[1]) for v in vec}) == 1:
+                _put(conn, keep, *_combine(vec))
+            conn.execute(f'UPDATE OR IGNORE phone_profiles SET profile_id=? '
+                         f'WHERE profile_id IN ({dq})', [keep] + drop)
+            conn.execute(f'DELETE FROM phone_profiles WHERE profile_id IN ({dq})', drop)
+            timeline.repoint(conn, keep, drop)
+            conn.execute(f'DELETE FROM merge_hints WHERE profile_id IN ({q}) '
+                         f'OR into_id IN ({q})', ids + ids)
+            conn.execute(f'DELETE FROM profile_vectors WHERE profile_id IN ({dq})', drop)
+            conn.execute(f'DELETE FROM voice_profiles WHERE id IN ({dq})', drop)
+            merged += len(drop)
+    conn.close()
+    return merged
+
+
+def _join(groups, pairs):
+    """Add (a, b) pairs to the id groups, joining groups a pair links."""
+    where = {p: g for g in groups for p in g}
+    for a, b in pairs:
+        ga, gb = where.get(a), where.get(b)
+        if ga is not None and ga is gb: continue
+        if ga is None and gb is None:
+            g = [b, a]; groups.append(g)
+        elif ga is None: gb.append(a); g = gb
+        elif gb is None: ga.append(b); g = ga
+        else:
+            ga += gb; groups.remove(gb); g = ga
+        for p in g: where[p] = g
+    return groups
+
+
+def consolidate(db_path, threshold=0.25, apply=False, since=None):
+    """
+    Propose (or, with apply=True, perform) merges of near-duplicate profiles.
+    Only profiles with a sidecar vector can be compared — those whose
+    analysis results carried an 'embedding'; older profiles are not
+    backfilled and are counted in 'profiles_compared' only when they have one.
+    With `since`, only groups holding a profile id above it are kept.
+    Merge hints left by reconcile() are added to the groups.
+    Returns a report with the groups, the profile counts and the synthetic
+    sidecar scan time before and after.
+    """
+    conn = connect(db_path)
+    before = conn.execute('SELECT COUNT(*) FROM voice_profiles').fetchone()[0]
+    ids, _, X = load(conn)
+    hints = _hints(conn)
+    conn.close()
+    idx    = cluster(X, threshold)
+    if since is not None:                   # older groups stay as they are
+        idx = [h for g in idx for h in
+               ([g] if max(ids[i] for i in g) > since else [[i] for i in g])]
+    groups = _join([[ids[i] for i in g] for g in idx if len(g) > 1], hints)
+    gone   = {p for g in groups for p in g[1:]}
+    keep   = [i for i, p in enumerate(ids) if p not in gone]
+    rep = {
+        'groups':            groups,
+        'profiles_before':   before,
+        'profiles_compared': len(ids),
+        'profiles_after':    before - sum(len(g) - 1 for g in groups),
+        'scan_ms_before':    _scan_ms(X),
+        'scan_ms_after':     _scan_ms(X[keep]) if len(keep) else 0.0,
+        'merged':            0,
+    }
+    if apply and groups:
+        rep['merged'] = merge(db_path, groups)
+    return rep
@@ -0,0 +1,218 @@
+"""
+Compact record types for rows crossing from vocald_engine into the screens.
+
+The engine returns one dict per row; LogsScreen keeps the whole history in
+memory, where a dict per recording costs several times its payload. These
+__slots__ classes hold the fields the UI reads as plain attributes, intern
+strings that repeat (phone numbers, names, folders), keep call dates as
+epoch seconds, and pack every other column into one marshalled blob that is
+only decoded on first access. get() and [] mirror the dict API for code
+that still expects mappings.
+
+Display strings (URL-decoded names, formatted dates) come from small
+bounded memo caches, so rendering a card is plain widget assignment.
+
+    python records.py 20000      # memory benchmark: dicts vs records
+"""
+
+import marshal, os, sys
+from datetime import datetime
+from functools import lru_cache
+from urllib.parse import unquote
+
+_MISSING = object()
+
+
+# ─── Display formatting (memoised, bounded) ───────────────────────────────────
+@lru_cache(maxsize=8192)
+def label(text):
+    """URL-decoded display form of a filename or speaker name."""
+    try:
+        return unquote(str(text))
+    except Exception:
+        return str(text)
+
+
+@lru_cache(maxsize=8192)
+def when(date, long=False):
+    """Card date ('02 Jan 2024  10:00 AM'), or the detail form with long=True
+    ('2024-01-02  10:00:00'). `date` is epoch seconds or the raw string."""
+    if isinstance(date, (int, float)):
+        dt = datetime.fromtimestamp(date)
+        return (dt.strftime('%Y-%m-%d  %H:%M:%S') if long
+                else dt.strftime('%d %b %Y  %I:%M %p'))
+    s = str(date or '')
+    if not long:
+        try:
+            return datetime.fromisoformat(s).strftime('%d %b %Y  %I:%M %p')
+        except ValueError:
+            pass
+    return s[:19 if long else 16].replace('T', '  ')
+
+
+class _Row:
+    __slots__ = ('_x',)
+    _F      = ()            # eager fields, read as attributes
+    _INTERN = ()            # string fields worth interning
+
+    def __init__(self, d):
+        for k in self._F:
+            v = d.get(k)
+            if k in self._INTERN and isinstance(v, str): v = sys.intern(v)
+            setattr(self, k, v)
+        self._x = self._pack({k: v for k, v in d.items()
+                              if k not in self._F and v is not None})
+
+    @staticmethod
+    def _pack(x):
+        if not x: return None
+        try: return marshal.dumps(x)
+        except ValueError: return x             # unmarshallable values: keep as-is
+
+    def _extras(self):
+        x = self._x
+        return marshal.loads(x) if isinstance(x, bytes) else (x or {})
+
+    @classmethod
+    def many(cls, rows):
+        return [cls(r) for r in rows or ()]
+
+    def _extra(self, k):
+        return self._extras().get(k, _MISSING)
+
+    def get(self, k, default=None):
+        v = getattr(self, k, None) if k in self._F else self._extra(k)
+        return default if v is None or v is _MISSING else v
+
+    def __getitem__(self, k):
+        v = getattr(self, k) if k in self._F else self._extra(k)
+        if v is _MISSING: raise KeyError(k)
+        return v
+
+    def __contains__(self, k):
+        return k in self._F or self._extra(k) is not _MISSING
+
+    def to_dict(self):
+        d = {k: getattr(self, k) for k in self._F}
+        d.update(self._extras())
+        return d
+
+    def __repr__(self):
+        return f'{type(self).__name__}(id={getattr(self, "id", None)!r})'
+
+
+class Speaker(_Row):
+    _F      = ('speaker_index', 'name', 'confidence', 'voice_profile_id')
+    _INTERN = ('name',)
+    __slots__ = _F
+
+    @property
+    def title(self): return label(self.name or 'Unknown')
+
+
+class Profile(_Row):
+    _F      = ('id', 'name', 'total_recordings', 'first_seen', 'last_seen')
+    _INTERN = ('name',)
+    __slots__ = _F
+
+    @property
+    def title(self): return label(self.name or 'Unknown')
+
+
+class Recording(_Row):
+    _F      = ('id', 'filename', 'phone_number', 'call_duration',
+               'processed', 'total_speakers')
+    _INTERN = ('phone_number',)
+    __slots__ = _F + ('_ts', '_dir', '_spk')
+
+    def __init__(self, d):
+        d = dict(d)
+        spk = d.pop('speakers', None)
+        # call_date as epoch seconds unless it would not round-trip
+        cd = d.pop('call_date', None)
+        try:
+            self._ts = datetime.fromisoformat(cd).timestamp()
+            if datetime.fromtimestamp(self._ts).isoformat() != cd: raise ValueError
+            self._ts = int(self._ts) if self._ts.is_integer() else self._ts
+        except (TypeError, ValueError):
+            self._ts = cd
+        # filepath is usually <shared folder>/<filename>
+        fp, self._dir = d.get('filepath'), None
+        if (isinstance(fp, str) and d.get('filename')
+                and os.path.basename(fp) == d['filename']):
+            self._dir = sys.intern(os.path.dirname(fp)); d.pop('filepath')
+        super().__init__(d)
+        self._spk = Speaker.many(spk) if spk else None
+
+    @property
+    def call_date(self):
+        ts = self._ts
+        return datetime.fromtimestamp(ts).isoformat() if isinstance(ts, (int, float)) else ts
+
+    @property
+    def title(self):     return label(self.filename or '')
+
+    @property
+    def when(self):      return when(self._ts)
+
+    @property
+    def when_long(self): return when(self._ts, True)
+
+    @property
+    def filepath(self):
+        if self._dir is None: return super().get('filepath')
+        return os.path.join(self._dir, self.filename)
+
+    @property
+    def speakers(self):
+        return self._spk or []
+
+    def get(self, k, default=None):
+        if k in ('call_date', 'filepath', 'speakers'):
+            v = getattr(self, k)
+            return default if v is None else v
+        return super().get(k, default)
+
+    def __getitem__(self, k):
+        if k in ('call_date', 'filepath', 'speakers'): return getattr(self, k)
+        return super().__getitem__(k)
+
+    def to_dict(self):
+        d = super().to_dict()
+        d['call_date'] = self.call_date
+        if self._dir is not None: d['filepath'] = self.filepath
+        if self._spk: d['speakers'] = [s.to_dict() for s in self._spk]
+        return d
+
+
+# ─── Benchmark ────────────────────────────────────────────────────────────────
+def _bench(n=20000):
+    import random, tracemalloc
+    rnd = random.Random(0)
+    phones = [f'+91 98{rnd.randrange(10**8):08d}' for _ in range(n // 20 + 1)]
+
+    def fake(i):
+        return {'id': i, 'filename': f'Call%20recording%20{i:06d}.m4a',
+                'filepath': f'/sdcard/CallRecordings/Call%20recording%20{i:06d}.m4a',
+                'phone_number': ''.join(list(rnd.choice(phones))),   # fresh str, as sqlite returns
+                'call_date': f'2024-{1 + i % 12:02d}-{1 + i % 28:02d}T10:{i % 60:02d}:00',
+                'call_duration': rnd.randrange(600), 'processed': 1,
+                'total_speakers': 2, 'error_message': None}
+
+    def measure(build):
+        tracemalloc.start()
+        rows = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return rows, size
+
+    dicts, a = measure(lambda: [fake(i) for i in range(n)])
+    rnd.seed(0)
+    recs, b = measure(lambda: [Recording(fake(i)) for i in range(n)])
+    print(f'{n} recordings')
+    print(f'  dict      {a / n:8.1f} B/row   {a / 2**20:7.2f} MiB')
+    print(f'  Recording {b / n:8.1f} B/row   {b / 2**20:7.2f} MiB   ({a / b:.1f}x smaller)')
+
+
+if __name__ == '__main__':
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,198 @@
+"""
+Supervised analysis: one killable worker process per inference slot.
+
+analyse_audio_file runs in a child process that loads the engine once and
+serves files over a pipe. The parent waits on each file with a wall-clock
+budget scaled by the recording's length (read from the container header,
+capped at MAX_BUDGET_S); a file still sending progress when its budget runs
+out gets STALL_S more per message, up to the cap. Where /proc is available, it
+samples the child's RSS; a file that overruns either limit, or crashes the
+child, gets the child killed and a RuntimeError carrying the reason. The
+next file starts a fresh child, so one pathological input costs one slot
+for at most its own budget and never stalls the rest of the backlog. When
+the `cancelled` callable turns true, in-flight children are killed too and
+their files raise Cancelled.
+
+Supervisor.analyse(fi) has the pipeline.run() analyse signature, so it can
+be dropped into _run_scan / vocald_cli with infer=workers threads.
+"""
+
+import multiprocessing as mp
+import os, queue, time
+
+BASE_S       = 90.0      # fixed budget per file (decode + model warm-up jitter)
+PER_AUDIO_S  = 2.0       # plus this many seconds per second of audio
+START_S      = 300.0     # child start-up: import + model load
+MAX_RSS_MB   = 1536
+CODEC_BPS    = 4000      # unknown length: assume 32 kbit/s, typical of AAC call audio
+MAX_BUDGET_S = 1800.0    # hard ceiling per file, progress or not
+STALL_S      = 120.0     # deadline extension after each progress message
+_SAMPLE_S    = 0.25
+
+
+class Cancelled(RuntimeError):
+    pass
+
+
+def duration(path):
+    """Recording length in seconds: from the container header (WAV, MP4/3GP,
+    AMR), otherwise estimated from the file size at CODEC_BPS."""
+    import audiohdr
+    secs = audiohdr.duration(path)
+    return secs if secs is not None else os.path.getsize(path) / CODEC_BPS
+
+
+def budget(path, base=BASE_S, per_audio=PER_AUDIO_S, cap=MAX_BUDGET_S):
+    try:
+        return min(cap, base + per_audio * duration(path))
+    except OSError:
+        return base
+
+
+def _rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# ─── Child ────────────────────────────────────────────────────────────────────
+def _serve(conn, data_dir):
+    import analysis, vocald_engine as engine
+    engine.init_engine(data_dir)
+    conn.send(('ready',))
+    while True:
+        try:
+            op, fi = conn.recv()
+        except EOFError:
+            return
+        try:
+            if op == 'preview':
+                conn.send(('ok', analysis.preview(engine, fi), 0.0))
+                continue
+            t = time.perf_counter()
+            analysis.sniff(fi['filepath'])
+            sp = engine.analyse_audio_file(fi['filepath'], fi['filename'],
+                                           lambda s: conn.send(('prog', s)))
+            conn.send(('ok', sp, time.perf_counter() - t))
+        except Exception as e:
+            conn.send(('err', f'{type(e).__name__}: {e}'))
+
+
+def _context():
+    # no sys.executable to spawn from inside an Android app: fork there. Forking
+    # a threaded Kivy process is not guaranteed safe, which is why the app
+    # leaves supervision off unless the user turns it on.
+    if 'ANDROID_ARGUMENT' in os.environ: return mp.get_context('fork')
+    return mp.get_context('spawn')
+
+
+class _Worker:
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.proc = self.conn = None
+        self.killed = 0             # files that cost this worker its process
+
+    def _start(self):
+        ctx = _context()
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_serve, args=(child, self.data_dir),
+                                daemon=True, name='vocald-analyse')
+        self.proc.start()
+        child.close()
+        if not self.conn.poll(START_S):
+            self.kill(); raise RuntimeError('analysis worker did not start')
+        msg = self._recv()
+        if msg[0] != 'ready':
+            self.kill(); raise RuntimeError('analysis worker failed to start')
+
+    def _recv(self):
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            if self.proc is not None: self.proc.join(1)
+            code = self.proc.exitcode if self.proc else None
+            self.kill(); self.killed += 1
+            raise RuntimeError(f'analysis worker crashed (exit {code})') from None
+
+    def kill(self):
+        if self.proc is not None and self.proc.is_alive():
+            self.proc.kill()
+        if self.proc is not None: self.proc.join(5)
+        if self.conn is not None: self.conn.close()
+        self.proc = self.conn = None
+
+    def call(self, op, fi, limit, max_rss, progress=None, cancelled=None,
+             cap=MAX_BUDGET_S):
+        if self.proc is None or not self.proc.is_alive(): self._start()
+        self.conn.send((op, fi))
+        t0  = time.monotonic()
+        end = t0 + limit
+        while True:             # limits are checked on every wake-up, progress or not
+            if self.conn.poll(_SAMPLE_S):
+                msg = self._recv()
+                if msg[0] == 'err': raise RuntimeError(msg[1])
+                if msg[0] != 'prog': return msg[1], msg[2]
+                if progress: progress(msg[1])
+                end = max(end, min(t0 + cap, time.monotonic() + STALL_S))
+            elif not self.proc.is_alive():
+                self._recv()                        # raises with the exit code
+            if cancelled and cancelled():
+                self.kill(); raise Cancelled('cancelled')
+            if time.monotonic() > end:
+                self.kill(); self.killed += 1
+                raise RuntimeError(f'timed out after {time.monotonic() - t0:.0f} s')
+            rss = _rss_mb(self.proc.pid)
+            if max_rss and rss and rss > max_rss:
+                self.kill(); self.killed += 1
+                raise RuntimeError(f'memory limit exceeded ({rss:.0f} MB > {max_rss} MB)')
+
+
+# ─── Supervisor ───────────────────────────────────────────────────────────────
+class Supervisor:
+    """`workers` isolated analysis processes, started lazily. Thread-safe:
+    each analyse() call borrows one worker for the duration of the file.
+    `cancelled()` is polled while a file runs; true kills its worker."""
+
+    def __init__(self, data_dir, workers=1, max_rss_mb=MAX_RSS_MB,
+                 base_s=BASE_S, per_audio_s=PER_AUDIO_S, progress=None,
+                 cancelled=None, cap_s=MAX_BUDGET_S):
+        self.workers  = max(1, workers)
+        self.max_rss  = max_rss_mb
+        self.base_s, self.per_audio_s, self.cap_s = base_s, per_audio_s, cap_s
+        self.progress, self.cancelled = progress, cancelled
+        self._all  = [_Worker(data_dir) for _ in range(self.workers)]
+        self._free = queue.Queue()
+        for w in self._all: self._free.put(w)
+
+    @property
+    def killed(self): return sum(w.killed for w in self._all)
+
+    def _call(self, op, fi, limit):
+        w = self._free.get()
+        try:
+            return w.call(op, fi, limit, self.max_rss, self.progress, self.cancelled,
+                          self.cap_s)
+        finally:
+            self._free.put(w)
+
+    def analyse(self, fi):
+        """(sp, secs) for one scanned file; RuntimeError with the reason when
+        the file fails, overruns its budget or the memory ceiling."""
+        return self._call('analyse', fi,
+                          budget(fi['filepath'], self.base_s, self.per_audio_s,
+                                 self.cap_s))
+
+    def preview(self, fi):
+        """analysis.preview() in the worker; None on any failure."""
+        try:
+            return self._call('preview', fi, self.base_s)[0]
+        except Exception:
+            return None
+
+    def close(self):
+        for w in self._all: w.kill()
+
+    def __enter__(self):  return self
+    def __exit__(self, *_): self.close()
@@ -0,0 +1,25 @@
+import os, sqlite3, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# the subset of the engine schema the sidecar modules read and write
+ENGINE_SCHEMA = """
+CREATE TABLE voice_profiles (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT,
+    total_recordings INTEGER DEFAULT 0, first_seen TEXT, last_seen TEXT);
+CREATE TABLE recordings (id INTEGER PRIMARY KEY AUTOINCREMENT, filename TEXT,
+    phone_number TEXT, call_date TEXT, call_duration REAL, total_speakers INTEGER,
+    processed INTEGER DEFAULT 0);
+CREATE TABLE speakers (id INTEGER PRIMARY KEY AUTOINCREMENT, recording_id INTEGER,
+    speaker_index INTEGER, name TEXT, confidence REAL, voice_profile_id INTEGER);
+"""
+
+
+@pytest.fixture
+def engine_db(tmp_path):
+    path = str(tmp_path / 'vocald.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(ENGINE_SCHEMA)
+    conn.close()
+    return path
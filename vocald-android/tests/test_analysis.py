@@ -0,0 +1,25 @@
+import sqlite3
+
+import analysis
+import profile_store as ps
+
+
+def _profile(db):
+    conn = sqlite3.connect(db)
+    with conn:
+        pid = conn.execute('INSERT INTO voice_profiles (total_recordings) VALUES (1)').lastrowid
+    conn.close()
+    return pid
+
+
+def test_settle_flags_profiles_split_across_workers(engine_db):
+    old = _profile(engine_db)
+    ps.record(engine_db, [{'voice_profile_id': old, 'embedding': [0, 0, 1]}])
+    mark = analysis.batch_mark(engine_db)
+    assert mark == old
+    a, b = _profile(engine_db), _profile(engine_db)      # same caller, two workers
+    ps.record(engine_db, [{'voice_profile_id': a, 'embedding': [1, 0, 0]}])
+    ps.record(engine_db, [{'voice_profile_id': b, 'embedding': [1, 0.02, 0]}])
+    assert analysis.settle(engine_db, mark) == 1
+    assert ps.pending(engine_db) == 1 and analysis.batch_mark(engine_db) == b   # nothing deleted
+    assert analysis.settle(engine_db, analysis.batch_mark(engine_db)) == 0
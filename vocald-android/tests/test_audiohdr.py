@@ -0,0 +1,57 @@
+import io, struct, wave
+
+import numpy as np
+import pytest
+
+import audiohdr
+
+
+def _ftyp(brand):
+    return struct.pack('>I', 24) + b'ftyp' + brand + b'\0\0\0\0' + b'isommp41'
+
+
+@pytest.mark.parametrize('head, kind', [
+    (b'RIFF\0\0\0\0WAVEfmt ', 'wav'),
+    (b'#!AMR\n', 'amr'),
+    (_ftyp(b'3gp4'), '3gp'),
+    (_ftyp(b'3g2a'), '3gp'),
+    (_ftyp(b'M4A '), 'm4a'),
+    (_ftyp(b'mp4a'), 'm4a'),
+    (_ftyp(b'f4a '), 'm4a'),
+    (_ftyp(b'qt  '), 'm4a'),
+    (b'OggS\0\2', 'ogg'),
+    (b'fLaC\0\0\0\x22', 'flac'),
+    (b'ID3\4\0', 'mp3'),
+    (b'\xff\xfb\x90\x64', 'mp3'),
+    (b'\xff\xf1\x50\x80', 'aac'),
+    (b'%PDF-1.7', None),
+    (b'', None),
+])
+def test_what(head, kind):
+    assert audiohdr.what(None, head) == kind
+
+
+def test_what_leaves_file_position():
+    f = io.BytesIO(b'xx#!AMR\n')
+    f.seek(2)
+    assert audiohdr.what(f) == 'amr' and f.tell() == 2
+
+
+def test_read_wav_is_a_view(tmp_path):
+    p = tmp_path / 'a.wav'
+    x = (np.arange(1000, dtype='<i2') - 500).reshape(-1, 2)
+    with wave.open(str(p), 'wb') as w:
+        w.setnchannels(2); w.setsampwidth(2); w.setframerate(8000)
+        w.writeframes(x.tobytes())
+    a, rate = audiohdr.read_wav(str(p))
+    assert rate == 8000 and a.shape == (500, 2) and (a == x).all()
+    assert not a.flags.writeable
+
+
+def test_truncated_fmt_chunk_is_a_value_error():
+    buf = b'RIFF\0\0\0\0WAVE' + b'fmt ' + struct.pack('<I', 16) + b'\1\0\1\0'
+    with pytest.raises(ValueError, match='fmt'):
+        audiohdr.wav_info(buf)
+    short = b'RIFF\0\0\0\0WAVE' + b'fmt ' + struct.pack('<I', 4) + b'\1\0\1\0'
+    with pytest.raises(ValueError):
+        audiohdr.wav_info(short)
@@ -0,0 +1,41 @@
+import sqlite3
+
+import pytest
+
+import bench_ident as bi
+
+
+def test_eer_separable_and_overlapping():
+    assert bi.eer([0.9, 0.8, 0.7], [0.1, 0.2, 0.3]) == 0.0
+    assert bi.eer([0.6, 0.4], [0.5, 0.3]) == pytest.approx(0.5)
+    assert bi.eer([], [0.1]) is None
+
+
+def test_split_error_uses_right_and_wrong_choices():
+    assert bi.split_error([90, 80, 20, 10], [True, True, False, False]) == 0.0
+    assert bi.split_error([90, 80], [True, True]) is None
+
+
+def test_calibration_scale_is_explicit():
+    ece, rows = bi.calibration([90, 90, 10, 10], [True, True, False, False])
+    assert ece == pytest.approx(0.1)
+    assert [r[2] for r in rows] == [2, 2]
+    # fractions need scale=1 — no guessing from the data
+    ece, _ = bi.calibration([0.5, 0.5], [True, False], scale=1.0)
+    assert ece == pytest.approx(0.0)
+    assert bi.calibration([], []) == (None, [])
+
+
+def test_copy_db_overwrites_with_connection_open(tmp_path):
+    a, b = str(tmp_path / 'a.db'), str(tmp_path / 'b.db')
+    with sqlite3.connect(a) as c: c.execute('CREATE TABLE t (x)'); c.execute('INSERT INTO t VALUES (1)')
+    held = sqlite3.connect(b)
+    held.execute('CREATE TABLE t (x)'); held.execute('INSERT INTO t VALUES (2)'); held.commit()
+    bi._copy_db(a, b)
+    assert held.execute('SELECT x FROM t').fetchall() == [(1,)]
+    held.close()
+
+
+def test_synthetic_corpus_layout(tmp_path):
+    files = bi.corpus(bi.synth(str(tmp_path), speakers=2, files=2, secs=0.2))
+    assert sorted(files) == ['spk00', 'spk01'] and all(len(v) == 2 for v in files.values())
@@ -0,0 +1,159 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+import bundle
+import profile_store as ps
+from conftest import ENGINE_SCHEMA
+
+
+def _db(tmp_path, name):
+    path = str(tmp_path / name)
+    conn = sqlite3.connect(path)
+    conn.executescript(ENGINE_SCHEMA)
+    conn.close()
+    return path
+
+
+def _fill(db, vecs, names=None):
+    conn = sqlite3.connect(db)
+    with conn:
+        pids = [conn.execute('INSERT INTO voice_profiles (name, total_recordings, '
+                             'first_seen, last_seen) VALUES (?,?,?,?)',
+                             ((names or {}).get(i), 2, '2026-01-0%d' % (i + 1),
+                              '2026-02-0%d' % (i + 1))).lastrowid
+                for i in range(len(vecs))]
+        rid = conn.execute("INSERT INTO recordings (filename, call_date, total_speakers, "
+                           "processed) VALUES ('a.m4a', '2026-02-01', 1, 1)").lastrowid
+        conn.execute('INSERT INTO speakers (recording_id, speaker_index, voice_profile_id) '
+                     'VALUES (?,0,?)', (rid, pids[0]))
+    conn.close()
+    for pid, v in zip(pids, vecs):
+        ps.record(db, [{'voice_profile_id': pid, 'embedding': v}])
+    return pids
+
+
+def _count(db, table):
+    conn = sqlite3.connect(db)
+    n = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    conn.close()
+    return n
+
+
+def test_round_trip(tmp_path):
+    rng = np.random.default_rng(1)
+    src = _db(tmp_path, 'src.db')
+    _fill(src, rng.standard_normal((5, 16)), names={0: 'Asha'})
+    out = str(tmp_path / 'p.vcdx')
+    tot = bundle.export(src, out, recordings=True)
+    assert (tot['profiles'], tot['recordings']) == (5, 1)
+    assert bundle.verify(out)['profiles'] == 5
+
+    dst = _db(tmp_path, 'dst.db')
+    rep = bundle.load(dst, out)
+    assert (rep['added'], rep['merged'], rep['recordings']) == (5, 0, 1)
+    conn = ps.connect(dst)
+    assert conn.execute("SELECT COUNT(*) FROM voice_profiles WHERE name='Asha'").fetchone()[0] == 1
+    _, _, X = ps.load(conn)
+    conn.close()
+    conn = ps.connect(src)
+    _, _, Y = ps.load(conn)
+    conn.close()
+    assert np.min(np.sum(X * Y, axis=1)) > 0.99
+
+
+def test_import_merges_known_voices(tmp_path):
+    rng = np.random.default_rng(2)
+    V = rng.standard_normal((3, 16))
+    src, dst = _db(tmp_path, 'src.db'), _db(tmp_path, 'dst.db')
+    _fill(src, V)
+    _fill(dst, V[:2] + 0.01)
+    out = str(tmp_path / 'p.vcdx')
+    bundle.export(src, out)
+    rep = bundle.load(dst, out)
+    assert (rep['merged'], rep['added']) == (2, 1)
+    assert _count(dst, 'voice_profiles') == 3
+
+
+def test_best_matches_dense_argmax():
+    rng = np.random.default_rng(3)
+    V, X = rng.standard_normal((700, 8)), bundle._norm(rng.standard_normal((50, 8)))
+    idx, sc = bundle._best(V, X, block=64)
+    S = bundle._norm(V) @ X.T
+    assert (idx == S.argmax(1)).all()
+    assert np.allclose(sc, S.max(1), atol=1e-5)
+
+
+def test_corrupt_frame_changes_nothing(tmp_path):
+    src = _db(tmp_path, 'src.db')
+    _fill(src, np.eye(4))
+    out = str(tmp_path / 'p.vcdx')
+    bundle.export(src, out)
+    data = bytearray(open(out, 'rb').read())
+    data[-12] ^= 0xFF                           # inside the END frame's payload
+    open(out, 'wb').write(data)
+    dst = _db(tmp_path, 'dst.db')
+    with pytest.raises(bundle.BundleError):
+        bundle.load(dst, out)
+    assert _count(dst, 'voice_profiles') == 0
+
+
+def test_end_total_mismatch_is_caught_before_writing(tmp_path):
+    src = _db(tmp_path, 'src.db')
+    _fill(src, np.eye(4))
+    out = str(tmp_path / 'p.vcdx')
+    bundle.export(src, out)
+    data = open(out, 'rb').read()
+    # drop the END frame and write one that claims an extra profile
+    o, cut = bundle._HEAD.size, None
+    while o < len(data):
+        kind, n, zn, crc = bundle._FRAME.unpack_from(data, o)
+        if kind == b'END ': cut = o
+        o += bundle._FRAME.size + zn
+    with open(out, 'wb') as f:
+        f.write(data[:cut])
+        bundle._write(f, b'END ', b'{"profiles": 5, "recordings": 0}')
+    dst = _db(tmp_path, 'dst.db')
+    with pytest.raises(bundle.BundleError, match='profile count'):
+        bundle.load(dst, out)
+    assert _count(dst, 'voice_profiles') == 0
+
+
+def test_not_a_bundle(tmp_path):
+    p = tmp_path / 'x.vcdx'
+    p.write_bytes(b'RIFF' + bytes(40))
+    with pytest.raises(bundle.BundleError):
+        bundle.verify(str(p))
+
+
+def test_reimport_is_idempotent(tmp_path):
+    rng = np.random.default_rng(4)
+    src, dst = _db(tmp_path, 'src.db'), _db(tmp_path, 'dst.db')
+    _fill(src, rng.standard_normal((5, 16)))
+    out = str(tmp_path / 'p.vcdx')
+    bundle.export(src, out, recordings=True)
+    bundle.load(dst, out)
+
+    def state():
+        conn = ps.connect(dst)
+        s = (conn.execute('SELECT SUM(total_recordings) FROM voice_profiles').fetchone()[0],
+             conn.execute('SELECT SUM(count) FROM profile_vectors').fetchone()[0],
+             _count(dst, 'voice_profiles'), _count(dst, 'recordings'))
+        conn.close()
+        return s
+
+    before = state()
+    rep = bundle.load(dst, out)
+    assert (rep['known'], rep['added'], rep['merged'], rep['recordings']) == (5, 0, 0, 0)
+    assert state() == before == (10, 5, 5, 1)
+
+    # the source hears one voice again: a new export brings in only the growth
+    conn = sqlite3.connect(src)
+    with conn:
+        conn.execute('UPDATE voice_profiles SET total_recordings = 3 WHERE id = 1')
+    conn.close()
+    ps.record(src, [{'voice_profile_id': 1, 'embedding': rng.standard_normal(16)}])
+    bundle.export(src, out)
+    bundle.load(dst, out)
+    assert state() == (11, 6, 5, 1)
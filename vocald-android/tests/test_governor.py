@@ -0,0 +1,103 @@
+import governor
+from governor import Governor, Reading, StaticProvider, SysProvider
+
+
+def _policy(g, battery=None, charging=None, temp_c=None):
+    return g.decide(Reading(battery, charging, temp_c))[:2]
+
+
+def test_charging_or_unknown_runs_full():
+    g = Governor(max_workers=4)
+    assert _policy(g, 10, True, 30.0) == (4, 0.0)
+    assert _policy(g) == (4, 0.0)
+
+
+def test_battery_bands():
+    g = Governor(max_workers=4)
+    assert _policy(g, 80, False) == (2, 0.5)
+    assert _policy(Governor(max_workers=4), 30, False) == (1, 2.0)
+    assert _policy(Governor(max_workers=4), 10, False) == (1, 60.0)
+
+
+def test_heat_overrides_charging():
+    assert _policy(Governor(max_workers=4), 100, True, 50.0) == (1, 5.0)
+    g = Governor(max_workers=4)
+    w, p, why = g.decide(Reading(100, True, 65.0))
+    assert (w, p) == (1, 30.0) and 'cooling' in why
+
+
+def test_thermal_hysteresis():
+    g = Governor(max_workers=4)
+    assert _policy(g, None, None, 47.0) == (4, 0.0)
+    assert _policy(g, None, None, 48.5) == (1, 5.0)
+    assert _policy(g, None, None, 47.0) == (1, 5.0)      # hovering: stays throttled
+    assert _policy(g, None, None, 44.0) == (4, 0.0)      # HYST_C below: released
+    assert _policy(g, None, None, 61.0) == (1, 30.0)
+    assert _policy(g, None, None, 58.0) == (1, 30.0)
+    assert _policy(g, None, None, 56.0) == (1, 5.0)
+
+
+def test_battery_hysteresis_and_charger_resets():
+    g = Governor(max_workers=4)
+    assert _policy(g, 40, False) == (1, 2.0)
+    assert _policy(g, 43, False) == (1, 2.0)
+    assert _policy(g, 46, False) == (2, 0.5)
+    assert _policy(g, 15, False) == (1, 60.0)
+    assert _policy(g, 19, False) == (1, 60.0)
+    assert _policy(g, 19, True) == (4, 0.0)
+    assert _policy(g, 19, False) == (1, 2.0)             # unplugged: band re-entered fresh
+
+
+def test_policy_caches_for_interval(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(governor.time, 'monotonic', lambda: clock[0])
+    prov = StaticProvider(80, False)
+    g = Governor(prov, max_workers=4, interval=10.0)
+    assert g.policy() == (2, 0.5) and g.reason == 'on battery'
+    prov.reading = Reading(80, True, None)
+    clock[0] += 5
+    assert g.policy() == (2, 0.5)
+    clock[0] += 6
+    assert g.policy() == (4, 0.0)
+
+
+def test_policy_survives_provider_errors():
+    class Broken:
+        def read(self): raise OSError('gone')
+    assert Governor(Broken(), max_workers=3).policy() == (3, 0.0)
+
+
+def _sysfs(root, files):
+    for rel, text in files.items():
+        p = root / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(text + '\n')
+    return str(root)
+
+
+def test_sys_provider_reads_fake_tree(tmp_path):
+    root = _sysfs(tmp_path, {
+        'power_supply/AC/type': 'Mains',
+        'power_supply/battery/type': 'Battery',
+        'power_supply/battery/capacity': '37',
+        'power_supply/battery/status': 'Discharging',
+        'thermal/thermal_zone0/type': 'cpu-0-0',
+        'thermal/thermal_zone0/temp': '41000',
+        'thermal/thermal_zone1/type': 'soc-thermal',
+        'thermal/thermal_zone1/temp': '45500',
+        'thermal/thermal_zone2/type': 'battery',
+        'thermal/thermal_zone2/temp': '90000',       # not a CPU zone
+        'thermal/thermal_zone3/type': 'cpu-1-0',
+        'thermal/thermal_zone3/temp': '-1',          # sensor not ready
+    })
+    assert SysProvider(root).read() == Reading(37, False, 45.5)
+
+
+def test_sys_provider_full_counts_as_charging_and_missing_is_none(tmp_path):
+    root = _sysfs(tmp_path, {
+        'power_supply/bms/type': 'Battery',
+        'power_supply/bms/capacity': 'unknown',
+        'power_supply/bms/status': 'Full',
+    })
+    assert SysProvider(root).read() == Reading(None, True, None)
+    assert SysProvider(str(tmp_path / 'nowhere')).read() == Reading(None, None, None)
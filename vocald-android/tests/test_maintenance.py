@@ -0,0 +1,75 @@
+import sqlite3
+import time
+
+import numpy as np
+
+import maintenance
+import profile_store as ps
+
+
+def _fill(db, n=300):
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.executemany('INSERT INTO voice_profiles (name) VALUES (?)',
+                         [('p%d' % i,) for i in range(n)])
+        conn.executemany("INSERT INTO recordings (filename, processed) VALUES (?, 1)",
+                         [('r%d.m4a' % i,) for i in range(n)])
+        conn.executemany('INSERT INTO speakers (recording_id, voice_profile_id, name) '
+                         'VALUES (?, ?, ?)', [(i + 1, i + 1, 'x' * 200) for i in range(n)])
+    conn.close()
+    ps.record(db, [{'voice_profile_id': 1, 'embedding': np.ones(16)}])
+
+
+def _rows(db, table):
+    conn = sqlite3.connect(db)
+    n = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    conn.close()
+    return n
+
+
+def test_wipe_empties_tables_and_keeps_schema(engine_db):
+    conn = sqlite3.connect(engine_db)
+    conn.execute('CREATE INDEX idx_spk_rec ON speakers(recording_id)')
+    conn.close()
+    _fill(engine_db)
+    stages = []
+    freed = maintenance.wipe(engine_db, progress=lambda s, f: stages.append((s, f)))
+    assert freed > 0
+    for t in ('voice_profiles', 'recordings', 'speakers', 'profile_vectors'):
+        assert _rows(engine_db, t) == 0
+    conn = sqlite3.connect(engine_db)
+    names = {r[0] for r in conn.execute('SELECT name FROM sqlite_master')}
+    assert {'idx_spk_rec', 'merge_hints', 'bundle_imports'} <= names
+    # AUTOINCREMENT counters restart
+    assert conn.execute("INSERT INTO voice_profiles (name) VALUES ('a')").lastrowid == 1
+    conn.close()
+    assert ('wipe', 1.0) in stages and stages[-1] == ('vacuum', 1.0)
+
+
+def test_maintain_report_and_vacuum_when_fragmented(engine_db):
+    _fill(engine_db, 2000)
+    conn = sqlite3.connect(engine_db)
+    with conn:
+        conn.execute('DELETE FROM speakers')
+    assert maintenance.needs_vacuum(conn)
+    conn.close()
+    rep = maintenance.maintain(engine_db)
+    assert set(rep) == {'analyze_s', 'vacuum_s', 'bytes_before', 'bytes_after'}
+    assert rep['vacuum_s'] > 0 and rep['bytes_after'] < rep['bytes_before']
+    conn = sqlite3.connect(engine_db)
+    assert not maintenance.needs_vacuum(conn)
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name='sqlite_stat1'").fetchone()
+    conn.close()
+
+
+def test_maintain_skips_vacuum_on_a_compact_file(engine_db):
+    _fill(engine_db, 10)
+    rep = maintenance.maintain(engine_db)
+    assert rep['vacuum_s'] == 0.0
+    assert maintenance.maintain(engine_db, force=True)['vacuum_s'] > 0
+
+
+def test_due():
+    assert maintenance.due(None) and maintenance.due(0)
+    assert not maintenance.due(time.time() - 60)
+    assert maintenance.due(time.time() - maintenance.EVERY_S - 1)
@@ -0,0 +1,64 @@
+import asyncio, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+import pipeline
+
+
+class _Gov:
+    def __init__(self, workers, pause=0.0):
+        self.pol, self.reason = (workers, pause), ''
+
+    def policy(self): return self.pol
+
+
+def _run(tmp_path, n, infer, governor=None, cancelled=lambda: False, hook=None):
+    paths = []
+    for i in range(n):
+        p = tmp_path / f'{i}.wav'
+        p.write_bytes(b'RIFF\0\0\0\0WAVE' + b'\0' * 32)
+        paths.append({'filepath': str(p), 'filename': p.name})
+    live, peak, lock = [0], [0], threading.Lock()
+
+    def analyse(fi):
+        with lock: live[0] += 1; peak[0] = max(peak[0], live[0])
+        time.sleep(0.05)
+        with lock: live[0] -= 1
+        if hook: hook(fi)
+        return [], 0.05
+
+    written = []
+    with ThreadPoolExecutor(infer) as ex:
+        st = asyncio.run(pipeline.run(lambda: paths, analyse,
+                                      lambda items: written.extend(items) or len(items),
+                                      executor=ex, infer=infer, governor=governor,
+                                      cancelled=cancelled))
+    return st, peak[0], written
+
+
+def test_all_files_written(tmp_path):
+    st, _, written = _run(tmp_path, 6, 2)
+    assert st['files'] == st['done'] == len(written) == 6
+
+
+def test_governor_caps_concurrency(tmp_path):
+    st, peak, _ = _run(tmp_path, 8, 4, governor=_Gov(1, 0.01))
+    assert st['done'] == 8
+    assert peak == 1
+
+
+def test_governor_allows_its_worker_count(tmp_path):
+    _, peak, _ = _run(tmp_path, 8, 4, governor=_Gov(2))
+    assert peak == 2
+
+
+def test_cancel_releases_slots(tmp_path):
+    st, _, _ = _run(tmp_path, 6, 2, governor=_Gov(1), cancelled=lambda: True)
+    assert st['done'] == 0
+
+
+def test_failures_caused_by_cancel_are_not_written(tmp_path):
+    stop = threading.Event()
+    def kill(fi):
+        stop.set(); raise RuntimeError('cancelled')
+    st, _, written = _run(tmp_path, 4, 1, cancelled=stop.is_set, hook=kill)
+    assert written == [] and st['failed'] == 0
@@ -0,0 +1,171 @@
+import sqlite3
+
+import numpy as np
+
+import profile_store as ps
+
+
+def _unit(v):
+    v = np.asarray(v, np.float32)
+    return v / np.linalg.norm(v)
+
+
+def _profile(db, total=1, name=None):
+    conn = sqlite3.connect(db)
+    with conn:
+        pid = conn.execute('INSERT INTO voice_profiles (name, total_recordings) '
+                           'VALUES (?,?)', (name, total)).lastrowid
+    conn.close()
+    return pid
+
+
+def _speaker(db, rid, idx, pid):
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.execute('INSERT INTO speakers (recording_id, speaker_index, voice_profile_id) '
+                     'VALUES (?,?,?)', (rid, idx, pid))
+    conn.close()
+    return {'speaker_index': idx, 'voice_profile_id': pid}
+
+
+def test_record_keeps_running_mean(engine_db):
+    pid = _profile(engine_db)
+    for v in ([1, 0, 0], [0, 1, 0], [0, 0, 1]):
+        ps.record(engine_db, [{'voice_profile_id': pid, 'embedding': v}])
+    conn = ps.connect(engine_db)
+    n, m, m2, res = ps._get(conn, pid)
+    conn.close()
+    assert n == 3 and len(res) == 3
+    assert np.allclose(m, 1 / 3)
+
+
+def test_match_reranks_by_reservoir(engine_db):
+    a, b = _profile(engine_db), _profile(engine_db)
+    ps.record(engine_db, [{'voice_profile_id': a, 'embedding': [1, 0, 0]}])
+    ps.record(engine_db, [{'voice_profile_id': b, 'embedding': [0, 1, 0]}])
+    conn = ps.connect(engine_db)
+    assert ps.match(conn, _unit([0.1, 1, 0]))[0] == b
+    assert ps.match(conn, [0, 0, 1], ids=[a])[0] == a
+    conn.close()
+
+
+def test_reconcile_flags_a_new_duplicate_without_merging(engine_db):
+    old = _profile(engine_db, total=4)
+    ps.record(engine_db, [{'voice_profile_id': old, 'embedding': [1, 0, 0]}])
+    mark = old
+    new = _profile(engine_db)
+    spks = [_speaker(engine_db, 7, 0, new)]
+    sp   = [{'speaker_index': 0, 'embedding': _unit([1, 0.05, 0])}]
+    assert ps.reconcile(engine_db, sp, spks, mark) == {new: old}
+    conn = sqlite3.connect(engine_db)
+    assert conn.execute('SELECT voice_profile_id FROM speakers').fetchone()[0] == new
+    assert conn.execute('SELECT COUNT(*) FROM voice_profiles').fetchone()[0] == 2
+    conn.close()
+    assert ps.pending(engine_db) == 1
+    rep = ps.consolidate(engine_db, apply=True)       # the user confirms
+    assert rep['groups'] == [[old, new]] and rep['merged'] == 1
+    assert ps.pending(engine_db) == 0
+
+
+def test_reconcile_leaves_distinct_voices(engine_db):
+    old = _profile(engine_db)
+    ps.record(engine_db, [{'voice_profile_id': old, 'embedding': [1, 0, 0]}])
+    new  = _profile(engine_db)
+    spks = [_speaker(engine_db, 7, 0, new)]
+    sp   = [{'speaker_index': 0, 'embedding': [0, 1, 0]}]
+    assert ps.reconcile(engine_db, sp, spks, old) == {}
+
+
+def test_reconcile_ignores_legacy_profiles_without_vectors(engine_db):
+    mom  = _profile(engine_db, total=50, name='Mom')          # predates the sidecar
+    aunt = _profile(engine_db, total=3, name='Aunt')
+    ps.record(engine_db, [{'voice_profile_id': aunt, 'embedding': [1, 0, 0]}])
+    mark = aunt                                               # before this commit
+    spks = [_speaker(engine_db, 9, 0, mom)]
+    sp   = [{'speaker_index': 0, 'embedding': _unit([1, 0.1, 0])}]
+    assert ps.reconcile(engine_db, sp, spks, mark) == {}
+    assert ps.pending(engine_db) == 0
+    conn = sqlite3.connect(engine_db)
+    assert conn.execute('SELECT id, name, total_recordings FROM voice_profiles '
+                        'ORDER BY id').fetchall() == [(mom, 'Mom', 50), (aunt, 'Aunt', 3)]
+    conn.close()
+
+
+def test_merge_combines_profiles(engine_db):
+    a, b = _profile(engine_db, total=3), _profile(engine_db, total=1)
+    ps.record(engine_db, [{'voice_profile_id': a, 'embedding': [1, 0]}], phone='+91 98765 43210')
+    ps.record(engine_db, [{'voice_profile_id': b, 'embedding': [0, 1]}], phone='098765 43210')
+    _speaker(engine_db, 1, 0, b)
+    assert ps.merge(engine_db, [[a, b]]) == 1
+    conn = ps.connect(engine_db)
+    assert conn.execute('SELECT total_recordings FROM voice_profiles').fetchall() == [(4,)]
+    assert conn.execute('SELECT voice_profile_id FROM speakers').fetchone()[0] == a
+    n, m, _, _ = ps._get(conn, a)
+    assert n == 2 and np.allclose(m, 0.5)
+    assert ps.phone_candidates(conn, '9876543210') == [a]
+    conn.close()
+
+
+def test_match_for_phone_tries_the_callers_profiles_first(engine_db):
+    a, b = _profile(engine_db), _profile(engine_db)
+    ps.record(engine_db, [{'voice_profile_id': a, 'embedding': [1, 0, 0]}], phone='111')
+    ps.record(engine_db, [{'voice_profile_id': b, 'embedding': [0, 1, 0]}], phone='222')
+    conn = ps.connect(engine_db)
+    before = dict(ps.phone_stats)
+    assert ps.match_for_phone(conn, '111', [1, 0.1, 0])[0] == a
+    assert ps.match_for_phone(conn, '111', [0, 1, 0])[0] == b      # falls back
+    assert ps.match_for_phone(conn, '333', [0, 1, 0])[0] == b
+    conn.close()
+    assert ps.phone_stats['hits'] - before['hits'] == 1
+    assert ps.phone_stats['misses'] - before['misses'] == 1
+    assert ps.phone_stats['no_prior'] - before['no_prior'] == 1
+
+
+def test_cluster_groups_near_duplicates():
+    rng = np.random.default_rng(0)
+    C = rng.standard_normal((5, 32))
+    X = np.vstack([C, C[:2] + 0.05 * rng.standard_normal((2, 32))])
+    X = X / np.linalg.norm(X, axis=1, keepdims=True)
+    groups = sorted(ps.cluster(X, 0.1))
+    assert groups == [[0, 5], [1, 6], [2], [3], [4]]
+
+
+def test_cluster_blocks_match_a_single_pass():
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((600, 4))
+    X = X / np.linalg.norm(X, axis=1, keepdims=True)
+    assert set(ps._close(X, 0.05, block=64)) == set(ps._close(X, 0.05, block=600))
+    assert ps.cluster(np.zeros((0, 4))) == []
+
+
+def test_consolidate_reports_coverage(engine_db):
+    a, b, _ = _profile(engine_db, 3), _profile(engine_db), _profile(engine_db)
+    ps.record(engine_db, [{'voice_profile_id': a, 'embedding': [1, 0, 0]}])
+    ps.record(engine_db, [{'voice_profile_id': b, 'embedding': _unit([1, 0.05, 0])}])
+    rep = ps.consolidate(engine_db)
+    assert rep['groups'] == [[a, b]]
+    assert (rep['profiles_before'], rep['profiles_compared'], rep['profiles_after']) == (3, 2, 2)
+    assert rep['merged'] == 0
+    assert ps.consolidate(engine_db, apply=True)['merged'] == 1
+
+
+def test_consolidate_since_leaves_older_duplicates(engine_db):
+    a, b = _profile(engine_db), _profile(engine_db)
+    ps.record(engine_db, [{'voice_profile_id': a, 'embedding': [1, 0, 0]}])
+    ps.record(engine_db, [{'voice_profile_id': b, 'embedding': [1, 0.01, 0]}])
+    mark = b
+    c = _profile(engine_db)
+    ps.record(engine_db, [{'voice_profile_id': c, 'embedding': [0, 1, 0.02]}])
+    d = _profile(engine_db)
+    ps.record(engine_db, [{'voice_profile_id': d, 'embedding': [0, 1, 0]}])
+    rep = ps.consolidate(engine_db, since=mark)
+    assert rep['groups'] == [[c, d]] and rep['profiles_after'] == 3
+
+
+def test_cluster_does_not_chain_distinct_voices():
+    a = np.radians([0, 30, 60, 90])
+    X = np.stack([np.cos(a), np.sin(a)], 1)
+    groups = sorted(ps.cluster(X, 0.25))
+    assert groups == [[0, 1], [2, 3]]
+    for g in groups:
+        assert np.min(X[g] @ X[g].T) >= 0.75
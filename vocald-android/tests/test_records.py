@@ -0,0 +1,61 @@
+import pytest
+
+from records import Profile, Recording, Speaker, label, when
+
+ROW = {'id': 7, 'filename': 'Call%20Asha.m4a',
+       'filepath': '/sdcard/CallRecordings/Call%20Asha.m4a',
+       'phone_number': '+91 9800000000', 'call_date': '2024-01-02T10:00:00',
+       'call_duration': 93.5, 'processed': 1, 'total_speakers': 2,
+       'error_message': None, 'notes': {'tag': 'work'},
+       'speakers': [{'speaker_index': 0, 'name': 'Asha%20K', 'confidence': 0.9,
+                     'voice_profile_id': 3},
+                    {'speaker_index': 1, 'name': None, 'confidence': 0.4,
+                     'voice_profile_id': 4, 'embedding_ms': 12}]}
+
+
+def test_round_trip():
+    r = Recording(ROW)
+    d = r.to_dict()
+    want = {k: v for k, v in ROW.items() if k not in ('error_message', 'speakers')}
+    assert {k: d[k] for k in want} == want
+    assert 'error_message' not in d                 # None extras are dropped
+    assert [s.to_dict() for s in r.speakers] == [
+        {k: v for k, v in s.items()} for s in ROW['speakers']]
+    assert Recording(d).to_dict() == d
+
+
+def test_dict_api():
+    r = Recording(ROW)
+    assert r['filename'] == r.filename == 'Call%20Asha.m4a'
+    assert r['notes'] == {'tag': 'work'} and 'notes' in r
+    assert r.get('error_message', 'none') == 'none' and 'error_message' not in r
+    assert r.get('filepath') == ROW['filepath'] and r['call_date'] == ROW['call_date']
+    with pytest.raises(KeyError):
+        r['missing']
+    assert Recording({'id': 1}).speakers == [] and Recording({'id': 1}).get('speakers') == []
+
+
+def test_filepath_outside_the_folder_is_kept_verbatim():
+    r = Recording(dict(ROW, filepath='/elsewhere/renamed.m4a'))
+    assert r._dir is None and r.filepath == '/elsewhere/renamed.m4a'
+    a, b = Recording(ROW), Recording(dict(ROW, id=8))
+    assert a._dir is b._dir                          # interned folder
+
+
+def test_call_date_forms():
+    r = Recording(ROW)
+    assert isinstance(r._ts, int)
+    assert r.when == '02 Jan 2024  10:00 AM' and r.when_long == '2024-01-02  10:00:00'
+    odd = Recording(dict(ROW, call_date='2024-01-02 10:00'))   # would not round-trip
+    assert odd.call_date == '2024-01-02 10:00'
+    assert Recording(dict(ROW, call_date=None)).call_date is None
+    assert when('garbage') == 'garbage'
+
+
+def test_titles_and_many():
+    assert Recording(ROW).title == 'Call Asha.m4a'
+    s = Speaker.many(ROW['speakers'])
+    assert [x.title for x in s] == ['Asha K', 'Unknown']
+    p = Profile.many([{'id': 3, 'name': 'Asha%20K', 'total_recordings': 4}])[0]
+    assert (p.title, p['total_recordings'], p.get('last_seen', '-')) == ('Asha K', 4, '-')
+    assert Profile.many(None) == [] and label(5) == '5'
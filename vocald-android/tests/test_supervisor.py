@@ -0,0 +1,120 @@
+import multiprocessing as mp
+import struct, sys, threading, time, wave
+
+import pytest
+
+import supervisor
+
+
+def _wav(path, secs, rate=8000):
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(1); w.setsampwidth(2); w.setframerate(rate)
+        w.writeframes(bytes(2 * int(secs * rate)))
+    return str(path)
+
+
+def test_wav_duration_is_exact(tmp_path):
+    assert supervisor.duration(_wav(tmp_path / 'a.wav', 3.0)) == pytest.approx(3.0)
+
+
+def _mp4(path, secs, version=0, moov_last=True):
+    ftyp = struct.pack('>I4s4sI', 16, b'ftyp', b'M4A ', 0)
+    if version == 1:
+        body = b'\1\0\0\0' + bytes(16) + struct.pack('>IQ', 1000, int(secs * 1000))
+    else:
+        body = bytes(4) + bytes(8) + struct.pack('>II', 44100, int(secs * 44100))
+    mvhd = struct.pack('>I4s', 8 + len(body), b'mvhd') + body
+    moov = struct.pack('>I4s', 8 + len(mvhd), b'moov') + mvhd
+    mdat = struct.pack('>I4s', 8 + 5000, b'mdat') + bytes(5000)
+    path.write_bytes(ftyp + (mdat + moov if moov_last else moov + mdat))
+    return str(path)
+
+
+def test_mp4_duration_from_mvhd(tmp_path):
+    assert supervisor.duration(_mp4(tmp_path / 'a.m4a', 61.5)) == pytest.approx(61.5)
+    assert supervisor.duration(_mp4(tmp_path / 'b.m4a', 7.25, 1, False)) == pytest.approx(7.25)
+
+
+def test_amr_duration_counts_frames(tmp_path):
+    p = tmp_path / 'a.amr'
+    frame = bytes([7 << 3 | 4]) + bytes(31)         # 12.2 kbit/s, 20 ms
+    p.write_bytes(b'#!AMR\n' + frame * 500)
+    assert supervisor.duration(str(p)) == pytest.approx(10.0)
+
+
+def test_unknown_length_uses_codec_rate(tmp_path):
+    p = tmp_path / 'a.mp3'
+    p.write_bytes(b'ID3' + bytes(39997))
+    assert supervisor.duration(str(p)) == pytest.approx(10.0)
+
+
+def test_budget_is_capped(tmp_path):
+    p = _mp4(tmp_path / 'long.m4a', 6 * 3600)
+    assert supervisor.budget(p) == supervisor.MAX_BUDGET_S
+
+
+def test_budget_scales_with_length(tmp_path):
+    short = supervisor.budget(_wav(tmp_path / 's.wav', 1.0), base=10, per_audio=2)
+    long_ = supervisor.budget(_wav(tmp_path / 'l.wav', 5.0), base=10, per_audio=2)
+    assert short == pytest.approx(12) and long_ == pytest.approx(20)
+    assert supervisor.budget(str(tmp_path / 'missing.wav'), base=10) == 10
+
+
+def _hang(conn, data_dir):
+    conn.send(('ready',))
+    conn.recv()
+    time.sleep(60)
+
+
+@pytest.fixture
+def hanging(monkeypatch):
+    if sys.platform != 'linux': pytest.skip('needs fork')
+    monkeypatch.setattr(supervisor, '_serve', _hang)
+    monkeypatch.setattr(supervisor, '_context', lambda: mp.get_context('fork'))
+
+
+def test_timeout_kills_the_worker(hanging, tmp_path):
+    with supervisor.Supervisor(str(tmp_path), base_s=0.5, per_audio_s=0) as sup:
+        with pytest.raises(RuntimeError, match='timed out'):
+            sup.analyse({'filepath': str(tmp_path / 'x.wav'), 'filename': 'x.wav'})
+        assert sup.killed == 1 and sup._all[0].proc is None
+
+
+def test_cancel_kills_in_flight_worker(hanging, tmp_path):
+    flag = threading.Event()
+    with supervisor.Supervisor(str(tmp_path), cancelled=flag.is_set) as sup:
+        threading.Timer(0.5, flag.set).start()
+        t = time.monotonic()
+        with pytest.raises(supervisor.Cancelled):
+            sup.analyse({'filepath': str(tmp_path / 'x.wav'), 'filename': 'x.wav'})
+        assert time.monotonic() - t < 5
+        assert sup._all[0].proc is None
+
+
+def _chatty(conn, data_dir):
+    conn.send(('ready',))
+    conn.recv()
+    for _ in range(8):
+        time.sleep(0.2); conn.send(('prog', 'working'))
+    conn.send(('ok', [], 1.6))
+    time.sleep(60)
+
+
+@pytest.fixture
+def chatty(monkeypatch):
+    if sys.platform != 'linux': pytest.skip('needs fork')
+    monkeypatch.setattr(supervisor, '_serve', _chatty)
+    monkeypatch.setattr(supervisor, '_context', lambda: mp.get_context('fork'))
+
+
+def test_progress_extends_the_deadline(chatty, tmp_path):
+    fi = {'filepath': str(tmp_path / 'x.wav'), 'filename': 'x.wav'}
+    with supervisor.Supervisor(str(tmp_path), base_s=0.5, per_audio_s=0) as sup:
+        assert sup.analyse(fi) == ([], 1.6)
+
+
+def test_progress_cannot_pass_the_cap(chatty, tmp_path):
+    fi = {'filepath': str(tmp_path / 'x.wav'), 'filename': 'x.wav'}
+    with supervisor.Supervisor(str(tmp_path), base_s=0.5, per_audio_s=0, cap_s=0.8) as sup:
+        with pytest.raises(RuntimeError, match='timed out'):
+            sup.analyse(fi)
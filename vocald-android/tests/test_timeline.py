@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+import profile_store
+import timeline
+
+
+def _sp(*spk):
+    return [{'speaker_index': k, 'segments': segs} for k, segs in spk]
+
+
+SPKS = [{'speaker_index': 0, 'voice_profile_id': 1},
+        {'speaker_index': 1, 'voice_profile_id': 2}]
+
+
+@pytest.fixture
+def db(engine_db):
+    conn = sqlite3.connect(engine_db)
+    with conn:
+        conn.executemany('INSERT INTO voice_profiles (id, total_recordings) VALUES (?,?)',
+                         [(1, 3), (2, 1)])
+    conn.close()
+    return engine_db
+
+
+def test_no_segments_creates_nothing(db):
+    assert timeline.record(db, 10, [{'speaker_index': 0}], SPKS, '2026-03-02') == 0
+    conn = sqlite3.connect(db)
+    assert not timeline.present(conn)
+    assert timeline.talk_time(conn, '2026-03') == {}
+    assert timeline.segments_for(conn, 10) == []
+    conn.close()
+
+
+def test_triggers_maintain_aggregates(db):
+    sp = _sp((0, [(0, 2.5), {'start': 4, 'end': 5}]), (1, [(2.5, 4)]))
+    assert timeline.record(db, 10, sp, SPKS, '2026-03-02T10:00') == 3
+    timeline.record(db, 11, _sp((0, [(0, 1)])), SPKS, '2026-03-09')
+    conn = sqlite3.connect(db)
+    assert timeline.talk_time(conn, '2026-03') == {1: (4.5, 3, 2), 2: (1.5, 1, 1)}
+    assert timeline.calls_with(conn, 1, min_s=2) == [(10, 3.5, 2)]
+    assert timeline.speaker_at(conn, 10, 3.0) == 1
+    assert timeline.speaker_at(conn, 10, 9.0) is None
+    conn.close()
+
+
+def test_rerecord_replaces_and_rolls_back_totals(db):
+    timeline.record(db, 10, _sp((0, [(0, 10)])), SPKS, '2026-03-02')
+    timeline.record(db, 10, _sp((0, [(0, 4)])), SPKS, '2026-03-02')
+    conn = sqlite3.connect(db)
+    assert timeline.talk_time(conn, '2026-03') == {1: (4.0, 1, 1)}
+    conn.close()
+
+
+def test_merge_repoints_segments(db):
+    timeline.record(db, 10, _sp((0, [(0, 2)]), (1, [(2, 5)])), SPKS, '2026-03-02')
+    profile_store.merge(db, [[1, 2]])
+    conn = sqlite3.connect(db)
+    assert timeline.talk_time(conn, '2026-03') == {1: (5.0, 2, 1)}
+    assert {p for *_, p in timeline.segments_for(conn, 10)} == {1}
+    conn.close()
@@ -0,0 +1,16 @@
+import json
+
+import vocald_cli
+
+
+def test_speaker_count_for_list_and_dict_results():
+    spk = [{'speaker_index': 0}, {'speaker_index': 1}]
+    assert vocald_cli._speakers(spk) == 2
+    assert vocald_cli._speakers({'speakers': spk, 'duration': 12.0}) == 2
+    assert vocald_cli._speakers({}) == vocald_cli._speakers(None) == 0
+
+
+def test_emit_writes_one_json_line(capsys):
+    vocald_cli._emit(event='file', file='a.m4a', speakers=2)
+    line = capsys.readouterr().out
+    assert line.endswith('\n') and json.loads(line)['speakers'] == 2
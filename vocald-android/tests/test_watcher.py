@@ -0,0 +1,76 @@
+import os
+import time
+
+import watcher
+
+
+class _Clock:
+    def __init__(self): self.t = 1000.0
+    def __call__(self): return self.t
+
+
+def test_candidate_waits_until_size_and_mtime_hold(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(watcher.time, 'monotonic', clock)
+    got = []
+    w = watcher.Watcher(str(tmp_path), got.append, settle=5.0)
+    p = tmp_path / 'call.m4a'
+    p.write_bytes(b'x' * 10)
+    w._touch(str(p))
+    w._check()                                  # first look: records size/mtime
+    clock.t += 6; w._check()
+    assert [fi['filename'] for fi in got] == ['call.m4a']
+    assert str(p) in w._seen and not w._cand
+
+    q = tmp_path / 'growing.m4a'
+    q.write_bytes(b'x' * 10)
+    w._touch(str(q)); w._check()
+    clock.t += 4
+    with open(q, 'ab') as f: f.write(b'y' * 10)  # still being written
+    w._check()
+    clock.t += 4; w._check()                     # 4 s since it last changed
+    assert len(got) == 1
+    clock.t += 2; w._check()
+    assert [fi['filename'] for fi in got] == ['call.m4a', 'growing.m4a']
+
+
+def test_empty_and_processed_files_are_not_handed_over(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(watcher.time, 'monotonic', clock)
+    got = []
+    w = watcher.Watcher(str(tmp_path), got.append,
+                        is_processed=lambda name, ms: name == 'old.m4a', settle=1.0)
+    for name, data in (('empty.m4a', b''), ('old.m4a', b'x')):
+        (tmp_path / name).write_bytes(data)
+        w._touch(str(tmp_path / name))
+    w._check(); clock.t += 2; w._check()
+    assert got == []
+    assert str(tmp_path / 'empty.m4a') in w._cand    # kept until it has data
+
+
+def test_walk_skips_hidden_and_non_audio(tmp_path):
+    (tmp_path / 'a.m4a').write_bytes(b'x')
+    (tmp_path / 'notes.txt').write_bytes(b'x')
+    (tmp_path / '.pending.m4a').write_bytes(b'x')
+    (tmp_path / 'sub' / 'deep' / 'deeper').mkdir(parents=True)
+    (tmp_path / 'sub' / 'b.AMR').write_bytes(b'x')
+    (tmp_path / 'sub' / 'deep' / 'deeper' / 'c.m4a').write_bytes(b'x')
+    _, files = watcher.Watcher(str(tmp_path), None, depth=1)._walk()
+    assert sorted(os.path.basename(p) for p in files) == ['a.m4a', 'b.AMR']
+
+
+def test_poll_mode_picks_up_new_file(tmp_path, monkeypatch):
+    def no_inotify(): raise OSError('unavailable')
+    monkeypatch.setattr(watcher, '_Inotify', no_inotify)
+    (tmp_path / 'before.m4a').write_bytes(b'x')
+    got = []
+    w = watcher.Watcher(str(tmp_path), got.append, settle=0.2, poll=0.1).start()
+    try:
+        t = time.monotonic() + 5
+        while w.mode is None and time.monotonic() < t: time.sleep(0.01)
+        (tmp_path / 'new.m4a').write_bytes(b'x' * 100)
+        while not got and time.monotonic() < t: time.sleep(0.05)
+    finally:
+        w.stop()
+    assert w.mode == 'poll'
+    assert [fi['filename'] for fi in got] == ['new.m4a']   # not the pre-existing one
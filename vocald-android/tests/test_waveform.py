@@ -0,0 +1,37 @@
+import wave
+
+import numpy as np
+
+import waveform
+
+
+def _wav(path, x, rate=8000):
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(1); w.setsampwidth(2); w.setframerate(rate)
+        w.writeframes(x.astype('<i2').tobytes())
+    return str(path)
+
+
+def test_envelope_levels():
+    x = np.zeros((8000, 1), np.int16)
+    x[4000:] = 16384
+    env = waveform.envelope(x, 8000, bins=8)
+    assert env.duration_ms == 1000 and len(env.peak) == 8
+    assert (env.peak[:4] == 0).all() and (env.peak[4:] >= 126).all()
+    assert env.spans == []
+
+
+def test_store_round_trip(tmp_path):
+    db = str(tmp_path / 'vocald.db')
+    sp = [{'speaker_index': 1, 'segments': [(0.1, 0.4)]}]
+    path = _wav(tmp_path / 'a.wav', np.full(4000, 1000))
+    assert waveform.record(db, 7, path, sp)
+    env = waveform.store_for(db).get(7)
+    assert env.duration_ms == 500 and env.spans == [(100, 400, 1)]
+    assert waveform.store_for(db).get(8) is None
+
+
+def test_non_wav_is_skipped(tmp_path):
+    p = tmp_path / 'a.amr'
+    p.write_bytes(b'#!AMR\n' + bytes(100))
+    assert not waveform.record(str(tmp_path / 'vocald.db'), 1, str(p), [])
@@ -0,0 +1,188 @@
+"""
+Speaker-segment timeline index.
+
+The engine keeps only per-speaker aggregates; the diarisation boundaries in
+an analysis result are kept here instead, as integer-millisecond intervals
+in a WITHOUT ROWID table clustered by recording. Two aggregate tables are
+maintained by triggers as segments are inserted or removed, so per-call and
+per-month talk time are indexed lookups rather than scans:
+
+    segments        (recording_id, start_ms, speaker_index) -> end_ms, profile_id
+    recording_talk  talk_ms / turns per (recording, profile), with the month
+    profile_month   talk_ms / turns / calls per (profile, 'YYYY-MM')
+
+Segments are only known when the engine's result lists per-speaker
+'segments'; the speaker rows it commits carry no timing. Until an engine
+build reports them, record() writes nothing, the tables are never created
+and the queries below return empty, so no talk-time UI is shown.
+"""
+
+import sqlite3
+from datetime import datetime
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    recording_id  INTEGER NOT NULL,
+    start_ms      INTEGER NOT NULL,
+    speaker_index INTEGER NOT NULL,
+    end_ms        INTEGER NOT NULL,
+    profile_id    INTEGER,
+    month         TEXT,
+    PRIMARY KEY (recording_id, start_ms, speaker_index)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_segments_pid ON segments(profile_id, recording_id);
+
+CREATE TABLE IF NOT EXISTS recording_talk (
+    recording_id INTEGER NOT NULL,
+    profile_id   INTEGER NOT NULL,
+    month        TEXT,
+    talk_ms      INTEGER NOT NULL DEFAULT 0,
+    turns        INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (recording_id, profile_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_recording_talk_pid ON recording_talk(profile_id, talk_ms);
+
+CREATE TABLE IF NOT EXISTS profile_month (
+    profile_id INTEGER NOT NULL,
+    month      TEXT    NOT NULL,
+    talk_ms    INTEGER NOT NULL DEFAULT 0,
+    turns      INTEGER NOT NULL DEFAULT 0,
+    calls      INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile_id, month)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_profile_month_month ON profile_month(month);
+
+CREATE TRIGGER IF NOT EXISTS trg_segments_ins AFTER INSERT ON segments
+WHEN NEW.profile_id IS NOT NULL BEGIN
+    INSERT OR IGNORE INTO recording_talk (recording_id, profile_id, month)
+        VALUES (NEW.recording_id, NEW.profile_id, NEW.month);
+    UPDATE recording_talk SET talk_ms = talk_ms + NEW.end_ms - NEW.start_ms,
+                              turns   = turns + 1
+        WHERE recording_id = NEW.recording_id AND profile_id = NEW.profile_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_recording_talk_ins AFTER INSERT ON recording_talk
+BEGIN
+    INSERT INTO profile_month (profile_id, month, talk_ms, turns, calls)
+        VALUES (NEW.profile_id, IFNULL(NEW.month, ''), NEW.talk_ms, NEW.turns, 1)
+        ON CONFLICT(profile_id, month) DO UPDATE SET
+            talk_ms = talk_ms + excluded.talk_ms,
+            turns   = turns + excluded.turns,
+            calls   = calls + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_recording_talk_upd AFTER UPDATE ON recording_talk
+BEGIN
+    UPDATE profile_month SET talk_ms = talk_ms + NEW.talk_ms - OLD.talk_ms,
+                             turns   = turns + NEW.turns - OLD.turns
+        WHERE profile_id = NEW.profile_id AND month = IFNULL(NEW.month, '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_recording_talk_del AFTER DELETE ON recording_talk
+BEGIN
+    UPDATE profile_month SET talk_ms = talk_ms - OLD.talk_ms,
+                             turns   = turns - OLD.turns,
+                             calls   = calls - 1
+        WHERE profile_id = OLD.profile_id AND month = IFNULL(OLD.month, '');
+END;
+"""
+
+TABLES = ('segments', 'recording_talk', 'profile_month')
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def present(conn):
+    """Whether any recording has contributed segments (the schema exists)."""
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name='segments'").fetchone() is not None
+
+
+def _month(date):
+    s = str(date or '')
+    return s[:7] if len(s) >= 7 and s[4] == '-' else None
+
+
+# ─── Ingest ───────────────────────────────────────────────────────────────────
+def _forget(conn, rid):
+    conn.execute('DELETE FROM segments WHERE recording_id=?', (rid,))
+    conn.execute('DELETE FROM recording_talk WHERE recording_id=?', (rid,))
+
+
+def record(db_path, rid, sp, spks=None, call_date=None):
+    """Replace the segments of one recording. `spks` (the committed speaker
+    rows) maps speaker_index -> voice_profile_id; aggregates follow by trigger."""
+    from waveform import spans_from
+    spans = spans_from(sp)
+    if not spans: return 0
+    pids  = {s.get('speaker_index'): s.get('voice_profile_id') for s in spks or ()}
+    month = _month(call_date)
+    rows  = {}
+    for a, b, k in spans:
+        s, e = int(a * 1000), int(b * 1000)
+        if e > s: rows[(s, k)] = (rid, s, k, e, pids.get(k), month)
+    conn = connect(db_path)
+    with conn:
+        _forget(conn, rid)
+        conn.executemany('INSERT INTO segments (recording_id, start_ms, speaker_index, '
+                         'end_ms, profile_id, month) VALUES (?,?,?,?,?,?)',
+                         rows.values())
+    conn.close()
+    return len(rows)
+
+
+def repoint(conn, keep, drop):
+    """Move segments of merged profiles onto `keep` and rebuild their talk rows.
+    Runs inside the caller's transaction (profile_store.merge)."""
+    if not present(conn): return
+    q = ','.join('?' * len(drop))
+    ids = [keep] + list(drop)
+    conn.execute(f'UPDATE segments SET profile_id=? WHERE profile_id IN ({q})', ids)
+    conn.execute(f'DELETE FROM recording_talk WHERE profile_id IN ({q},?)', list(drop) + [keep])
+    conn.execute(f'DELETE FROM profile_month WHERE profile_id IN ({q},?)', list(drop) + [keep])
+    conn.execute('INSERT INTO recording_talk (recording_id, profile_id, month, talk_ms, turns) '
+                 'SELECT recording_id, profile_id, month, SUM(end_ms - start_ms), COUNT(*) '
+                 'FROM segments WHERE profile_id=? GROUP BY recording_id', (keep,))
+
+
+# ─── Queries ──────────────────────────────────────────────────────────────────
+def calls_with(conn, pid, min_s=0, month=None):
+    """[(recording_id, talk_s, turns)] where profile `pid` spoke more than
+    `min_s` seconds, longest first — a range scan on (profile_id, talk_ms)."""
+    if not present(conn): return []
+    sql = ('SELECT recording_id, talk_ms / 1000.0, turns FROM recording_talk '
+           'WHERE profile_id=? AND talk_ms>?')
+    args = [pid, int(min_s * 1000)]
+    if month: sql += ' AND month=?'; args.append(month)
+    return conn.execute(sql + ' ORDER BY talk_ms DESC', args).fetchall()
+
+
+def talk_time(conn, month=None, pid=None):
+    """{profile_id: (talk_s, turns, calls)} for one month (default: this one)."""
+    if not present(conn): return {}
+    month = month or datetime.now().strftime('%Y-%m')
+    sql   = 'SELECT profile_id, talk_ms / 1000.0, turns, calls FROM profile_month WHERE month=?'
+    args  = [month]
+    if pid is not None: sql += ' AND profile_id=?'; args.append(pid)
+    return {r[0]: r[1:] for r in conn.execute(sql, args) if r[3] > 0}
+
+
+def segments_for(conn, rid):
+    """[(start_s, end_s, speaker_index, profile_id)] of one recording, in order."""
+    if not present(conn): return []
+    return [(s / 1000, e / 1000, k, p) for s, k, e, p in conn.execute(
+        'SELECT start_ms, speaker_index, end_ms, profile_id FROM segments '
+        'WHERE recording_id=? ORDER BY start_ms', (rid,))]
+
+
+def speaker_at(conn, rid, t_s):
+    """speaker_index talking at `t_s` seconds into a recording, or None."""
+    if not present(conn): return None
+    t = int(t_s * 1000)
+    r = conn.execute('SELECT speaker_index FROM segments WHERE recording_id=? '
+                     'AND start_ms<=? AND end_ms>? ORDER BY start_ms DESC LIMIT 1',
+                     (rid, t, t)).fetchone()
+    return r[0] if r else None
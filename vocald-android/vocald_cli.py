@@ -0,0 +1,146 @@
+"""
+Vocald — headless batch mode.
+
+Runs the same scan -> analyse -> commit pipeline as LogsScreen._scan over a
+folder, without importing Kivy. Analysis runs in a process pool
+(analysis.Pool); the parent owns every DB write, so results land in the
+usual DB_PATH schema and the database can be copied to the phone afterwards.
+
+Progress and timing go to stdout as JSON lines:
+
+    python vocald_cli.py /path/to/recordings --workers 8 --data-dir ~/.config/vocald
+    python vocald_cli.py /path/to/recordings --bench      # 1..N core scaling
+    python vocald_cli.py /path/to/recordings --supervised --max-rss 1024
+"""
+
+import argparse, json, os, sys, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'src'))
+sys.path.insert(0, HERE)
+
+# Kivy's desktop user_data_dir for the app, so the CLI and app share a DB
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser('~'), '.config', 'vocald')
+
+
+def _emit(**kw):
+    kw.setdefault('t', round(time.time(), 3))
+    sys.stdout.write(json.dumps(kw, default=str) + '\n')
+    sys.stdout.flush()
+
+
+def _speakers(sp):
+    """Speaker count of an analysis result: a list, or a dict with 'speakers'."""
+    if isinstance(sp, dict): return len(sp.get('speakers') or ())
+    return len(sp or ())
+
+
+def run(folder, data_dir=DEFAULT_DATA_DIR, workers=None, rescan=False,
+        throttle=False, supervised=False, max_rss_mb=None):
+    import asyncio, pipeline, vocald_engine as engine
+    from folder_scanner import scan_folder
+    from analysis import Pool, analyse_file, batch_mark, commit, settle
+
+    os.makedirs(data_dir, exist_ok=True)
+    engine.init_engine(data_dir)
+    n = {'total': 0, 'seen': 0}
+
+    def scan():
+        t = time.perf_counter()
+        files = scan_folder(folder, (lambda *_: False) if rescan
+                            else engine.is_file_processed)
+        n['total'] = len(files)
+        _emit(event='start', folder=folder, files=len(files), workers=pool.workers,
+              db=engine.DB_PATH, scan_s=round(time.perf_counter() - t, 3))
+        return files
+
+    def write(items):
+        ok = 0
+        for fi, sp, err, secs in items:
+            fn  = fi['filename']
+            rid = engine.create_recording_entry(
+                fn, fi['filepath'], fi['estimated_call_time'].isoformat())
+            try:
+                if err: raise err
+                commit(engine, rid, sp, fn, fi['modified_ms'], fi['filepath'], mark)
+                ok += 1
+                _emit(event='file', file=fn, id=rid, status='done',
+                      speakers=_speakers(sp), secs=round(secs, 3))
+            except Exception as e:
+                engine.mark_recording_failed(rid, str(e))
+                _emit(event='file', file=fn, id=rid, status='failed', error=str(e))
+            n['seen'] += 1
+            _emit(event='progress', done=n['seen'], total=n['total'])
+        return ok
+
+    if supervised:
+        from supervisor import MAX_RSS_MB, Supervisor
+        pool = Supervisor(data_dir, workers or os.cpu_count() or 1,
+                          max_rss_mb or MAX_RSS_MB)
+        analyse, ex = pool.analyse, None
+    else:
+        pool = Pool(data_dir, workers)
+        analyse, ex = analyse_file, pool.executor
+    mark = batch_mark(engine.DB_PATH)
+    with pool:
+        gov = None
+        if throttle:
+            from governor import Governor, SysProvider
+            gov = Governor(SysProvider(), max_workers=pool.workers)
+        st = asyncio.run(pipeline.run(scan, analyse, write,
+                                      executor=ex, infer=pool.workers,
+                                      decode=min(4, pool.workers),
+                                      depth=2 * pool.workers, governor=gov))
+    flagged = settle(engine.DB_PATH, mark) if pool.workers > 1 and st['done'] > 1 else 0
+    _emit(event='end', done=st['done'], failed=st['failed'], flagged=flagged,
+          secs=round(st['secs'], 3),
+          files_per_s=round(st['files'] / st['secs'], 3) if st['secs'] else None,
+          stage_s={k[:-2]: round(st[k], 3)
+                   for k in ('decode_s', 'infer_s', 'write_s')})
+    return 0 if not st['failed'] else 1
+
+
+def run_bench(folder, data_dir=DEFAULT_DATA_DIR, workers=None, limit=32):
+    """1 -> N worker scaling on up to `limit` files; nothing is written."""
+    import vocald_engine as engine
+    from folder_scanner import scan_folder
+    from analysis import bench
+
+    engine.init_engine(data_dir)
+    files = scan_folder(folder, lambda *_: False)[:limit]
+    for row in bench(data_dir, files, workers):
+        _emit(event='bench', **row)
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='vocald_cli',
+                                 description='Analyse a folder of call recordings.')
+    ap.add_argument('folder')
+    ap.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                    help='engine data directory holding the DB (default: %(default)s)')
+    ap.add_argument('-j', '--workers', type=int, default=None,
+                    help='analysis processes (default: CPU count)')
+    ap.add_argument('--rescan', action='store_true',
+                    help='ignore the processed-file registry')
+    ap.add_argument('--throttle', action='store_true',
+                    help='pace workers by battery and CPU temperature')
+    ap.add_argument('--supervised', action='store_true',
+                    help='one killable process per worker, with per-file '
+                         'timeouts and a memory ceiling')
+    ap.add_argument('--max-rss', type=int, default=None, metavar='MB',
+                    help='with --supervised: kill a worker above this RSS')
+    ap.add_argument('--bench', action='store_true',
+                    help='time 1..N workers on the folder instead of ingesting it')
+    a = ap.parse_args(argv)
+    if not os.path.isdir(a.folder):
+        ap.error(f'not a folder: {a.folder}')
+    data_dir = os.path.expanduser(a.data_dir)
+    if a.bench:
+        return run_bench(a.folder, data_dir, a.workers)
+    return run(a.folder, data_dir, a.workers, a.rescan, a.throttle,
+               a.supervised, a.max_rss)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Recordings-folder watcher (Kivy-free).
+
+Notices new call recordings as they appear, so they can be analysed without
+a full scan_folder() pass. On Linux/Android the folder (and its
+sub-folders) is watched with inotify through ctypes; elsewhere, or when
+inotify is unavailable, the folder is polled with os.scandir against the
+previous snapshot.
+
+Recorders write the file over the whole call, so an event only makes a path
+a candidate: it is handed to on_ready(fi) once its size and mtime have not
+changed for `settle` seconds. `fi` has the same keys as scan_folder() rows.
+"""
+
+import ctypes, ctypes.util, os, select, struct, threading, time
+from datetime import datetime
+
+AUDIO_EXT = frozenset(('.m4a', '.mp3', '.amr', '.3gp', '.3ga', '.wav', '.ogg',
+                       '.opus', '.aac', '.flac'))
+
+# inotify(7)
+IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_TO = 0x002, 0x008, 0x080
+IN_CREATE, IN_DELETE_SELF, IN_ISDIR    = 0x100, 0x400, 0x40000000
+IN_NONBLOCK, IN_CLOEXEC                = 0o4000, 0o2000000
+_MASK  = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+_EVENT = struct.Struct('iIII')          # wd, mask, cookie, len
+
+
+def file_info(path):
+    """scan_folder()-style row for one file. The call time is taken from the
+    mtime, i.e. when the recorder finished writing."""
+    st = os.stat(path)
+    return {'filename': os.path.basename(path), 'filepath': path,
+            'estimated_call_time': datetime.fromtimestamp(st.st_mtime),
+            'modified_ms': int(st.st_mtime * 1000)}
+
+
+def _is_audio(name):
+    return not name.startswith('.') and os.path.splitext(name)[1].lower() in AUDIO_EXT
+
+
+# ─── inotify ──────────────────────────────────────────────────────────────────
+class _Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                           use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0: raise OSError(ctypes.get_errno(), 'inotify_init1')
+        self.dirs = {}                  # wd -> directory
+
+    def add(self, path):
+        wd = self._add(self.fd, os.fsencode(path), _MASK)
+        if wd < 0: raise OSError(ctypes.get_errno(), f'inotify_add_watch {path}')
+        self.dirs[wd] = path
+
+    def read(self, timeout):
+        """[(directory, name, mask)] after up to `timeout` s."""
+        if not select.select([self.fd], [], [], timeout)[0]: return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        out, o = [], 0
+        while o < len(buf):
+            wd, mask, _, n = _EVENT.unpack_from(buf, o)
+            o += _EVENT.size
+            name = buf[o:o + n].rstrip(b'\0').decode(errors='replace')
+            o += n
+            if wd in self.dirs: out.append((self.dirs[wd], name, mask))
+        return out
+
+    def close(self):
+        os.close(self.fd)
+
+
+# ─── Watcher ──────────────────────────────────────────────────────────────────
+class Watcher:
+    """Calls on_ready(fi) from its own thread for each new, finished recording.
+    `is_processed(filename, modified_ms)` filters files already analysed."""
+
+    def __init__(self, folder, on_ready, is_processed=None, settle=5.0,
+                 poll=30.0, depth=2):
+        self.folder, self.on_ready = folder, on_ready
+        self.is_processed = is_processed or (lambda *_: False)
+        self.settle, self.poll, self.depth = settle, poll, depth
+        self.mode    = None             # 'inotify' | 'poll', once started
+        self._stop   = threading.Event()
+        self._thread = None
+        self._seen   = {}               # path -> (size, mtime) of known files
+        self._cand   = {}               # path -> (size, mtime, stable since)
+
+    def start(self):
+        if self._thread: return self
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='vocald-watch')
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread: self._thread.join(2.0)
+        self._thread = None
+
+    # ── snapshot / stability ─────────────────────────────────────────────────
+    def _walk(self, root=None, level=0):
+        """(dirs, {audio path: (size, mtime)}) under the folder, `depth` deep."""
+        root = root or self.folder
+        dirs, files = [root], {}
+        try:
+            with os.scandir(root) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            if level < self.depth and not e.name.startswith('.'):
+                                d, f = self._walk(e.path, level + 1)
+                                dirs += d; files.update(f)
+                        elif _is_audio(e.name):
+                            st = e.stat()
+                            files[e.path] = (st.st_size, st.st_mtime)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return dirs, files
+
+    def _touch(self, path):
+        if path not in self._cand and path not in self._seen:
+            self._cand[path] = (-1, 0.0, time.monotonic())
+
+    def _check(self):
+        """Promote candidates whose size and mtime held still for `settle` s."""
+        now = time.monotonic()
+        for path, (size, mt, since) in list(self._cand.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self._cand[path]; continue
+            cur = (st.st_size, st.st_mtime)
+            if cur != (size, mt):
+                self._cand[path] = cur + (now,)
+            elif size > 0 and now - since >= self.settle:
+                del self._cand[path]
+                self._seen[path] = cur
+                self._ready(path)
+
+    def _ready(self, path):
+        try:
+            fi = file_info(path)
+            if self.is_processed(fi['filename'], fi['modified_ms']): return
+            self.on_ready(fi)
+        except Exception:
+            pass
+
+    # ── loops ────────────────────────────────────────────────────────────────
+    def _run(self):
+        dirs, self._seen = self._walk()
+        ino = None
+        try:
+            ino = _Inotify()
+            for d in dirs: ino.add(d)
+        except (OSError, AttributeError):
+            if ino: ino.close()
+            ino = None
+        self.mode = 'inotify' if ino else 'poll'
+        try:
+            if ino: self._run_inotify(ino)
+            else:   self._run_poll()
+        finally:
+            if ino: ino.close()
+
+    def _run_inotify(self, ino):
+        tick = max(0.5, self.settle / 2)
+        while not self._stop.is_set():
+            for d, name, mask in ino.read(tick if self._cand else 1.0):
+                path = os.path.join(d, name)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    subs, files = self._walk(path)
+                    for sub in subs:
+                        try: ino.add(sub)
+                        except OSError: pass
+                    for p in files: self._touch(p)
+                elif name and _is_audio(name):
+                    if mask & (IN_CREATE | IN_MOVED_TO): self._seen.pop(path, None)
+                    self._touch(path)
+            self._check()
+
+    def _run_poll(self):
+        tick, last = max(0.5, self.settle / 2), 0.0
+        while not self._stop.wait(tick if self._cand else 1.0):
+            if time.monotonic() - last >= self.poll:
+                last = time.monotonic()
+                for p in self._walk()[1]: self._touch(p)
+            self._check()
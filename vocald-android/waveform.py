@@ -0,0 +1,161 @@
+"""
+Precomputed waveform thumbnails.
+
+Each analysis stores a compact envelope — per-bin peak and RMS as uint8 plus
+the speaker-segment spans — so the UI can draw a waveform and speaker
+timeline without decoding audio again. Thumbnails are made for PCM WAV
+recordings only (read in place; anything else would need a second decode),
+and the spans stay empty unless the engine reports per-speaker 'segments'
+(see timeline.py). Envelopes live in an append-only data
+file; a fixed-width index file maps recording id -> (offset, length), so a
+lookup is one read at id * 16 and one slice of the mmapped data file.
+
+    waveforms.dat   b'VWF1' header, peak[bins], rms[bins], spans[n]
+    waveforms.idx   <QII> offset, length, reserved — one slot per recording id
+"""
+
+import mmap, os, struct
+from collections import namedtuple
+
+import numpy as np
+
+BINS   = 512
+_MAGIC = b'VWF1'
+_HDR   = struct.Struct('<4sHHI')     # magic, bins, n_spans, duration_ms
+_SPAN  = struct.Struct('<IIH2x')     # start_ms, end_ms, speaker_index
+_SLOT  = struct.Struct('<QII')       # offset, length, reserved
+
+Envelope = namedtuple('Envelope', 'peak rms spans duration_ms')
+
+
+# ─── Compute ──────────────────────────────────────────────────────────────────
+def envelope(samples, rate, spans=(), bins=BINS):
+    """Envelope from (frames, channels) integer PCM; spans in seconds."""
+    frames, ch = samples.shape
+    step = max(1, frames // bins)
+    n    = min(bins, frames // step)
+    kind = samples.dtype.kind
+    full = (float(np.iinfo(samples.dtype).max) if kind == 'i' else
+            float(2 ** (8 * samples.dtype.itemsize - 1)) if kind == 'u' else 1.0)
+    peak = np.zeros(n, np.uint8); rms = np.zeros(n, np.uint8)
+    for s in range(0, n, 64):            # float work in bounded chunks
+        e = min(n, s + 64)
+        x = samples[s * step:e * step].reshape(e - s, step * ch).astype(np.float32)
+        if kind == 'u': x -= full
+        x /= full
+        peak[s:e] = np.clip(np.abs(x).max(1) * 255, 0, 255)
+        rms[s:e]  = np.clip(np.sqrt((x * x).mean(1)) * 255, 0, 255)
+    sp = [(int(a * 1000), int(b * 1000), int(k)) for a, b, k in spans]
+    return Envelope(peak, rms, sp, int(frames * 1000 / rate))
+
+
+def spans_from(sp):
+    """(start_s, end_s, speaker_index) from an analysis result, when the
+    engine reports segments per speaker as (start, end) or {'start','end'}."""
+    spk = sp.get('speakers', []) if isinstance(sp, dict) else (sp or [])
+    out = []
+    for s in spk:
+        k = s.get('speaker_index', 0) or 0
+        for seg in s.get('segments') or ():
+            a, b = ((seg.get('start'), seg.get('end')) if isinstance(seg, dict)
+                    else seg[:2])
+            if a is not None and b is not None and b > a:
+                out.append((float(a), float(b), k))
+    return sorted(out)
+
+
+def _pack(env):
+    return b''.join([_HDR.pack(_MAGIC, len(env.peak), len(env.spans), env.duration_ms),
+                     env.peak.tobytes(), env.rms.tobytes()] +
+                    [_SPAN.pack(*s) for s in env.spans])
+
+
+def _unpack(buf):
+    magic, bins, n, dur = _HDR.unpack_from(buf, 0)
+    if magic != _MAGIC: return None
+    o = _HDR.size
+    peak = np.frombuffer(buf, np.uint8, bins, o)
+    rms  = np.frombuffer(buf, np.uint8, bins, o + bins)
+    o += 2 * bins
+    spans = [_SPAN.unpack_from(buf, o + i * _SPAN.size) for i in range(n)]
+    return Envelope(peak, rms, spans, dur)
+
+
+# ─── Store ────────────────────────────────────────────────────────────────────
+class Store:
+    """Append-only envelope store. Safe for one writer plus readers."""
+
+    def __init__(self, folder):
+        self.dat = os.path.join(folder, 'waveforms.dat')
+        self.idx = os.path.join(folder, 'waveforms.idx')
+        self._mm, self._mm_size = None, 0
+
+    def put(self, rid, env):
+        blob = _pack(env)
+        with open(self.dat, 'ab') as f:
+            off = f.seek(0, os.SEEK_END)
+            f.write(blob)
+        fd = os.open(self.idx, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(fd, _SLOT.pack(off, len(blob), 0), rid * _SLOT.size)
+        finally:
+            os.close(fd)
+
+    def get(self, rid):
+        if rid is None or rid < 1: return None
+        try:
+            fd = os.open(self.idx, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            slot = os.pread(fd, _SLOT.size, rid * _SLOT.size)
+        finally:
+            os.close(fd)
+        if len(slot) < _SLOT.size: return None
+        off, n, _ = _SLOT.unpack(slot)
+        if not n: return None
+        mm = self._map(off + n)
+        return _unpack(mm[off:off + n]) if mm else None
+
+    def _map(self, need):
+        if self._mm is None or self._mm_size < need:
+            try:
+                with open(self.dat, 'rb') as f:
+                    size = os.fstat(f.fileno()).st_size
+                    if size < need: return None
+                    self.close()
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._mm_size = size
+            except (OSError, ValueError):
+                return None
+        return self._mm
+
+    def clear(self):
+        self.close()
+        for p in (self.dat, self.idx):
+            try: os.remove(p)
+            except OSError: pass
+
+    def close(self):
+        if self._mm is not None: self._mm.close()
+        self._mm, self._mm_size = None, 0
+
+
+_stores = {}
+
+def store_for(db_path):
+    """The store kept next to the engine database."""
+    folder = os.path.dirname(os.path.abspath(db_path))
+    if folder not in _stores: _stores[folder] = Store(folder)
+    return _stores[folder]
+
+
+def record(db_path, rid, path, sp):
+    """Compute and store the thumbnail for one analysed file. Only PCM WAV is
+    read (zero-copy); other containers would need a second decode."""
+    import audiohdr
+    if audiohdr.what(path) != 'wav': return False
+    samples, rate = audiohdr.read_wav(path)
+    if not len(samples): return False
+    store_for(db_path).put(rid, envelope(samples, rate, spans_from(sp)))
+    return True